@@ -30,16 +30,20 @@ from run_repeated_judging import (
     run_experiment,
 )
 from vendor_billing_csv import parse_uploaded_files
-from compute_metrics import (
-    _group_by_item,
-    metric1_per_item_variance,
-    metric2_exact_agreement,
-    metric3_score_histogram,
-    metric_repeat_variability_headlines,
-    otel_metrics,
-    variance,
+from budget import (
+    CACHE_READ_RATE_MULTIPLIER,
+    CACHE_WRITE_RATE_MULTIPLIER,
+    effective_rates_for_judge as _effective_rates_for_judge,
+    estimate_vendor_cost_us1m as _estimate_vendor_cost_us1m,
 )
-from utils import ENCODING, REPO_ROOT, load_jsonl
+from columnar_store import justifications_path, parquet_path
+from consensus import JudgePanel, loo_consensus
+from jsonl_index import index_path
+from load_cache import cached_aggregator, cached_jsonl, cached_rows, get_load_cache
+from results_catalog import get_results_db
+from run_manifest import load_manifest, manifest_path, result_catalog
+from row_aggregator import RowAggregator, SliceStats
+from utils import ENCODING, REPO_ROOT
 RESULTS_DIR = REPO_ROOT / "results"
 DATA_DIR = REPO_ROOT / "data"
 CONTENT_DIR = REPO_ROOT / "dashboard_content"
@@ -89,7 +93,27 @@ def _condition_label_for_file(path: Path, first_row: Optional[dict] = None) -> s
     return "(legacy — not in filename or rows)"
 
 
-def _summarize_result_file(path: Path) -> dict:
+def _summary_from_manifest(path: Path, manifest: dict) -> dict:
+    cfg = manifest["config"]
+    judges = cfg.get("judge_models") or []
+    metrics = cfg.get("metric_names") or []
+    return {
+        "path": path,
+        "name": path.name,
+        "condition": cfg.get("condition_name") or _condition_label_for_file(path, {}),
+        "dataset_id": (str(cfg.get("dataset_id") or "").strip() or "—"),
+        "judge_model": str(judges[0]) if judges else "—",
+        "metric_name": metrics[0] if cfg.get("condition_name") == "metric_rubric" and metrics else None,
+        "multi_judge_run": len(judges) > 1,
+        "records": manifest.get("rows"),
+    }
+
+
+def _summarize_result_file(path: Path, manifest: Optional[dict] = None) -> dict:
+    """Catalog entry for a results file: from its run manifest when fresh, else from the first row."""
+    manifest = manifest if manifest is not None else load_manifest(path)
+    if manifest is not None and manifest.get("config"):
+        return _summary_from_manifest(path, manifest)
     row = _first_jsonl_row(path)
     multi_flag = bool(row.get("multi_judge_run"))
     if not multi_flag and "multi" in path.name and "judges" in path.name:
@@ -102,16 +126,30 @@ def _summarize_result_file(path: Path) -> dict:
         "judge_model": str(row.get("judge_model") or "—"),
         "metric_name": row.get("metric_name"),
         "multi_judge_run": multi_flag,
+        "records": None,
     }
 
 
 def _all_result_summaries() -> list:
     if not RESULTS_DIR.exists():
         return []
-    out = [_summarize_result_file(p) for p in sorted(RESULTS_DIR.glob("*.jsonl"), key=lambda p: p.name)]
+    out = [_summarize_result_file(p, m) for p, m in result_catalog(RESULTS_DIR)]
     return out
 
 
+def _result_rows(name: str) -> tuple:
+    """Rows of one results file, parsed once and memoised until the file changes (read-only)."""
+    return cached_rows(RESULTS_DIR / name)
+
+
+def _files_aggregator(names) -> RowAggregator:
+    """One RowAggregator over the given results files, built from their memoised per-file aggregators."""
+    agg = RowAggregator()
+    for name in names:
+        agg.update(cached_aggregator(RESULTS_DIR / name))
+    return agg
+
+
 def _rows_for_single_metric(rows: list, metric_name: Optional[str]):
     """Condition B: restrict rows before grouping; avoids relying on compute_metrics keyword compat."""
     if metric_name is None:
@@ -119,19 +157,6 @@ def _rows_for_single_metric(rows: list, metric_name: Optional[str]):
     return [r for r in rows if str(r.get("metric_name")) == str(metric_name)]
 
 
-def _unique_judge_models_in_rows(rows: list) -> list:
-    """Preserve first-seen order of distinct judge_model values (non-empty strings)."""
-    seen: list = []
-    for r in rows:
-        j = r.get("judge_model")
-        if j is None:
-            continue
-        sj = str(j).strip()
-        if sj and sj not in seen:
-            seen.append(sj)
-    return seen
-
-
 def _rows_for_judge_model(rows: list, judge_model: str) -> list:
     jm = str(judge_model).strip()
     return [r for r in rows if str(r.get("judge_model", "")).strip() == jm]
@@ -232,64 +257,19 @@ def _first_execution_id(rows: list) -> str:
     return eid if eid else "—"
 
 
-def _mean_panel_score(rows: list) -> Optional[float]:
+def _mean_panel_score(agg: RowAggregator, fname: str) -> Optional[float]:
     """Mean of each judge's mean score (non-null rows only); judges weighted equally."""
-    judges = _unique_judge_models_in_rows(rows)
-    if not judges:
-        return None
-    jmeans: list = []
-    for j in judges:
-        part = _rows_for_judge_model(rows, j)
-        scores = [float(r["score"]) for r in part if r.get("score") is not None]
-        if scores:
-            jmeans.append(sum(scores) / len(scores))
+    jmeans = [
+        m for m in (agg.select(file=fname, judge=j).mean_score for j in agg.judges(fname)) if m is not None
+    ]
     if not jmeans:
         return None
     return sum(jmeans) / len(jmeans)
 
 
-def _token_totals_by_judge(rows: list) -> dict:
-    """Aggregate input/output tokens per judge_model (missing tokens → 0)."""
-    out: dict = {}
-    for r in rows:
-        j = str(r.get("judge_model") or "").strip()
-        if not j:
-            continue
-        inn = int(r.get("input_tokens") or 0)
-        ott = int(r.get("output_tokens") or 0)
-        if j not in out:
-            out[j] = {"in": 0, "out": 0}
-        out[j]["in"] += inn
-        out[j]["out"] += ott
-    return out
-
-
-def _estimate_vendor_cost_us1m(tin: float, tout: float, rate_in: float, rate_out: float) -> float:
-    return (tin / 1_000_000.0) * rate_in + (tout / 1_000_000.0) * rate_out
-
-
-def _effective_rates_for_judge(
-    judge: str,
-    vendor: str,
-    rate_oai_in: float,
-    rate_oai_out: float,
-    rate_ant_in: float,
-    rate_ant_out: float,
-    rate_overrides: Optional[dict],
-) -> Tuple[float, float, bool]:
-    """Resolve input/output USD-per-1M rates: per-judge overrides else vendor defaults."""
-    if vendor == "Anthropic":
-        vin, vout = float(rate_ant_in), float(rate_ant_out)
-    else:
-        vin, vout = float(rate_oai_in), float(rate_oai_out)
-    o = (rate_overrides or {}).get(judge)
-    if not isinstance(o, dict):
-        o = {}
-    rin = o.get("in")
-    rout = o.get("out")
-    eff_in = float(rin) if rin is not None else vin
-    eff_out = float(rout) if rout is not None else vout
-    return eff_in, eff_out, bool(eff_in or eff_out)
+def _token_totals_by_judge(agg: RowAggregator, fname: str) -> dict:
+    """Input/output (and prompt-cache read/write) tokens per judge_model (missing tokens → 0)."""
+    return {j: dict(agg.select(file=fname, judge=j).tokens) for j in agg.judges(fname)}
 
 
 def _openai_export_key_for_judge(judge: str, openai_by_model: dict) -> Optional[str]:
@@ -336,9 +316,9 @@ def _run_summary_rel_row(
     summ: dict,
     judge: str,
     metric_label: str,
-    by_item: dict,
+    stats: SliceStats,
 ) -> dict:
-    if not by_item:
+    if not stats.n_scored:
         return {
             "File tag": file_tag,
             "Condition": summ["condition"],
@@ -352,13 +332,10 @@ def _run_summary_rel_row(
             "Mean within-item SD": None,
             "Repeat agreement (exact)": None,
         }
-    hl = metric_repeat_variability_headlines(by_item)
-    m1 = metric1_per_item_variance(by_item)
-    m2 = metric2_exact_agreement(by_item)
-    mean_score = (
-        sum(sc for scores in by_item.values() for sc in scores)
-        / sum(len(scores) for scores in by_item.values())
-    )
+    hl = stats.headlines()
+    m1 = stats.variance()
+    m2 = stats.agreement()
+    mean_score = stats.mean_score
     return {
         "File tag": file_tag,
         "Condition": summ["condition"],
@@ -378,41 +355,50 @@ def _run_summary_rel_row(
     }
 
 
-def _pct_zero_variance_for_pool(by_item: dict) -> Optional[float]:
-    if not by_item:
+def _pct_zero_variance_for_pool(stats: SliceStats) -> Optional[float]:
+    if not stats.n_scored:
         return None
-    m1 = metric1_per_item_variance(by_item)
+    m1 = stats.variance()
     if not m1.get("n_items"):
         return None
     return float(m1["pct_items_zero_variance"])
 
 
+def _pool_stats(parts: list) -> SliceStats:
+    """
+    Pool (fname, metric, stats) slices of one judge without mixing them: items are keyed
+    ``fname\tmetric\titem_id`` (``fname\titem_id`` for conditions A and C), in ``parts`` order.
+    """
+    return SliceStats.merge(
+        [sl for _, _, sl in parts],
+        prefixes=[f"{f}\t{m}\t" if m is not None else f"{f}\t" for f, m, _ in parts],
+    )
+
+
 def _composite_pct_zero_equal_abc(
-    pool: dict,
+    parts: list,
     fname_to_condition: dict,
 ) -> Tuple[Optional[float], dict]:
     """
     Repeat stability with equal weight per condition: B = mean of per-metric % zero variance;
     composite = mean of A, aggregated B, and C among conditions present in the selection.
+    ``parts`` is one judge's pooled (fname, metric, stats) slices.
     """
-    pool_a: dict = {}
-    pool_c: dict = {}
-    pools_b_by_m = defaultdict(dict)
-    for k, scores in pool.items():
-        parts = k.split("\t")
-        if not parts:
-            continue
-        fname = parts[0]
+    parts_a: list = []
+    parts_c: list = []
+    parts_b_by_m = defaultdict(list)
+    for part in parts:
+        fname, mname, _ = part
         cond = fname_to_condition.get(fname)
-        if not cond:
-            continue
-        if cond == "generic_overall" and len(parts) == 2:
-            pool_a[k] = scores
-        elif cond == "per_item_custom" and len(parts) == 2:
-            pool_c[k] = scores
-        elif cond == "metric_rubric" and len(parts) == 3:
-            mname = parts[1]
-            pools_b_by_m[mname][k] = scores
+        if cond == "generic_overall" and mname is None:
+            parts_a.append(part)
+        elif cond == "per_item_custom" and mname is None:
+            parts_c.append(part)
+        elif cond == "metric_rubric" and mname is not None:
+            parts_b_by_m[mname].append(part)
+    pool_a = _pool_stats(parts_a)
+    pool_c = _pool_stats(parts_c)
+    pools_b_by_m = {mname: _pool_stats(p) for mname, p in parts_b_by_m.items()}
     pct_a = _pct_zero_variance_for_pool(pool_a)
     pct_c = _pct_zero_variance_for_pool(pool_c)
     b_by_metric: dict = {}
@@ -455,7 +441,14 @@ def _rel_econ_economics_for_judge(
         rate_ant_out,
         rate_overrides,
     )
-    est = _estimate_vendor_cost_us1m(float(pr["in"]), float(pr["out"]), eff_in, eff_out)
+    est = _estimate_vendor_cost_us1m(
+        float(pr["in"]),
+        float(pr["out"]),
+        eff_in,
+        eff_out,
+        float(pr.get("cache_read", 0)),
+        float(pr.get("cache_write", 0)),
+    )
     ex_in = ex_out = None
     ex_cost_usd = None
     ex_oai_line_usd = None
@@ -628,8 +621,7 @@ def _rel_econ_condition_weighted_stability_chart(
 
     pairs = []
     for j in judges:
-        pool = pooled_by_judge.get(j, {})
-        comp, det = _composite_pct_zero_equal_abc(pool, fname_to_condition)
+        comp, det = _composite_pct_zero_equal_abc(pooled_by_judge.get(j, []), fname_to_condition)
         pairs.append((comp, det))
 
     if all(p[0] is None for p in pairs):
@@ -862,99 +854,54 @@ def _rel_econ_mean_score_line_by_condition(
         st.plotly_chart(fig, use_container_width=True, key=f"rel_econ_meanline_{_key_suf}")
 
 
-def _compute_mcd_mcb(all_file_rows: dict, fname_to_condition: dict) -> list:
-    """Compute leave-one-out MCD and MCB per judge from raw JSONL rows.
+def _compute_mcd_mcb(agg: RowAggregator, fname_to_condition: dict) -> list:
+    """Compute leave-one-out MCD and MCB per judge (``consensus.loo_consensus``) from the selection's slices.
 
-    all_file_rows: {filename: [row_dicts, …]}
+    agg: RowAggregator over the selected files
     fname_to_condition: {filename: condition_name}
 
     Returns list of dicts: [{Judge, Vendor, MCD, MCB, MCD_A, MCB_A, …}, …]
     """
-    judge_item_scores = defaultdict(lambda: defaultdict(list))
-    for fname, rows in all_file_rows.items():
-        cond = fname_to_condition.get(fname, "")
-        for r in rows:
-            s = r.get("score")
-            if s is None:
-                continue
-            j = str(r.get("judge_model", "")).strip()
-            item_id = str(r.get("item_id", "")).strip()
-            metric = str(r.get("metric_name") or "").strip()
-            if cond == "metric_rubric" and metric:
-                key = (cond, metric, item_id)
-            else:
-                key = (cond, "", item_id)
-            judge_item_scores[j][key].append(s)
 
-    judges = sorted(judge_item_scores.keys())
+    def _groups():
+        for (fname, judge, _cond, metric), sl in agg.slices.items():
+            cond = fname_to_condition.get(fname, "")
+            metric = (metric or "").strip()
+            for item_id, scores in sl.by_item().items():
+                if cond == "metric_rubric" and metric:
+                    yield judge, (cond, metric, item_id.strip()), scores
+                else:
+                    yield judge, (cond, "", item_id.strip()), scores
+
+    panel = JudgePanel.from_scores(_groups())
+    judges = panel.judges
     if len(judges) < 2:
         return []
 
-    all_keys = set()
-    for j in judges:
-        all_keys.update(judge_item_scores[j].keys())
-
-    judge_item_mean = {}
-    for j in judges:
-        for key in all_keys:
-            scores = judge_item_scores[j].get(key, [])
-            if scores:
-                judge_item_mean[(j, key)] = sum(scores) / len(scores)
-
-    conditions_in_keys = set()
-    for (cond, metric, _item) in all_keys:
-        conditions_in_keys.add(cond)
-
     cond_labels = {
         "generic_overall": "A",
         "metric_rubric": "B",
         "per_item_custom": "C",
     }
 
-    def _loo_for_keys(keys_subset, judges_subset):
-        mcd_j, mcb_j = {}, {}
-        for j in judges_subset:
-            abs_d, signed_d = [], []
-            for key in keys_subset:
-                if (j, key) not in judge_item_mean:
-                    continue
-                others = [
-                    judge_item_mean[(jj, key)]
-                    for jj in judges_subset
-                    if jj != j and (jj, key) in judge_item_mean
-                ]
-                if not others:
-                    continue
-                diff = judge_item_mean[(j, key)] - sum(others) / len(others)
-                abs_d.append(abs(diff))
-                signed_d.append(diff)
-            mcd_j[j] = sum(abs_d) / len(abs_d) if abs_d else None
-            mcb_j[j] = sum(signed_d) / len(signed_d) if signed_d else None
-        return mcd_j, mcb_j
-
-    overall_mcd, overall_mcb = _loo_for_keys(all_keys, judges)
-
+    overall = loo_consensus(panel)
     per_cond = {}
-    for cond in conditions_in_keys:
-        ckeys = {k for k in all_keys if k[0] == cond}
-        if ckeys:
-            m, b = _loo_for_keys(ckeys, judges)
-            lbl = cond_labels.get(cond, cond)
-            per_cond[lbl] = (m, b)
+    for cond in sorted({c[0] for c in panel.cells}):
+        per_cond[cond_labels.get(cond, cond)] = loo_consensus(panel, panel.cell_mask(lambda c: c[0] == cond))
 
     result = []
     for j in judges:
         row = {
             "Judge": j,
             "Vendor": _api_vendor_label(j),
-            "MCD": round(overall_mcd.get(j) or 0, 1),
-            "MCB": round(overall_mcb.get(j) or 0, 1),
+            "MCD": round(overall[j]["mcd"] or 0, 1),
+            "MCB": round(overall[j]["mcb"] or 0, 1),
         }
         for lbl in ("A", "B", "C"):
             if lbl in per_cond:
-                m, b = per_cond[lbl]
-                row[f"MCD ({lbl})"] = round(m.get(j) or 0, 1) if m.get(j) is not None else None
-                row[f"MCB ({lbl})"] = round(b.get(j) or 0, 1) if b.get(j) is not None else None
+                m, b = per_cond[lbl][j]["mcd"], per_cond[lbl][j]["mcb"]
+                row[f"MCD ({lbl})"] = round(m, 1) if m is not None else None
+                row[f"MCB ({lbl})"] = round(b, 1) if b is not None else None
         result.append(row)
     return result
 
@@ -1488,27 +1435,29 @@ def _rel_econ_combined_charts(rel_econ_combined_df: pd.DataFrame) -> None:
 
 def _iter_judge_slices_for_compare(
     fname: str,
-    rows: list,
+    agg: RowAggregator,
+    metric_name: Optional[str],
 ):
     """
-    Yield (judge_key, slice_rows) for one file after metric filter.
-    judge_key is used for labeling; slice_rows are only that judge's rows.
+    Yield (judge_key, stats) for one file after metric filter.
+    judge_key is used for labeling; stats cover only that judge's rows.
     """
-    judges = _unique_judge_models_in_rows(rows)
+    judges = agg.judges(fname)
     if not judges:
-        if not rows:
+        stats = agg.select(file=fname, metric=metric_name)
+        if not stats.rows:
             return
         jb = (
             fname.replace("mtbench_judge-", "").split("_K")[0]
             if "mtbench_judge-" in fname
             else fname
         )
-        yield jb, rows
+        yield jb, stats
         return
     for j in judges:
-        part = _rows_for_judge_model(rows, j)
-        if part:
-            yield j, part
+        stats = agg.select(file=fname, judge=j, metric=metric_name)
+        if stats.rows:
+            yield j, stats
 
 
 def _normalize_judge_dataset(data):
@@ -1961,10 +1910,11 @@ with tab_view:
             label_to_name = {labels[i]: filtered[i]["name"] for i in range(len(filtered))}
             pick_label = st.selectbox("Result file", labels, key="view_results_file_pick")
             selected = label_to_name[pick_label]
-            path = RESULTS_DIR / selected
-            rows = load_jsonl(path)
+            rows = _result_rows(selected)
             if rows:
-                judges_in_file = _unique_judge_models_in_rows(rows)
+                view_agg = cached_aggregator(RESULTS_DIR / selected)
+                judges_in_file = view_agg.judges()
+                view_judge = None
                 if len(judges_in_file) > 1:
                     _vj = st.selectbox(
                         "Judge model (required for multi-judge files)",
@@ -1975,14 +1925,13 @@ with tab_view:
                             "the selected model’s rows."
                         ),
                     )
-                    rows = _rows_for_judge_model(rows, _vj)
+                    view_judge = _vj
                 elif len(judges_in_file) == 1:
-                    rows = _rows_for_judge_model(rows, judges_in_file[0])
+                    view_judge = judges_in_file[0]
+                if view_judge is not None:
+                    rows = _rows_for_judge_model(rows, view_judge)
 
-                metric_opts = sorted(
-                    {str(r["metric_name"]) for r in rows if r.get("metric_name")},
-                    key=str,
-                )
+                metric_opts = view_agg.metrics(judge=view_judge)
                 view_metric_filter = None
                 if len(metric_opts) == 1:
                     view_metric_filter = metric_opts[0]
@@ -1997,11 +1946,11 @@ with tab_view:
 
                 rows_m = _rows_for_single_metric(rows, view_metric_filter)
                 df = pd.DataFrame(rows_m)
-                by_item = _group_by_item(rows_m)
-                hl = metric_repeat_variability_headlines(by_item)
-                m1 = metric1_per_item_variance(by_item)
-                m2 = metric2_exact_agreement(by_item)
-                counts = metric3_score_histogram(rows_m)
+                view_stats = view_agg.select(judge=view_judge, metric=view_metric_filter)
+                hl = view_stats.headlines()
+                m1 = view_stats.variance()
+                m2 = view_stats.agreement()
+                counts = dict(view_stats.histogram)
 
                 st.subheader("Repeat variability")
                 if hl["n_judgments"]:
@@ -2063,7 +2012,7 @@ with tab_view:
                 st.caption(
                     "Non-zero variance = judge instability (same response, different scores across repeats)."
                 )
-                var_data = [{"item_id": i, "variance": variance(s)} for i, s in by_item.items()]
+                var_data = [{"item_id": i, "variance": v} for i, v in view_stats.item_variances().items()]
                 if var_data:
                     stable = sum(1 for v in var_data if v["variance"] == 0)
                     unstable = len(var_data) - stable
@@ -2221,11 +2170,9 @@ with tab_compare:
         if len(selected) < 1:
             st.info("Select at least one result file.")
         else:
-            loaded_cmp = {fn: load_jsonl(RESULTS_DIR / fn) for fn in selected}
-            metric_sets = [
-                {str(r["metric_name"]) for r in loaded_cmp[fn] if r.get("metric_name")}
-                for fn in selected
-            ]
+            loaded_cmp = {fn: _result_rows(fn) for fn in selected}
+            cmp_agg = _files_aggregator(selected)
+            metric_sets = [set(cmp_agg.metrics(fn)) for fn in selected]
             compare_metric_choice = None
             skip_compare = False
             each_file_has_metrics = all(len(s) > 0 for s in metric_sets)
@@ -2256,19 +2203,19 @@ with tab_compare:
                 for fname in selected:
                     path = RESULTS_DIR / fname
                     summ = _summarize_result_file(path)
-                    rows_metric = _rows_for_single_metric(loaded_cmp[fname], compare_metric_choice)
-                    for judge_key, slice_rows in _iter_judge_slices_for_compare(fname, rows_metric):
+                    cmp_slices = _iter_judge_slices_for_compare(fname, cmp_agg, compare_metric_choice)
+                    for judge_key, slice_stats in cmp_slices:
                         compare_slices.append({
                             "fname": fname,
                             "summ": summ,
                             "judge_key": judge_key,
                             "label": str(judge_key).strip(),
-                            "rows": slice_rows,
+                            "stats": slice_stats,
                         })
 
-                nonempty = [s for s in compare_slices if s["rows"]]
+                nonempty = [s for s in compare_slices if s["stats"].rows]
                 _disambiguate_compare_slice_labels(nonempty)
-                empty_files = [fn for fn in selected if not _rows_for_single_metric(loaded_cmp[fn], compare_metric_choice)]
+                empty_files = [fn for fn in selected if not cmp_agg.select(file=fn, metric=compare_metric_choice).rows]
 
                 if len(nonempty) < 2:
                     st.info(
@@ -2306,17 +2253,11 @@ with tab_compare:
                     multi_file = len(selected) > 1
                     for s in nonempty:
                         summ = s["summ"]
-                        rows = s["rows"]
-                        by_item = _group_by_item(rows)
-                        hl_s = metric_repeat_variability_headlines(by_item)
-                        m1 = metric1_per_item_variance(by_item)
-                        m2 = metric2_exact_agreement(by_item)
-                        mean_score = (
-                            sum(sc for scores in by_item.values() for sc in scores)
-                            / sum(len(scores) for scores in by_item.values())
-                            if by_item
-                            else 0
-                        )
+                        stats = s["stats"]
+                        hl_s = stats.headlines()
+                        m1 = stats.variance()
+                        m2 = stats.agreement()
+                        mean_score = stats.mean_score if stats.n_scored else 0
                         row_out = {
                             "Condition": summ["condition"],
                             "Dataset": summ["dataset_id"],
@@ -2365,11 +2306,11 @@ with tab_compare:
 
                     vendor_agg: dict = {}
                     for s in nonempty:
-                        by_item_v = _group_by_item(s["rows"])
-                        if not by_item_v:
+                        stats = s["stats"]
+                        if not stats.n_scored:
                             continue
-                        m1v = metric1_per_item_variance(by_item_v)
-                        m2v = metric2_exact_agreement(by_item_v)
+                        m1v = stats.variance()
+                        m2v = stats.agreement()
                         vlabel = _api_vendor_label(s["judge_key"])
                         vendor_agg.setdefault(vlabel, []).append({
                             "pct_zero": m1v["pct_items_zero_variance"],
@@ -2485,7 +2426,7 @@ with tab_compare:
                     spread_by_item: dict = {}
                     slice_item_sets: list = []
                     for s in nonempty:
-                        by_item = _group_by_item(s["rows"])
+                        by_item = s["stats"].by_item()
                         item_ids = frozenset(by_item.keys())
                         slice_item_sets.append((s["label"], len(item_ids), item_ids))
                         for item_id, scores in by_item.items():
@@ -2609,6 +2550,49 @@ with tab_run:
         key="run_temp",
         help="0 = deterministic as the API allows; higher = more randomness.",
     )
+    workers_choice = st.number_input(
+        "Parallel requests per provider",
+        min_value=1,
+        max_value=64,
+        value=1,
+        step=1,
+        key="run_workers",
+        help=(
+            "1 = one judgment at a time. Higher values keep that many calls in flight **per API vendor** "
+            "(OpenAI and Anthropic each get their own pool); rows are still written in a fixed order."
+        ),
+    )
+    cache_choice = st.checkbox(
+        "Reuse cached judgments",
+        value=False,
+        key="run_use_cache",
+        help=(
+            "Identical requests (same prompt, judge, temperature and repeat index) are answered from the local "
+            "judgment cache instead of the API. **Leave off for stability experiments** so every row is a fresh sample."
+        ),
+    )
+    multi_sample_choice = st.checkbox(
+        "Multi-sample OpenAI repeats (n = K in one request)",
+        value=False,
+        key="run_multi_sample",
+        help=(
+            "OpenAI judges get all K repeats of a prompt as K choices of **one** request (input tokens paid once). "
+            "**Changes the design:** repeats are no longer independent calls; rows are labelled `sampling_mode`. "
+            "Claude judges still make one call per repeat."
+        ),
+    )
+    budget_usd_choice = st.number_input(
+        "Run budget (USD, 0 = no cap)",
+        min_value=0.0,
+        value=0.0,
+        step=0.5,
+        format="%.2f",
+        key="run_budget_usd",
+        help=(
+            "Stops sending judgments once the estimated spend would exceed this amount, leaving a resumable file. "
+            "Priced with the **per-1M rates** (and per-model overrides) from the **Run summary** tab's Cost inputs."
+        ),
+    )
 
     st.divider()
     st.subheader(
@@ -2707,6 +2691,15 @@ with tab_run:
             st.warning("No `.jsonl` files in **results/** yet. Choose **New JSONL file** or add a partial file first.")
 
     st.divider()
+    dry_run_choice = st.checkbox(
+        "Forecast only (dry run — no API calls)",
+        value=False,
+        key="run_dry_run",
+        help=(
+            "Renders every prompt and reports rows, API requests, estimated tokens and cost (rates from the "
+            "**Run summary** tab) and a wall-clock forecast from `latency_ms` in earlier result files. Nothing is written."
+        ),
+    )
     if st.button("Run experiment", type="primary", key="run_btn"):
         if "Full" in dataset_choice and not input_path.exists():
             st.error("mt_bench_full.json not found. Run: python src/build_mt_bench_full.py")
@@ -2746,9 +2739,25 @@ with tab_run:
                         metric_names=metric_names_arg,
                         dataset_id=input_path.stem,
                         progress_callback=_experiment_progress,
+                        workers=int(workers_choice),
+                        use_cache=bool(cache_choice),
+                        sampling_mode="multi_sample" if multi_sample_choice else "independent",
                     )
                     if resume_path_arg:
                         _run_kw["resume_path"] = resume_path_arg
+                    if budget_usd_choice > 0 or dry_run_choice:
+                        _run_kw["budget"] = {
+                            "max_usd": float(budget_usd_choice) or None,
+                            "rates": {
+                                "openai_in": st.session_state.get("rs_rate_oai_in", 0.0),
+                                "openai_out": st.session_state.get("rs_rate_oai_out", 0.0),
+                                "anthropic_in": st.session_state.get("rs_rate_ant_in", 0.0),
+                                "anthropic_out": st.session_state.get("rs_rate_ant_out", 0.0),
+                            },
+                            "rate_overrides": st.session_state.get("rs_rate_overrides"),
+                        }
+                    if dry_run_choice:
+                        _run_kw["dry_run"] = True
                     if judge_choice == RUN_ALL_JUDGES_LABEL:
                         result = run_experiment(
                             judge_models=list(JUDGE_MODEL_BATCH_PRESETS),
@@ -2759,29 +2768,67 @@ with tab_run:
                             judge_model=judge_choice,
                             **_run_kw,
                         )
-                    out_path = result["output_path"]
-                    exp_n = result["expected_rows"]
-                    got_n = result["written_rows"]
-                    progress_ph.progress(1.0)
-                    cap_ph.caption(f"Complete: **{got_n}** / **{exp_n}** records (validated).")
-                    _slug = CONDITION_FILENAME_SLUG.get(
-                        condition_name,
-                        condition_name.replace("_", "")[:12],
-                    )
-                    st.success(
-                        f"Done. Output: `{out_path}` — **{got_n}** records written "
-                        f"(expected **{exp_n}**; counts match)."
-                    )
-                    if result.get("resumed"):
+                    if result.get("dry_run"):
+                        progress_ph.empty()
+                        cap_ph.caption("Dry run — no API calls were made.")
+                        _wall = result["wall_clock_sec"]
                         st.info(
-                            f"**Resumed** this file: **{result['session_new_rows']}** new rows appended; "
-                            f"**{result['skipped_existing']}** judgment slots were already on disk."
+                            f"**{result['expected_rows']}** rows planned ({result['already_written']} already on disk) · "
+                            f"**{result['requests']}** API requests · est. "
+                            + (f"**${result['est_usd']:.4f}**" if result["est_usd"] is not None else "cost — (no rates set)")
+                            + " · wall-clock "
+                            + (f"**~{_wall / 60.0:.1f} min**" if _wall is not None else "depends on the batch queue")
                         )
-                    st.info(
-                        f"Tagged **{condition_name}** · dataset **{input_path.stem}** · look for `_cond-{_slug}_` in the "
-                        "filename. On **View Results** / **Compare judges & vendors**, set **Condition** (and **Dataset**) to this run."
-                    )
-                    st.session_state[_RUN_RAW_PREVIEW_PATH_KEY] = str(out_path)
+                        st.dataframe(
+                            pd.DataFrame(
+                                [
+                                    {
+                                        "Judge": m,
+                                        "Requests": pm["requests"],
+                                        "Est. input tokens": pm["input_tokens"],
+                                        "Est. output tokens": pm["output_tokens"],
+                                        "Est. USD": round(pm["est_usd"], 4) if pm["est_usd"] is not None else None,
+                                        "Latency p50 (ms)": pm["latency_ms"],
+                                        "Latency from history": pm["latency_from_history"],
+                                    }
+                                    for m, pm in result["per_model"].items()
+                                ]
+                            ),
+                            use_container_width=True,
+                            hide_index=True,
+                        )
+                    else:
+                        out_path = result["output_path"]
+                        exp_n = result["expected_rows"]
+                        got_n = result["written_rows"]
+                        _slug = CONDITION_FILENAME_SLUG.get(
+                            condition_name,
+                            condition_name.replace("_", "")[:12],
+                        )
+                        if result.get("budget_exhausted"):
+                            _spent = result["budget"]
+                            cap_ph.caption(f"Stopped at budget: **{got_n}** / **{exp_n}** records.")
+                            st.warning(
+                                f"Budget reached after **${_spent['spent_usd']:.4f}** — `{out_path}` has **{got_n}** of "
+                                f"**{exp_n}** records. Resume this file with a higher budget to finish."
+                            )
+                        else:
+                            progress_ph.progress(1.0)
+                            cap_ph.caption(f"Complete: **{got_n}** / **{exp_n}** records (validated).")
+                            st.success(
+                                f"Done. Output: `{out_path}` — **{got_n}** records written "
+                                f"(expected **{exp_n}**; counts match)."
+                            )
+                        if result.get("resumed"):
+                            st.info(
+                                f"**Resumed** this file: **{result['session_new_rows']}** new rows appended; "
+                                f"**{result['skipped_existing']}** judgment slots were already on disk."
+                            )
+                        st.info(
+                            f"Tagged **{condition_name}** · dataset **{input_path.stem}** · look for `_cond-{_slug}_` in the "
+                            "filename. On **View Results** / **Compare judges & vendors**, set **Condition** (and **Dataset**) to this run."
+                        )
+                        st.session_state[_RUN_RAW_PREVIEW_PATH_KEY] = str(out_path)
                 except Exception as e:
                     st.error(str(e))
 
@@ -2800,7 +2847,7 @@ with tab_run:
                 help=_help_text("run_latest_results_raw"),
             )
             st.caption(_preview_path.name)
-            rows = load_jsonl(_preview_path)
+            rows = cached_jsonl(_preview_path)
             if rows:
                 st.dataframe(pd.DataFrame(rows), use_container_width=True)
             else:
@@ -2817,7 +2864,9 @@ with tab_run_summary:
     st.caption(
         "Pick every JSONL from a session (e.g. conditions **A**, **B**, **C** on the same benchmark). "
         "**Panel mean score** is the average of each judge’s own mean score (every judge weighted equally). "
-        "**Tokens** are summed from `input_tokens` / `output_tokens` on each row. "
+        "**Tokens** are summed from `input_tokens` / `output_tokens` on each row; Claude prompt-cache reads / writes "
+        f"(`cache_read_input_tokens` / `cache_creation_input_tokens`) are priced at {CACHE_READ_RATE_MULTIPLIER}× / "
+        f"{CACHE_WRITE_RATE_MULTIPLIER}× the input rate. "
         "**Selecting JSONLs does not** fill **Cost inputs** (no prices in JSONL): enter **per-1M rates** yourself, "
         "or set **invoice** totals via CSV **Apply** / manual entry."
     )
@@ -3013,62 +3062,55 @@ with tab_run_summary:
             pooled_by_judge: dict = {}
             conditions_seen: set = set()
             fname_to_condition: dict = {}
-            all_file_rows: dict = {}
+            rs_agg = RowAggregator()
             total_in = total_out = 0
 
             for fname in selected_names:
                 path = RESULTS_DIR / fname
-                rows = load_jsonl(path)
-                all_file_rows[fname] = rows
+                rs_agg.update(cached_aggregator(path))
                 summ = _summarize_result_file(path)
                 fname_to_condition[fname] = summ["condition"]
                 conditions_seen.add(str(summ["condition"]))
-                pmean = _mean_panel_score(rows)
+                pmean = _mean_panel_score(rs_agg, fname)
                 tag = _short_run_tag_from_results_filename(fname)
-                toks = _token_totals_by_judge(rows)
+                toks = _token_totals_by_judge(rs_agg, fname)
                 fin = fout = 0
                 for j, pr in toks.items():
                     fin += pr["in"]
                     fout += pr["out"]
-                    file_judge_toks[(fname, j)] = {"in": pr["in"], "out": pr["out"]}
+                    file_judge_toks[(fname, j)] = dict(pr)
                     if j not in by_judge_all:
-                        by_judge_all[j] = {"in": 0, "out": 0}
-                    by_judge_all[j]["in"] += pr["in"]
-                    by_judge_all[j]["out"] += pr["out"]
+                        by_judge_all[j] = {"in": 0, "out": 0, "cache_read": 0, "cache_write": 0}
+                    for tk in by_judge_all[j]:
+                        by_judge_all[j][tk] += pr[tk]
                 total_in += fin
                 total_out += fout
-                n_scored = sum(1 for r in rows if r.get("score") is not None)
+                n_scored = rs_agg.select(file=fname).n_scored
                 file_stats.append({
                     "File tag": tag,
                     "Filename": fname,
                     "Condition": summ["condition"],
                     "Dataset": summ["dataset_id"],
-                    "Rows": len(rows),
+                    "Rows": rs_agg.select(file=fname).rows,
                     "Rows with score": n_scored,
                     "Panel mean score": round(pmean, 2) if pmean is not None else None,
                     "Input tokens": fin,
                     "Output tokens": fout,
                 })
-                for j in _unique_judge_models_in_rows(rows):
-                    slice_j = _rows_for_judge_model(rows, j)
-                    bucket = pooled_by_judge.setdefault(j, {})
+                for j in rs_agg.judges(fname):
+                    # (fname, metric, stats) slices pooled per judge for the combined rows and charts.
+                    bucket = pooled_by_judge.setdefault(j, [])
                     if summ["condition"] == "metric_rubric":
-                        metrics = sorted(
-                            {str(r.get("metric_name")) for r in slice_j if r.get("metric_name")}
-                        )
-                        for m in metrics:
-                            slice_m = _rows_for_single_metric(slice_j, m)
-                            by_item_m = _group_by_item(slice_m)
-                            for item_id, scores in by_item_m.items():
-                                bucket[f"{fname}\t{m}\t{item_id}"] = list(scores)
-                            rr = _run_summary_rel_row(tag, summ, j, m, by_item_m)
+                        for m in rs_agg.metrics(fname, j):
+                            stats_m = rs_agg.select(file=fname, judge=j, metric=m)
+                            bucket.append((fname, m, stats_m))
+                            rr = _run_summary_rel_row(tag, summ, j, m, stats_m)
                             rr["Filename"] = fname
                             reliability_rows.append(rr)
                     else:
-                        by_item_j = _group_by_item(slice_j)
-                        for item_id, scores in by_item_j.items():
-                            bucket[f"{fname}\t{item_id}"] = list(scores)
-                        rr = _run_summary_rel_row(tag, summ, j, "—", by_item_j)
+                        stats_j = rs_agg.select(file=fname, judge=j)
+                        bucket.append((fname, None, stats_j))
+                        rr = _run_summary_rel_row(tag, summ, j, "—", stats_j)
                         rr["Filename"] = fname
                         reliability_rows.append(rr)
 
@@ -3136,9 +3178,8 @@ with tab_run_summary:
 
             rel_econ_combined_rows: list = []
             for j in sorted(by_judge_all.keys()):
-                by_item_pool = pooled_by_judge.get(j, {})
                 rr = _run_summary_rel_row(
-                    combined_tag, synthetic_summ, j, "—", by_item_pool
+                    combined_tag, synthetic_summ, j, "—", _pool_stats(pooled_by_judge.get(j, []))
                 )
                 rr["Filename"] = "—"
                 econ = _rel_econ_economics_for_judge(
@@ -3194,7 +3235,7 @@ with tab_run_summary:
                 )
                 _rel_econ_mean_score_line_by_condition(reliability_rows, rel_econ_combined_df)
 
-                mcd_mcb_rows = _compute_mcd_mcb(all_file_rows, fname_to_condition)
+                mcd_mcb_rows = _compute_mcd_mcb(rs_agg, fname_to_condition)
                 if mcd_mcb_rows:
                     _rel_econ_mcd_mcb_chart(mcd_mcb_rows, rel_econ_combined_df)
 
@@ -3238,13 +3279,15 @@ with tab_run_summary:
                     rate_overrides,
                 )
                 est = _estimate_vendor_cost_us1m(
-                    float(pr["in"]), float(pr["out"]), _ein, _eout
+                    float(pr["in"]), float(pr["out"]), _ein, _eout, float(pr["cache_read"]), float(pr["cache_write"])
                 )
                 jrows.append({
                     "Judge": j,
                     "Vendor": vendor,
                     "Input tokens": pr["in"],
                     "Output tokens": pr["out"],
+                    "Cache read tokens": pr["cache_read"],
+                    "Cache write tokens": pr["cache_write"],
                     "Est. cost (rates above)": round(est, 4) if has_rates else None,
                 })
             st.dataframe(pd.DataFrame(jrows), use_container_width=True, hide_index=True)
@@ -3270,6 +3313,8 @@ with tab_run_summary:
                     float(pr["out"]),
                     eff_in,
                     eff_out,
+                    float(pr["cache_read"]),
+                    float(pr["cache_write"]),
                 )
                 if is_claude_model(j):
                     est_ant += t
@@ -3373,11 +3418,11 @@ with tab_otel:
             key="otel_file",
         )
         path = RESULTS_DIR / selected
-        rows = load_jsonl(path)
-        if not rows:
+        otel_stats = cached_aggregator(path).select()
+        if not otel_stats.rows:
             st.info("File is empty.")
         else:
-            otel = otel_metrics(rows)
+            otel = otel_stats.otel()
             if otel.get("has_otel"):
                 # ---- Section 1: Run overview ----
                 st.subheader("1. Run overview")
@@ -3396,6 +3441,11 @@ with tab_otel:
                         st.code(tid, language=None)
                     if len(otel.get("trace_ids", [])) > 20:
                         st.caption(f"... and {len(otel['trace_ids']) - 20} more")
+                if otel.get("cache_hits"):
+                    st.caption(
+                        f"**{otel['cache_hits']}** of {otel['total_spans']} rows were served from the judgment cache "
+                        "(no API call; token counts are from the original request)."
+                    )
 
                 if otel.get("total_input_tokens") is not None:
                     # ---- Section 2: Across repeats of the same item (RELIABILITY) ----
@@ -3413,6 +3463,12 @@ with tab_otel:
                         st.metric("Total input tokens", f"{otel['total_input_tokens']:,}")
                     with c3:
                         st.metric("Total output tokens", f"{otel['total_output_tokens']:,}")
+                    if otel.get("total_cache_read_input_tokens") is not None:
+                        st.caption(
+                            f"Prompt cache (Claude): **{otel['total_cache_read_input_tokens']:,}** input tokens read "
+                            f"from cache, **{otel.get('total_cache_creation_input_tokens') or 0:,}** written "
+                            "(not included in total input tokens)."
+                        )
                     # Per-item within-item variance (reliability detail)
                     per_item = otel.get("per_item_token_details", [])
                     if per_item:
@@ -3470,23 +3526,19 @@ with tab_otel:
 with tab_manage:
     st.header("Manage")
     st.caption("View and delete result files from the results directory.")
-    jsonl_files = sorted(RESULTS_DIR.glob("*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True) if RESULTS_DIR.exists() else []
-    if not jsonl_files:
+    catalog = sorted(result_catalog(RESULTS_DIR), key=lambda pm: pm[0].stat().st_mtime, reverse=True)
+    if not catalog:
         st.info("No result files.")
     else:
-        # Build file table with record counts
+        # Build file table with record counts (from each file's run manifest)
         file_info = []
-        for path in jsonl_files:
+        for path, manifest in catalog:
             stat = path.stat()
-            try:
-                rows = load_jsonl(path)
-                n_records = len(rows)
-            except Exception:
-                n_records = 0
             file_info.append({
                 "name": path.name,
                 "path": path,
-                "records": n_records,
+                # None until the file has a manifest (listing does not build one).
+                "records": manifest["rows"] if manifest is not None else None,
                 "size_kb": round(stat.st_size / 1024, 1),
                 "mtime": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M"),
             })
@@ -3514,7 +3566,7 @@ with tab_manage:
         st.divider()
         confirm = False
         if to_delete:
-            total_records = sum(f["records"] for f in file_info if f["path"] in to_delete)
+            total_records = sum(f["records"] or 0 for f in file_info if f["path"] in to_delete)
             st.warning(f"Selected {len(to_delete)} file(s) ({total_records} records total).")
             confirm = st.checkbox("I confirm I want to delete these files", key="manage_confirm")
         if st.button("Delete", type="primary", key="manage_delete_btn", disabled=len(to_delete) == 0):
@@ -3525,6 +3577,12 @@ with tab_manage:
                 for path in to_delete:
                     try:
                         path.unlink()
+                        get_load_cache().invalidate(path)
+                        get_results_db().remove([path])
+                        index_path(path).unlink(missing_ok=True)
+                        manifest_path(path).unlink(missing_ok=True)
+                        parquet_path(path).unlink(missing_ok=True)
+                        justifications_path(path).unlink(missing_ok=True)
                     except Exception as e:
                         errors.append(f"{path.name}: {e}")
                 for err in errors:
@@ -0,0 +1,331 @@
+"""
+Batch-API execution for large judging runs (OpenAI Batch API / Anthropic Message Batches).
+
+The judgment plan is submitted as provider batches (one per judge model, chunked at JUDGE_BATCH_MAX_REQUESTS),
+polled until they end, and the results are mapped back to plan slots by ``custom_id`` (a hash of the slot's
+resume key). Request bodies are exactly what ``call_judge`` sends first (``judge.judge_request_params``), so
+rows written from batch results match the synchronous path.
+
+Batch-level resume: every submitted batch is recorded in a sidecar ``<output>.jsonl.batches.json`` next to the
+results file (with the run's execution_id and config). Resuming that JSONL re-attaches to the recorded
+batches instead of resubmitting — even if no row was written yet.
+
+OpenAI requests follow the same structured-output fallback chain as ``call_judge``: entries a batch rejects for
+their response_format (json_schema on a model without it) are resubmitted in a new batch with the next format
+(json_object, then plain completion). Only entries that fail for other reasons, or after the last format, fall
+back to synchronous calls.
+
+Clients come from ``judge.get_client``, so OPENAI_BASE_URL / ANTHROPIC_BASE_URL point the whole flow at a local
+stand-in batch server (``tests/fake_batch_server.py`` is one).
+Env: JUDGE_BATCH_POLL_SEC (default 30), JUDGE_BATCH_MAX_REQUESTS (10000).
+"""
+
+import hashlib
+import io
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from judge import (
+    JUDGE_RESPONSE_SCHEMA,
+    OPENAI_FORMAT_STEPS,
+    anthropic_cache_usage,
+    get_client,
+    judge_request_params,
+    response_format_rejected,
+)
+from judge_cache import cache_enabled, get_judgment_cache, judgment_cache_key
+from utils import ENCODING
+
+BATCH_POLL_SEC_DEFAULT = 30.0
+BATCH_MAX_REQUESTS_DEFAULT = 10_000
+_OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+_OPENAI_PENDING = {"validating", "in_progress", "finalizing", "cancelling"}
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.environ.get(name) or "").strip()
+    try:
+        return float(raw) if raw else default
+    except ValueError:
+        return default
+
+
+def batch_custom_id(key: tuple) -> str:
+    """Stable per-slot id (≤ 64 chars, ``[A-Za-z0-9_-]``) derived from the ``_judgment_identity`` key."""
+    digest = hashlib.sha256(json.dumps(list(key), default=str).encode("utf-8")).hexdigest()
+    return f"j-{digest[:40]}"
+
+
+def batch_state_path(output_path: Path) -> Path:
+    """Sidecar that records submitted batches for ``output_path``."""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + ".batches.json")
+
+
+def load_batch_state(path: Path) -> Optional[dict]:
+    path = Path(path)
+    if not path.is_file():
+        return None
+    with path.open("r", encoding=ENCODING) as f:
+        return json.load(f)
+
+
+def _save_batch_state(path: Path, state: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding=ENCODING) as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _openai_body_result(body: dict):
+    """(content, input_tokens, output_tokens) from a chat.completion JSON body."""
+    choices = body.get("choices") or []
+    content = ((choices[0].get("message") or {}).get("content") or "").strip() if choices else ""
+    usage = body.get("usage") or {}
+    return content, usage.get("prompt_tokens"), usage.get("completion_tokens")
+
+
+def _anthropic_message_result(message: dict):
+    """(first non-empty text block, input_tokens, output_tokens) from a Messages JSON body."""
+    content = ""
+    for block in message.get("content") or []:
+        if block.get("text"):
+            content = block["text"].strip()
+            break
+    usage = message.get("usage") or {}
+    return content, usage.get("input_tokens"), usage.get("output_tokens")
+
+
+def _submit_openai(model: str, requests: List[dict], execution_id: str) -> str:
+    client = get_client("openai")
+    lines = [
+        json.dumps({"custom_id": r["custom_id"], "method": "POST", "url": _OPENAI_BATCH_ENDPOINT, "body": r["params"]})
+        for r in requests
+    ]
+    payload = ("\n".join(lines) + "\n").encode("utf-8")
+    uploaded = client.files.create(file=("judge_batch.jsonl", io.BytesIO(payload)), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=_OPENAI_BATCH_ENDPOINT,
+        completion_window="24h",
+        metadata={"execution_id": execution_id, "judge_model": model},
+    )
+    return batch.id
+
+
+def _submit_anthropic(model: str, requests: List[dict], execution_id: str) -> str:
+    client = get_client("anthropic")
+    batch = client.messages.batches.create(
+        requests=[{"custom_id": r["custom_id"], "params": r["params"]} for r in requests]
+    )
+    return batch.id
+
+
+def _poll_status(entry: dict) -> str:
+    """Provider status for a recorded batch; ``"ended"`` once results can be fetched."""
+    if entry["provider"] == "anthropic":
+        batch = get_client("anthropic").messages.batches.retrieve(entry["batch_id"])
+        return "ended" if batch.processing_status == "ended" else str(batch.processing_status)
+    batch = get_client("openai").batches.retrieve(entry["batch_id"])
+    entry["output_file_id"] = batch.output_file_id
+    entry["error_file_id"] = batch.error_file_id
+    return str(batch.status) if batch.status in _OPENAI_PENDING else "ended"
+
+
+def _fetch_results(entry: dict) -> Dict[str, dict]:
+    """custom_id → ``{"content", "input_tokens", "output_tokens"}`` or ``{"error": ...}`` for one ended batch."""
+    out: Dict[str, dict] = {}
+    if entry["provider"] == "anthropic":
+        for item in get_client("anthropic").messages.batches.results(entry["batch_id"]):
+            result = item.result
+            if result.type == "succeeded":
+                message = result.message.model_dump()
+                content, tin, tout = _anthropic_message_result(message)
+                out[item.custom_id] = {
+                    "content": content,
+                    "input_tokens": tin,
+                    "output_tokens": tout,
+                    **anthropic_cache_usage(message.get("usage")),
+                }
+            else:
+                out[item.custom_id] = {"error": f"batch result {result.type}"}
+        return out
+
+    client = get_client("openai")
+    for file_id in (entry.get("output_file_id"), entry.get("error_file_id")):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            resp = rec.get("response") or {}
+            if rec.get("error") or resp.get("status_code") != 200:
+                error = str(rec.get("error") or resp.get("body"))
+                out[rec["custom_id"]] = {"error": error}
+                if not rec.get("error") and response_format_rejected(resp.get("status_code"), error):
+                    out[rec["custom_id"]]["format_rejected"] = True
+                continue
+            content, tin, tout = _openai_body_result(resp.get("body") or {})
+            out[rec["custom_id"]] = {"content": content, "input_tokens": tin, "output_tokens": tout}
+    return out
+
+
+def run_judgment_batches(
+    slots: List[dict],
+    *,
+    temperature: float,
+    system_content: str,
+    state_path: Path,
+    execution_id: str,
+    config: dict,
+    use_cache: Optional[bool] = None,
+    poll_sec: Optional[float] = None,
+    max_requests: Optional[int] = None,
+    on_poll: Optional[Callable[[Dict[str, str]], None]] = None,
+) -> Dict[str, dict]:
+    """
+    Judge ``slots`` through provider batch APIs and return custom_id → result.
+
+    A result is ``{"content", "input_tokens", "output_tokens", "batch_id", "cache_hit"}`` (Claude results also
+    carry ``cache_read_input_tokens`` / ``cache_creation_input_tokens``) or
+    ``{"error", "batch_id"}`` for requests the batch did not complete (caller falls back to ``call_judge``).
+    Slots already answered by the judgment cache are not submitted. Batches recorded in ``state_path`` for
+    this execution are re-attached, not resubmitted; ``config`` must match the recorded run config.
+    ``on_poll`` receives ``{batch_id: status}`` after every polling round.
+    """
+    poll = poll_sec if poll_sec is not None else _env_float("JUDGE_BATCH_POLL_SEC", BATCH_POLL_SEC_DEFAULT)
+    chunk = int(max_requests or _env_float("JUDGE_BATCH_MAX_REQUESTS", BATCH_MAX_REQUESTS_DEFAULT))
+    state_path = Path(state_path)
+    state = load_batch_state(state_path)
+    if state is None:
+        state = {"execution_id": execution_id, "config": config, "batches": []}
+    elif state.get("execution_id") != execution_id or state.get("config") != config:
+        raise ValueError(
+            f"Batch state {state_path} belongs to a different run (execution_id / config mismatch); "
+            "remove it or resume with the original settings."
+        )
+
+    results: Dict[str, dict] = {}
+    cache = get_judgment_cache() if cache_enabled(use_cache) else None
+    cache_keys: Dict[str, str] = {}
+    todo: List[dict] = []
+    for slot in slots:
+        cid = batch_custom_id(slot["key"])
+        if cache is not None:
+            ck = judgment_cache_key(
+                slot["prompt"], system_content, slot["judge_model"], temperature, JUDGE_RESPONSE_SCHEMA, slot["idx"]
+            )
+            cache_keys[cid] = ck
+            hit = cache.get(ck)
+            if hit is not None:
+                results[cid] = {
+                    "content": hit[0],
+                    "input_tokens": hit[1],
+                    "output_tokens": hit[2],
+                    "batch_id": None,
+                    "cache_hit": True,
+                }
+                continue
+        todo.append(slot)
+
+    # One round per structured-output format: round n submits (or re-attaches) format n for the slots still open.
+    step = 0
+    while todo:
+        _submit_round(todo, step, state, state_path, system_content, temperature, execution_id, chunk)
+        wanted = {batch_custom_id(s["key"]) for s in todo}
+        active = [
+            b for b in state["batches"] if b.get("format_step", 0) == step and wanted.intersection(b["custom_ids"])
+        ]
+        _await_batches(active, state, state_path, poll, on_poll)
+        for entry in active:
+            for cid, res in _fetch_results(entry).items():
+                if cid not in wanted:
+                    continue
+                res["batch_id"] = entry["batch_id"]
+                res["cache_hit"] = False
+                if "error" not in res and not res["content"]:
+                    res = {"error": "Judge API returned empty response.", "batch_id": entry["batch_id"]}
+                results[cid] = res
+                if cache is not None and "error" not in res:
+                    cache.put(
+                        cache_keys[cid], entry["model"], res["content"], res["input_tokens"], res["output_tokens"]
+                    )
+        step += 1
+        if step >= OPENAI_FORMAT_STEPS:
+            break
+        todo = [s for s in todo if results.get(batch_custom_id(s["key"]), {}).get("format_rejected")]
+        if todo:
+            print(f"[batch] {len(todo)} request(s) rejected their response_format; resubmitting with the next format")
+    for res in results.values():
+        res.pop("format_rejected", None)
+    return results
+
+
+def _submit_round(
+    slots: List[dict],
+    step: int,
+    state: dict,
+    state_path: Path,
+    system_content: str,
+    temperature: float,
+    execution_id: str,
+    chunk: int,
+) -> None:
+    """Submit format ``step`` for the ``slots`` no recorded batch of that step covers, recording each batch."""
+    submitted = {cid for b in state["batches"] if b.get("format_step", 0) == step for cid in b["custom_ids"]}
+    pending: Dict[tuple, List[dict]] = {}
+    for slot in slots:
+        cid = batch_custom_id(slot["key"])
+        if cid in submitted:
+            continue
+        params = judge_request_params(
+            slot["prompt"], slot["judge_model"], system_content, temperature, slot.get("prompt_prefix"), step
+        )
+        pending.setdefault((slot["provider"], slot["judge_model"]), []).append({"custom_id": cid, "params": params})
+
+    for (provider, model), reqs in pending.items():
+        for start in range(0, len(reqs), chunk):
+            part = reqs[start : start + chunk]
+            submit = _submit_anthropic if provider == "anthropic" else _submit_openai
+            batch_id = submit(model, part, execution_id)
+            print(f"[batch] Submitted {provider} batch {batch_id} ({len(part)} requests, {model})")
+            state["batches"].append(
+                {
+                    "batch_id": batch_id,
+                    "provider": provider,
+                    "model": model,
+                    "custom_ids": [r["custom_id"] for r in part],
+                    "format_step": step,
+                    "status": "submitted",
+                    "submitted_at": datetime.utcnow().isoformat() + "Z",
+                }
+            )
+            _save_batch_state(state_path, state)
+
+
+def _await_batches(
+    active: List[dict],
+    state: dict,
+    state_path: Path,
+    poll: float,
+    on_poll: Optional[Callable[[Dict[str, str]], None]],
+) -> None:
+    """Poll ``active`` batches every ``poll`` seconds until all have ended, saving their status each round."""
+    while True:
+        statuses = {}
+        for entry in active:
+            if entry["status"] != "ended":
+                entry["status"] = _poll_status(entry)
+            statuses[entry["batch_id"]] = entry["status"]
+        _save_batch_state(state_path, state)
+        if on_poll:
+            on_poll(statuses)
+        if all(s == "ended" for s in statuses.values()):
+            return
+        print(f"[batch] Waiting on {sum(1 for s in statuses.values() if s != 'ended')} batch(es)…")
+        time.sleep(poll)
@@ -0,0 +1,283 @@
+"""
+Bootstrap confidence intervals for the repeat-stability and consensus metrics.
+
+Scores live in one judge × item × repeat cube (:class:`ScoreCube`), and every replicate is an index draw on it.
+Items are resampled with replacement (the same draw for every judge, so judges stay paired). With
+``resample_repeats``, each (judge, item) cell's repeats are resampled too. This shrinks within-item variance by
+(n−1)/n in expectation, so those intervals sit below the point estimate. Per replicate and judge:
+- mean variance, % items with zero variance, exact agreement (as ``stability_arrays``)
+- leave-one-out MCD and MCB (as ``consensus``)
+
+Items-only replicates are weighted sums of per-cell terms (a draw-count matrix times the cell statistics). With
+repeats, each chunk of replicates is one gather plus a few array reductions. Chunks draw from
+``SeedSequence(seed).spawn``, and their size depends only on the data, so results are the same for any
+``workers``. ``workers > 1`` fans chunks out over a process pool. Intervals are percentile intervals.
+
+CLI: ``python src/bootstrap_ci.py [files…] [--condition C] [--judge M] [--n-boot 2000] [--seed 0] [--repeats]``
+discovers runs like ``compute_mcd`` and prints one table per (condition, metric).
+"""
+
+import argparse
+import os
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+METRICS = ("mean_variance", "pct_items_zero_variance", "mean_agreement_rate", "mcd", "mcb")
+# Upper bound on gathered judge × cell × repeat slots per chunk of replicates.
+_CHUNK_CELLS = 4_000_000
+
+
+class ScoreCube:
+    """Scores per judge × cell × repeat (repeats in row order); ``mask`` marks filled slots."""
+
+    def __init__(self, judges: List[str], cells: List[Hashable], values: np.ndarray, mask: np.ndarray):
+        self.judges = judges
+        self.cells = cells
+        self.values = values
+        self.mask = mask
+
+    @classmethod
+    def from_arrays(cls, judge_of: Sequence, cell_of: Sequence, scores: Sequence) -> "ScoreCube":
+        """From parallel per-judgment sequences (null scores already dropped). Judges and cells are sorted."""
+        if not len(scores):
+            return cls([], [], np.zeros((0, 0, 0)), np.zeros((0, 0, 0), dtype=bool))
+        judges = sorted(set(judge_of))
+        cells = sorted(set(cell_of))
+        j_index = {j: n for n, j in enumerate(judges)}
+        c_index = {c: n for n, c in enumerate(cells)}
+        flat = np.fromiter(
+            (j_index[j] * len(cells) + c_index[c] for j, c in zip(judge_of, cell_of)), dtype=np.int64, count=len(scores)
+        )
+        order = np.argsort(flat, kind="stable")
+        lengths = np.bincount(flat, minlength=len(judges) * len(cells))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        rank = np.empty(len(flat), dtype=np.int64)
+        rank[order] = np.arange(len(flat)) - np.repeat(starts, lengths)
+        shape = (len(judges), len(cells), int(lengths.max()))
+        values = np.zeros(shape)
+        mask = np.zeros(shape, dtype=bool)
+        values[flat // len(cells), flat % len(cells), rank] = np.asarray(scores, dtype=np.float64)
+        mask[flat // len(cells), flat % len(cells), rank] = True
+        return cls(judges, cells, values, mask)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[dict],
+        cell: Callable[[dict], Hashable] = lambda r: str(r.get("item_id", "")),
+        judge: Callable[[dict], str] = lambda r: r["judge_model"],
+    ) -> "ScoreCube":
+        """From results rows; rows with a null score are skipped."""
+        judge_of, cell_of, scores = [], [], []
+        for r in rows:
+            s = r.get("score")
+            if s is not None:
+                judge_of.append(judge(r))
+                cell_of.append(cell(r))
+                scores.append(s)
+        return cls.from_arrays(judge_of, cell_of, scores)
+
+    @classmethod
+    def from_scores(cls, groups: Iterable[Tuple[str, Hashable, Sequence]]) -> "ScoreCube":
+        """From ``(judge, cell, scores)`` groups, e.g. the per-item scores of ``row_aggregator`` slices."""
+        judge_of: list = []
+        cell_of: list = []
+        scores: list = []
+        for j, c, s in groups:
+            judge_of.extend([j] * len(s))
+            cell_of.extend([c] * len(s))
+            scores.extend(s)
+        return cls.from_arrays(judge_of, cell_of, scores)
+
+
+def _cell_stats(values: np.ndarray, mask: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-(judge, cell) terms of the metrics, each ``array[..., J, C]``, for cubes shaped ``[..., J, C, K]``:
+    indicator ``present`` / ``valid`` (scored by the judge / by another judge too) and the summands under them.
+    """
+    n = mask.sum(axis=-1)
+    present = n > 0
+    mean = np.where(mask, values, 0.0).sum(axis=-1) / np.maximum(n, 1)
+    dev = np.where(mask, values - mean[..., None], 0.0)
+    var = np.where(n >= 2, (dev * dev).sum(axis=-1) / np.maximum(n - 1, 1), 0.0)
+    agree = np.zeros(n.shape, dtype=np.int64)
+    for k in range(values.shape[-1]):
+        for l in range(k + 1, values.shape[-1]):
+            agree += mask[..., k] & mask[..., l] & (values[..., k] == values[..., l])
+    pairs = n * (n - 1) // 2
+    col_sum = np.where(present, mean, 0.0).sum(axis=-2, keepdims=True)
+    others = present.sum(axis=-2, keepdims=True) - present
+    valid = present & (others > 0)
+    diff = np.where(valid, mean - (col_sum - mean) / np.maximum(others, 1), 0.0)
+    return {
+        "present": present.astype(np.float64),
+        "valid": valid.astype(np.float64),
+        "mean_variance": np.where(present, var, 0.0),
+        "pct_items_zero_variance": np.where(present & (var == 0), 100.0, 0.0),
+        "mean_agreement_rate": np.where(present, np.where(pairs > 0, agree / np.maximum(pairs, 1), 1.0), 0.0),
+        "mcd": np.abs(diff),
+        "mcb": diff,
+    }
+
+
+def _reduce(stats: Dict[str, np.ndarray], weights: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    ``{metric: array[..., J]}``: each summand averaged over the cells its indicator marks, each cell counted
+    ``weights[..., C]`` times (once when ``None``). Undefined values are NaN.
+    """
+
+    def total(x):
+        return x.sum(axis=-1) if weights is None else weights @ x.T
+
+    n_present = total(stats["present"])
+    n_valid = total(stats["valid"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {m: total(stats[m]) / (n_valid if m in ("mcd", "mcb") else n_present) for m in METRICS}
+
+
+def _chunk_size(cube: ScoreCube) -> int:
+    j, c, k = cube.values.shape
+    return max(1, _CHUNK_CELLS // max(1, j * c * k))
+
+
+def _replicates(
+    cube: ScoreCube, n: int, seed: np.random.SeedSequence, resample_repeats: bool
+) -> Dict[str, np.ndarray]:
+    """``n`` bootstrap replicates of each metric, ``array[n, J]``."""
+    rng = np.random.default_rng(seed)
+    n_judges, n_cells, width = cube.values.shape
+    items = rng.integers(0, n_cells, size=(n, n_cells))
+    if not resample_repeats:
+        # Per-cell terms do not depend on which cells are drawn, so a replicate is a weighted sum of them.
+        weights = np.zeros((n, n_cells))
+        np.add.at(weights, (np.arange(n)[:, None], items), 1.0)
+        return _reduce(_cell_stats(cube.values, cube.mask), weights)
+    values = cube.values[:, items].transpose(1, 0, 2, 3)
+    mask = cube.mask[:, items].transpose(1, 0, 2, 3)
+    counts = mask.sum(axis=-1, keepdims=True)
+    draw = (rng.random((n, n_judges, n_cells, width)) * counts).astype(np.int64)
+    values = np.take_along_axis(values, draw, axis=-1)
+    mask = np.arange(width) < counts
+    return _reduce(_cell_stats(values, mask))
+
+
+def bootstrap(
+    cube: ScoreCube,
+    n_boot: int = 2000,
+    *,
+    seed: int = 0,
+    confidence: float = 0.95,
+    resample_repeats: bool = False,
+    workers: int = 1,
+) -> Dict[str, Dict[str, dict]]:
+    """
+    ``{judge: {metric: {"estimate", "low", "high", "se"}}}`` for the metrics in ``METRICS``; ``estimate`` is the
+    full-sample value and ``low`` / ``high`` the percentile interval. Undefined values (e.g. MCD for a single
+    judge) are ``None``.
+    """
+    if not cube.judges:
+        return {}
+    point = _reduce(_cell_stats(cube.values, cube.mask))
+    size = _chunk_size(cube)
+    sizes = [size] * (n_boot // size) + ([n_boot % size] if n_boot % size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(cube, n, s, resample_repeats) for n, s in zip(sizes, seeds)]
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+            chunks = list(pool.map(_replicates, *zip(*args)))
+    else:
+        chunks = [_replicates(*a) for a in args]
+    tail = (1 - confidence) / 2 * 100
+    out: Dict[str, Dict[str, dict]] = {j: {} for j in cube.judges}
+    for metric in METRICS:
+        reps = np.concatenate([c[metric] for c in chunks])
+        with warnings.catch_warnings():
+            # A metric undefined in every replicate (e.g. MCD for a lone judge) leaves an all-NaN column.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            low, high = np.nanpercentile(reps, [tail, 100 - tail], axis=0)
+            se = np.nanstd(reps, axis=0, ddof=1)
+        for n, j in enumerate(cube.judges):
+            out[j][metric] = {
+                "estimate": _opt(point[metric][n]),
+                "low": _opt(low[n]),
+                "high": _opt(high[n]),
+                "se": _opt(se[n]),
+            }
+    return out
+
+
+def _opt(v) -> Optional[float]:
+    return None if np.isnan(v) else float(v)
+
+
+def _fmt(ci: dict) -> str:
+    if ci["estimate"] is None:
+        return "–"
+    if ci["low"] is None:
+        return f"{ci['estimate']:.2f}"
+    return f"{ci['estimate']:.2f} [{ci['low']:.2f}, {ci['high']:.2f}]"
+
+
+def main() -> None:
+    # Lazy: compute_mcd pulls in the columnar store and manifest catalog, which the library API does not need.
+    from columnar_store import SCORE_COLUMNS, load_rows
+    from compute_mcd import SHORT_NAMES, _ordered_conditions, discover_runs
+
+    parser = argparse.ArgumentParser(description="Bootstrap CIs for repeat stability, agreement, MCD and MCB.")
+    parser.add_argument("paths", nargs="*", help="results files (default: every run in results/ with a manifest)")
+    parser.add_argument("--condition", help="only runs under this condition_name")
+    parser.add_argument("--dataset", help="only runs on this dataset_id")
+    parser.add_argument("--judge", action="append", default=[], help="only these judge_models (repeatable)")
+    parser.add_argument("--n-boot", type=int, default=2000, help="bootstrap replicates (default 2000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default 0)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="interval coverage (default 0.95)")
+    parser.add_argument("--repeats", action="store_true", help="also resample repeats within each item")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    args = parser.parse_args()
+
+    skipped: List[Tuple[Path, str]] = []
+    runs = discover_runs(
+        [Path(p) for p in args.paths],
+        condition=args.condition,
+        dataset=args.dataset,
+        judges=args.judge,
+        skipped=skipped,
+    )
+    if not runs:
+        print("No results runs match the filters.", file=sys.stderr)
+        sys.exit(1)
+    for path, reason in skipped:
+        print(f"Not pooling {path.name}: {reason}", file=sys.stderr)
+    keep = set(args.judge)
+    for cond in _ordered_conditions(runs):
+        rows = [r for p in runs[cond] for r in load_rows(p, SCORE_COLUMNS)]
+        if keep:
+            rows = [r for r in rows if r.get("judge_model") in keep]
+        metrics = sorted({r.get("metric_name") or "" for r in rows}) if cond == "metric_rubric" else [""]
+        for metric in metrics:
+            subset = [r for r in rows if (r.get("metric_name") or "") == metric] if metric else rows
+            cube = ScoreCube.from_rows(subset)
+            result = bootstrap(
+                cube,
+                args.n_boot,
+                seed=args.seed,
+                confidence=args.confidence,
+                resample_repeats=args.repeats,
+                workers=args.workers,
+            )
+            title = f"{cond} / {metric}" if metric else cond
+            print(f"{title}: {len(cube.cells)} items, {args.n_boot} replicates, {args.confidence:.0%} CI")
+            print("| Judge | " + " | ".join(METRICS) + " |")
+            print("|-------|" + "|".join("-" * (len(m) + 2) for m in METRICS) + "|")
+            for j in cube.judges:
+                print(f"| {SHORT_NAMES.get(j, j)} | " + " | ".join(_fmt(result[j][m]) for m in METRICS) + " |")
+            print()
+
+
+if __name__ == "__main__":
+    main()
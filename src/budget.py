@@ -0,0 +1,314 @@
+"""
+Spend caps for judging runs: token and USD budgets per judge model and per run.
+
+Every judgment is estimated before it is sent: prompt + system tokens via ``rate_limit.approx_tokens`` (scaled by
+each judge's observed actual/estimate ratio once rows land) plus that judge's mean output so far. The estimate is
+reserved while the call is in flight and replaced by the row's real ``input_tokens`` / ``output_tokens`` (and
+prompt-cache tokens) when it is written; judgment-cache hits cost nothing. A judgment that would push its judge
+or the run past a cap is not sent, so the run ends with a shorter, resumable JSONL instead of a provider quota
+error. Resuming charges the rows already on disk, so a cap bounds the whole run, not one session.
+
+USD needs per-1M-token rates, resolved like the dashboard's Run summary tab: per-model overrides, else the
+OpenAI / Anthropic defaults. Prompt-cache tokens are priced off the input rate.
+
+Env: JUDGE_BUDGET_USD, JUDGE_BUDGET_TOKENS (whole run), JUDGE_BUDGET_PER_MODEL as JSON
+(``{"gpt-4o": {"max_usd": 2.0, "max_tokens": 500000}}``), and JUDGE_RATE_OPENAI_IN / JUDGE_RATE_OPENAI_OUT /
+JUDGE_RATE_ANTHROPIC_IN / JUDGE_RATE_ANTHROPIC_OUT (USD per 1M tokens).
+"""
+
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from judge import JUDGE_MAX_OUTPUT_TOKENS, is_claude_model
+from rate_limit import approx_tokens
+
+# Anthropic prompt caching, as multiples of the base input rate (5-minute cache writes; reads).
+CACHE_WRITE_RATE_MULTIPLIER = 1.25
+CACHE_READ_RATE_MULTIPLIER = 0.1
+# Output estimate for a judge before any of its rows have landed (JSON score + short justification).
+OUTPUT_TOKENS_SEED = 150
+
+_RATE_ENV = {
+    "openai_in": "JUDGE_RATE_OPENAI_IN",
+    "openai_out": "JUDGE_RATE_OPENAI_OUT",
+    "anthropic_in": "JUDGE_RATE_ANTHROPIC_IN",
+    "anthropic_out": "JUDGE_RATE_ANTHROPIC_OUT",
+}
+
+
+def estimate_vendor_cost_us1m(
+    tin: float,
+    tout: float,
+    rate_in: float,
+    rate_out: float,
+    cache_read: float = 0.0,
+    cache_write: float = 0.0,
+) -> float:
+    """USD from per-1M rates; prompt-cache tokens (not part of ``tin``) are priced off the input rate."""
+    cached_in = cache_write * CACHE_WRITE_RATE_MULTIPLIER + cache_read * CACHE_READ_RATE_MULTIPLIER
+    return ((tin + cached_in) / 1_000_000.0) * rate_in + (tout / 1_000_000.0) * rate_out
+
+
+def effective_rates_for_judge(
+    judge: str,
+    vendor: str,
+    rate_oai_in: float,
+    rate_oai_out: float,
+    rate_ant_in: float,
+    rate_ant_out: float,
+    rate_overrides: Optional[dict],
+) -> Tuple[float, float, bool]:
+    """Resolve input/output USD-per-1M rates: per-judge overrides else vendor defaults."""
+    if vendor == "Anthropic":
+        vin, vout = float(rate_ant_in), float(rate_ant_out)
+    else:
+        vin, vout = float(rate_oai_in), float(rate_oai_out)
+    o = (rate_overrides or {}).get(judge)
+    if not isinstance(o, dict):
+        o = {}
+    rin = o.get("in")
+    rout = o.get("out")
+    eff_in = float(rin) if rin is not None else vin
+    eff_out = float(rout) if rout is not None else vout
+    return eff_in, eff_out, bool(eff_in or eff_out)
+
+
+def _row_tokens(row: dict) -> Tuple[int, int, int, int]:
+    """(input, output, cache_read, cache_write) actually billed for a row; judgment-cache hits bill nothing."""
+    if row.get("cache_hit"):
+        return 0, 0, 0, 0
+    return (
+        int(row.get("input_tokens") or 0),
+        int(row.get("output_tokens") or 0),
+        int(row.get("cache_read_input_tokens") or 0),
+        int(row.get("cache_creation_input_tokens") or 0),
+    )
+
+
+class RunBudget:
+    """Token / USD caps for one run (and per judge), charged from rows and checked before each judgment."""
+
+    def __init__(
+        self,
+        *,
+        max_usd: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        per_model: Optional[Dict[str, dict]] = None,
+        rates: Optional[Dict[str, float]] = None,
+        rate_overrides: Optional[dict] = None,
+        system_content: str = "",
+    ):
+        self.max_usd = float(max_usd) if max_usd else None
+        self.max_tokens = int(max_tokens) if max_tokens else None
+        self.per_model = {str(k).strip(): dict(v) for k, v in (per_model or {}).items()}
+        self.rates = {k: 0.0 for k in _RATE_ENV}
+        self.rates.update({k: float(v) for k, v in (rates or {}).items() if v is not None})
+        self.rate_overrides = dict(rate_overrides or {})
+        self._system_tokens = approx_tokens(system_content)
+        self._lock = threading.Lock()
+        self.spent_tokens: Dict[str, int] = {}
+        self.spent_usd: Dict[str, float] = {}
+        self._reserved: Dict[Tuple, Tuple[str, int, float, int]] = {}
+        self._in_ratio: Dict[str, List[float]] = {}
+        self._out_mean: Dict[str, List[float]] = {}
+        self.exhausted: Dict[str, str] = {}
+        self.skipped = 0
+        # Judgments (slots) let through by gate(); each must end up as a row.
+        self.admitted_slots = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self.max_usd or self.max_tokens or self.per_model)
+
+    def rates_for(self, model: str) -> Tuple[float, float, bool]:
+        vendor = "Anthropic" if is_claude_model(model) else "OpenAI"
+        return effective_rates_for_judge(
+            model,
+            vendor,
+            self.rates["openai_in"],
+            self.rates["openai_out"],
+            self.rates["anthropic_in"],
+            self.rates["anthropic_out"],
+            self.rate_overrides,
+        )
+
+    def check_rates(self, models: Iterable[str]) -> None:
+        """USD caps are meaningless without prices: every judge they apply to needs a rate."""
+        for m in models:
+            usd_cap = self.max_usd or self.per_model.get(m, {}).get("max_usd")
+            if usd_cap and not self.rates_for(m)[2]:
+                raise ValueError(
+                    f"USD budget set but no USD-per-1M rate for judge {m!r}; set JUDGE_RATE_* or pass budget rates."
+                )
+
+    def cost_usd(
+        self, model: str, tin: float, tout: float, cache_read: float = 0.0, cache_write: float = 0.0
+    ) -> float:
+        rin, rout, _ = self.rates_for(model)
+        return estimate_vendor_cost_us1m(tin, tout, rin, rout, cache_read, cache_write)
+
+    def estimate(self, model: str, prompt: str, n_outputs: int = 1) -> Tuple[int, float, int]:
+        """(tokens, USD, raw prompt estimate) for one request with ``n_outputs`` choices."""
+        raw_in = approx_tokens(prompt) + self._system_tokens
+        ratio = self._in_ratio.get(model)
+        tin = raw_in * (ratio[1] / ratio[0] if ratio and ratio[0] else 1.0)
+        out = self._out_mean.get(model)
+        tout = (out[0] / out[1] if out and out[1] else min(OUTPUT_TOKENS_SEED, JUDGE_MAX_OUTPUT_TOKENS)) * n_outputs
+        return int(tin + tout + 0.5), self.cost_usd(model, tin, tout), raw_in
+
+    def seed_output_tokens(self, model: str, mean_output_tokens: float) -> None:
+        """Start ``model``'s output estimate from a known mean (e.g. prior runs) instead of OUTPUT_TOKENS_SEED."""
+        with self._lock:
+            self._out_mean.setdefault(model, [float(mean_output_tokens), 1])
+
+    def _committed(self, model: Optional[str]) -> Tuple[int, float]:
+        """Spent + reserved tokens / USD for one judge (or the whole run when ``model`` is None)."""
+        tokens = sum(v for m, v in self.spent_tokens.items() if model is None or m == model)
+        usd = sum(v for m, v in self.spent_usd.items() if model is None or m == model)
+        for m, t, u, _raw in self._reserved.values():
+            if model is None or m == model:
+                tokens += t
+                usd += u
+        return tokens, usd
+
+    def _over(self, scope: str, committed: Tuple[int, float], add_tokens: int, add_usd: float) -> Optional[str]:
+        caps = (
+            (self.max_tokens, self.max_usd)
+            if scope == "run"
+            else (self.per_model.get(scope, {}).get("max_tokens"), self.per_model.get(scope, {}).get("max_usd"))
+        )
+        max_tokens, max_usd = caps
+        if max_tokens and committed[0] + add_tokens > float(max_tokens):
+            return f"{committed[0]:,} of {int(max_tokens):,} tokens used"
+        if max_usd and committed[1] + add_usd > float(max_usd):
+            return f"${committed[1]:.4f} of ${float(max_usd):.4f} used"
+        return None
+
+    def admit(self, key: Tuple, model: str, prompt: str, n_outputs: int = 1) -> Optional[str]:
+        """
+        Reserve the estimate for one request and return None, or return the scope that is out of budget
+        (``"run"`` or the judge model) without reserving.
+        """
+        tokens, usd, raw_in = self.estimate(model, prompt, n_outputs)
+        with self._lock:
+            for scope in ("run", model):
+                reason = self._over(scope, self._committed(None if scope == "run" else model), tokens, usd)
+                if reason:
+                    self.exhausted.setdefault(scope, reason)
+                    return scope
+            self._reserved[key] = (model, tokens, usd, raw_in)
+        return None
+
+    def charge(self, row: dict, key: Optional[Tuple] = None) -> None:
+        """Replace ``key``'s reservation (if any) with the row's real usage and refine the estimates."""
+        model = str(row.get("judge_model") or "")
+        tin, tout, cread, cwrite = _row_tokens(row)
+        with self._lock:
+            reserved = self._reserved.pop(key, None) if key is not None else None
+            self.spent_tokens[model] = self.spent_tokens.get(model, 0) + tin + tout + cread + cwrite
+            self.spent_usd[model] = self.spent_usd.get(model, 0.0) + self.cost_usd(model, tin, tout, cread, cwrite)
+            if reserved is not None and not row.get("cache_hit") and row.get("input_tokens") is not None:
+                ratio = self._in_ratio.setdefault(model, [0.0, 0.0])
+                ratio[0] += reserved[3]
+                ratio[1] += tin + cread + cwrite
+            if not row.get("cache_hit") and row.get("output_tokens") is not None:
+                out = self._out_mean.setdefault(model, [0.0, 0])
+                out[0] += tout
+                out[1] += 1
+
+    def gate(self, units: Iterable[dict], describe: Callable[[dict], Tuple[Tuple, str, str, int]]) -> Iterator[dict]:
+        """
+        Yield the units that fit the budget, in order. ``describe(unit)`` → (reservation key, judge model,
+        prompt, n outputs). A judge over its own cap is skipped for the rest of the run; once the run cap is
+        reached nothing more is yielded. ``admitted_slots`` counts the judgments yielded (n per unit).
+        """
+        for unit in units:
+            key, model, prompt, n = describe(unit)
+            if model in self.exhausted:
+                self.skipped += 1
+                continue
+            scope = self.admit(key, model, prompt, n)
+            if scope == "run":
+                return
+            if scope is not None:
+                self.skipped += 1
+                continue
+            self.admitted_slots += n
+            yield unit
+
+    def forecast(self, requests: Iterable[Tuple[str, str, int]]) -> Dict[str, Tuple[int, float]]:
+        """Estimated (tokens, USD) per judge for (model, prompt, n outputs) requests, on top of what is spent."""
+        out: Dict[str, Tuple[int, float]] = {}
+        for model, prompt, n in requests:
+            tokens, usd, _ = self.estimate(model, prompt, n)
+            t0, u0 = out.get(model, (0, 0.0))
+            out[model] = (t0 + tokens, u0 + usd)
+        return out
+
+    def fits(self, forecast: Dict[str, Tuple[int, float]]) -> bool:
+        """True when spent + forecast stays within every cap."""
+        total = (sum(t for t, _ in forecast.values()), sum(u for _, u in forecast.values()))
+        if self._over("run", self._committed(None), *total):
+            return False
+        return not any(self._over(m, self._committed(m), t, u) for m, (t, u) in forecast.items())
+
+    def summary(self) -> dict:
+        return {
+            "spent_tokens": sum(self.spent_tokens.values()),
+            "spent_usd": round(sum(self.spent_usd.values()), 6),
+            "spent_by_model": {
+                m: {"tokens": self.spent_tokens[m], "usd": round(self.spent_usd.get(m, 0.0), 6)}
+                for m in self.spent_tokens
+            },
+            "exhausted": dict(self.exhausted),
+            "skipped_requests": self.skipped,
+        }
+
+
+def _env_float(name: str) -> Optional[float]:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def build_run_budget(config: Optional[dict] = None, system_content: str = "") -> Optional[RunBudget]:
+    """
+    Budget from ``config`` merged over env. ``config`` keys: max_usd, max_tokens, per_model
+    (``{model: {"max_usd", "max_tokens"}}``), rates (``openai_in`` / ``openai_out`` / ``anthropic_in`` /
+    ``anthropic_out``, USD per 1M) and rate_overrides (``{model: {"in", "out"}}``, as in the dashboard).
+    Returns None when no cap is set.
+    """
+    budget = budget_from_config(config, system_content)
+    return budget if budget.active else None
+
+
+def budget_from_config(config: Optional[dict] = None, system_content: str = "") -> RunBudget:
+    """Like :func:`build_run_budget` but always returns the budget (uncapped ones still price and estimate)."""
+    cfg = dict(config or {})
+    per_model: Dict[str, dict] = {}
+    raw = (os.environ.get("JUDGE_BUDGET_PER_MODEL") or "").strip()
+    if raw:
+        try:
+            parsed = json.loads(raw)
+        except json.JSONDecodeError:
+            raise ValueError("JUDGE_BUDGET_PER_MODEL must be JSON, e.g. {\"gpt-4o\": {\"max_usd\": 2.0}}.")
+        if isinstance(parsed, dict):
+            per_model.update({str(k).strip(): dict(v) for k, v in parsed.items() if isinstance(v, dict)})
+    for k, v in (cfg.get("per_model") or {}).items():
+        per_model.setdefault(str(k).strip(), {}).update(v)
+    rates = {k: _env_float(env) for k, env in _RATE_ENV.items()}
+    rates.update({k: v for k, v in (cfg.get("rates") or {}).items() if v is not None})
+    return RunBudget(
+        max_usd=cfg["max_usd"] if cfg.get("max_usd") is not None else _env_float("JUDGE_BUDGET_USD"),
+        max_tokens=cfg["max_tokens"] if cfg.get("max_tokens") is not None else _env_float("JUDGE_BUDGET_TOKENS"),
+        per_model=per_model,
+        rates=rates,
+        rate_overrides=cfg.get("rate_overrides"),
+        system_content=system_content,
+    )
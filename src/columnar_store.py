@@ -0,0 +1,283 @@
+"""
+Typed columnar copy of results JSONLs (Parquet via pyarrow), so analysis reads only the columns it needs.
+
+``export_parquet`` converts ``<run>.jsonl`` in bounded-memory chunks into ``<run>.parquet``, which holds the
+analysis columns (:data:`RESULT_COLUMNS`). The free text goes to ``<run>.justifications.parquet`` instead: the
+justification, span_status_message and judge_instructions, keyed by row number. Each Parquet file records the
+source JSONL's size and mtime in its schema metadata, so a copy goes stale once the JSONL changes (resume
+appends to it).
+
+Exporting is an explicit step (the CLI below, or ``export_parquet``); reading never writes files. ``load_rows(path,
+columns)`` is what the metric code calls: with pyarrow installed and a fresh Parquet copy it reads just
+``columns`` from it, otherwise (no copy, a stale one, no pyarrow, or JUDGE_COLUMNAR=0) it parses the JSONL and
+projects the same columns, so callers see identical row dicts either way. ``read_table`` / ``read_tables`` return
+Arrow tables for vectorised consumers, converting the JSONL in memory when there is no fresh copy.
+
+pyarrow is optional: ``pip install pyarrow``. Export from the CLI with
+``python src/columnar_store.py [--force] [results/*.jsonl]``.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from utils import ENCODING, REPO_ROOT, load_jsonl
+
+RESULTS_DIR = REPO_ROOT / "results"
+COLUMNAR_FORMAT_VERSION = "1"
+EXPORT_CHUNK_ROWS = 50_000
+
+# (name, arrow type name); built lazily so importing this module does not need pyarrow.
+RESULT_FIELDS = (
+    ("execution_id", "string"),
+    ("trace_id", "string"),
+    ("span_id", "string"),
+    ("condition_name", "string"),
+    ("dataset_id", "string"),
+    ("judge_model", "string"),
+    ("item_id", "string"),
+    ("idx", "int32"),
+    ("metric_name", "string"),
+    ("score", "int32"),
+    ("score_min", "int32"),
+    ("score_max", "int32"),
+    ("temperature", "float64"),
+    ("latency_ms", "float64"),
+    ("input_tokens", "int64"),
+    ("output_tokens", "int64"),
+    ("cache_read_input_tokens", "int64"),
+    ("cache_creation_input_tokens", "int64"),
+    ("cache_hit", "bool_"),
+    ("multi_judge_run", "bool_"),
+    ("sampling_mode", "string"),
+    ("n_choices", "int32"),
+    ("repeats_planned", "int32"),
+    ("early_stop", "string"),
+    ("execution_mode", "string"),
+    ("span_status", "string"),
+    ("created_at", "string"),
+)
+TEXT_FIELDS = (
+    ("row", "int64"),
+    ("justification", "string"),
+    ("span_status_message", "string"),
+    ("judge_instructions", "string"),
+)
+RESULT_COLUMNS = tuple(name for name, _ in RESULT_FIELDS)
+
+# Column sets the metric code reads.
+SCORE_COLUMNS = ("judge_model", "item_id", "idx", "metric_name", "score")
+METRICS_COLUMNS = SCORE_COLUMNS + (
+    "condition_name",
+    "execution_id",
+    "trace_id",
+    "span_status",
+    "input_tokens",
+    "output_tokens",
+    "cache_hit",
+    "sampling_mode",
+    "early_stop",
+    "repeats_planned",
+)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("pyarrow package is not installed. Run: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def columnar_enabled() -> bool:
+    """pyarrow importable and not switched off with JUDGE_COLUMNAR=0."""
+    if (os.environ.get("JUDGE_COLUMNAR") or "1").strip().lower() in ("0", "false", "off", "no"):
+        return False
+    try:
+        _pyarrow()
+    except RuntimeError:
+        return False
+    return True
+
+
+def parquet_path(results_path: Path) -> Path:
+    results_path = Path(results_path)
+    return results_path.with_name(results_path.stem + ".parquet")
+
+
+def justifications_path(results_path: Path) -> Path:
+    results_path = Path(results_path)
+    return results_path.with_name(results_path.stem + ".justifications.parquet")
+
+
+def _schema(fields):
+    pa, _ = _pyarrow()
+    return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in fields])
+
+
+def _source_stamp(results_path: Path) -> Dict[bytes, bytes]:
+    stat = Path(results_path).stat()
+    return {
+        b"columnar_format": COLUMNAR_FORMAT_VERSION.encode(),
+        b"source_bytes": str(stat.st_size).encode(),
+        b"source_mtime_ns": str(stat.st_mtime_ns).encode(),
+    }
+
+
+def is_fresh(results_path: Path) -> bool:
+    """Both Parquet files exist and were exported from the JSONL as it is now."""
+    _, pq = _pyarrow()
+    out = parquet_path(results_path)
+    if not out.is_file() or not justifications_path(results_path).is_file():
+        return False
+    try:
+        meta = pq.read_schema(out).metadata or {}
+    except Exception:
+        return False
+    want = _source_stamp(results_path)
+    return all(meta.get(k) == v for k, v in want.items())
+
+
+def _cast(value, type_name: str):
+    if value is None:
+        return None
+    if type_name.startswith("int"):
+        return int(value)
+    if type_name == "float64":
+        return float(value)
+    if type_name == "bool_":
+        return bool(value)
+    return str(value)
+
+
+def _column(pa, values: list, type_name: str, arrow_type):
+    # Fast path lets Arrow convert natively typed values; mixed legacy values (e.g. numeric item_ids) are cast.
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+        return pa.array([_cast(v, type_name) for v in values], type=arrow_type)
+
+
+def _chunk_table(pa, chunk: List[dict], fields, schema, first_row: Optional[int] = None):
+    """Arrow table of ``chunk`` over ``fields``; with ``first_row`` the leading ``row`` field is numbered from it."""
+    cols = [
+        _column(pa, [r.get(name) for r in chunk], t, schema.field(name).type)
+        for name, t in (fields if first_row is None else fields[1:])
+    ]
+    if first_row is not None:
+        cols.insert(0, pa.array(range(first_row, first_row + len(chunk)), pa.int64()))
+    return pa.Table.from_arrays(cols, schema=schema)
+
+
+def _jsonl_table(results_path: Path, fields, chunk_rows: int = EXPORT_CHUNK_ROWS, numbered: bool = False):
+    """The JSONL converted in memory (what a fresh Parquet copy would hold); nothing is written."""
+    pa, _ = _pyarrow()
+    schema = _schema(fields)
+    tables = []
+    row_no = 0
+    for chunk in _iter_chunks(results_path, chunk_rows):
+        tables.append(_chunk_table(pa, chunk, fields, schema, row_no if numbered else None))
+        row_no += len(chunk)
+    return pa.concat_tables(tables) if tables else schema.empty_table()
+
+
+def _iter_chunks(results_path: Path, chunk_rows: int) -> Iterable[List[dict]]:
+    chunk: List[dict] = []
+    with Path(results_path).open("r", encoding=ENCODING) as f:
+        for line in f:
+            if line.strip():
+                chunk.append(json.loads(line))
+                if len(chunk) >= chunk_rows:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_parquet(results_path: Path, *, force: bool = False, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Path:
+    """
+    Write ``<run>.parquet`` and ``<run>.justifications.parquet`` for ``results_path`` (skipped when both are
+    fresh, unless ``force``). Rows are converted ``chunk_rows`` at a time. Returns the Parquet path.
+    """
+    pa, pq = _pyarrow()
+    results_path = Path(results_path)
+    out, text_out = parquet_path(results_path), justifications_path(results_path)
+    if not force and is_fresh(results_path):
+        return out
+    stamp = _source_stamp(results_path)
+    schema = _schema(RESULT_FIELDS).with_metadata(stamp)
+    text_schema = _schema(TEXT_FIELDS).with_metadata(stamp)
+    tmp, text_tmp = out.with_name(out.name + ".tmp"), text_out.with_name(text_out.name + ".tmp")
+    row_no = 0
+    with pq.ParquetWriter(tmp, schema) as writer, pq.ParquetWriter(text_tmp, text_schema) as text_writer:
+        for chunk in _iter_chunks(results_path, chunk_rows):
+            writer.write_table(_chunk_table(pa, chunk, RESULT_FIELDS, schema))
+            text_writer.write_table(_chunk_table(pa, chunk, TEXT_FIELDS, text_schema, row_no))
+            row_no += len(chunk)
+    os.replace(tmp, out)
+    os.replace(text_tmp, text_out)
+    return out
+
+
+def read_table(results_path: Path, columns: Optional[Sequence[str]] = None):
+    """
+    Arrow table of ``columns`` (default: all of :data:`RESULT_COLUMNS`): from the Parquet copy when it is fresh,
+    else converted from the JSONL in memory.
+    """
+    _, pq = _pyarrow()
+    columns = list(columns) if columns is not None else None
+    if is_fresh(results_path):
+        return pq.read_table(parquet_path(results_path), columns=columns)
+    table = _jsonl_table(results_path, RESULT_FIELDS)
+    return table.select(columns) if columns is not None else table
+
+
+def read_tables(paths: Iterable[Path], columns: Optional[Sequence[str]] = None):
+    """One Arrow table over many runs, with a ``source_file`` column naming each row's JSONL."""
+    pa, _ = _pyarrow()
+    tables = []
+    for path in paths:
+        table = read_table(path, columns)
+        source = pa.array([Path(path).name] * table.num_rows, pa.string())
+        tables.append(table.append_column("source_file", source))
+    return pa.concat_tables(tables) if tables else None
+
+
+def read_justifications(results_path: Path):
+    """Arrow table of row number → justification / span_status_message / judge_instructions."""
+    _, pq = _pyarrow()
+    if is_fresh(results_path):
+        return pq.read_table(justifications_path(results_path))
+    return _jsonl_table(results_path, TEXT_FIELDS, numbered=True)
+
+
+def load_rows(results_path: Path, columns: Optional[Sequence[str]] = None) -> List[dict]:
+    """
+    Row dicts restricted to ``columns`` (all analysis columns when ``None``), from the Parquet copy when
+    columnar reads are enabled and the copy is fresh, else from the JSONL. Justification text is not included.
+    """
+    columns = tuple(columns) if columns is not None else RESULT_COLUMNS
+    if columnar_enabled() and is_fresh(results_path):
+        _, pq = _pyarrow()
+        return pq.read_table(parquet_path(results_path), columns=list(columns)).to_pylist()
+    types = dict(RESULT_FIELDS)
+    return [{c: _cast(r.get(c), types[c]) for c in columns} for r in load_jsonl(Path(results_path))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export results JSONLs to Parquet (<run>.parquet).")
+    parser.add_argument("paths", nargs="*", help="results files (default: every results/*.jsonl)")
+    parser.add_argument("--force", action="store_true", help="re-export files whose Parquet copy is fresh")
+    args = parser.parse_args()
+    paths = [Path(p) for p in args.paths] or sorted(RESULTS_DIR.glob("*.jsonl"))
+    for path in paths:
+        was_fresh = not args.force and is_fresh(path)
+        out = export_parquet(path, force=args.force)
+        print(f"{path.name}: {'up to date' if was_fresh else 'exported'} → {out.name}")
+
+
+if __name__ == "__main__":
+    main()
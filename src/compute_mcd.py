@@ -2,25 +2,45 @@
 Mean Consensus Deviation (MCD) and Mean Consensus Bias (MCB) — leave-one-out.
 
 For each (judge, item) pair, consensus is the mean of the *other* judges' scores
-on that item (the evaluated judge is excluded).
+on that item (the evaluated judge is excluded). Computed by ``consensus.loo_consensus``.
 
   MCD = mean |judge_score − LOO_consensus|   (magnitude of disagreement)
   MCB = mean  (judge_score − LOO_consensus)  (signed: +lenient, −harsh)
 
+Runs are discovered from the run manifests (``run_manifest.result_catalog``) and grouped by condition. Runs of
+the same condition are pooled only when they are compatible, so a panel split over several files is one table:
+same dataset_id, temperature, repeats and sampling_mode (:data:`POOL_KEYS`), and no judge in two runs (which
+would turn two K-repeat runs into 2K "repeats" per cell). Newest runs win; the others are reported, not merged.
+Every metric a metric_rubric run contains gets its own table, and the condition row is their mean. Conditions are evaluated in parallel
+worker processes (one per condition).
+
 Usage:
-    python src/compute_mcd.py                       # prints tables to stdout
-    python src/compute_mcd.py --out docs/mcd_results.md   # also writes markdown
+    python src/compute_mcd.py                                   # every run in results/, tables to stdout
+    python src/compute_mcd.py --dataset mt_bench_full --judge gpt-4o --judge gpt-4o-mini
+    python src/compute_mcd.py --where repeats=5 --where temperature=0.0
+    python src/compute_mcd.py results/a.jsonl results/b.jsonl   # explicit runs
+    python src/compute_mcd.py --out docs/mcd_results.md --json docs/mcd_results.json --csv docs/mcd_results.csv
 """
 
+import argparse
+import csv
+import io
 import json
+import os
 import sys
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from columnar_store import SCORE_COLUMNS, load_rows
+from consensus import JudgePanel, loo_consensus
+from run_manifest import RESULTS_DIR, build_manifest, load_manifest, result_catalog
+from utils import ENCODING, REPO_ROOT
 
-RESULT_FILES = {
-    "A": "results/mtbench_judge-multi7judges_cond-gen_K5_t0p0_20260405T142328.jsonl",
-    "B": "results/mtbench_judge-multi7judges_cond-metric_K5_t0p0_20260405T174020.jsonl",
-    "C": "results/mtbench_judge-multi7judges_cond-custom_K5_t0p0_20260405T163013.jsonl",
+CONDITION_LABELS = {
+    "generic_overall": "A — Generic overall",
+    "metric_rubric": "B — Metric rubric",
+    "per_item_custom": "C — Per-item custom",
 }
 
 SHORT_NAMES = {
@@ -33,17 +53,10 @@ SHORT_NAMES = {
     "gpt-4o-mini": "GPT-4o mini",
 }
 
-B_METRICS = ["accuracy", "relevance", "completeness"]
-
-
-def _load_jsonl(path):
-    rows = []
-    with open(path, encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                rows.append(json.loads(line))
-    return rows
+FIELDS = ("rs", "mcd", "mcb", "mean_score")
+# Manifest config fields that must agree for runs of one condition to be pooled.
+POOL_KEYS = ("dataset_id", "temperature", "repeats", "sampling_mode")
+CSV_COLUMNS = ("condition", "metric", "judge", "rs", "mcd", "mcb", "mean_score", "n_cells")
 
 
 def compute_rs_mcd_mcb(rows, metric_filter=None):
@@ -55,58 +68,179 @@ def compute_rs_mcd_mcb(rows, metric_filter=None):
     if metric_filter:
         rows = [r for r in rows if r.get("metric_name") == metric_filter]
 
-    judge_item = defaultdict(list)
-    for r in rows:
-        s = r.get("score")
-        if s is not None:
-            judge_item[(r["judge_model"], r["item_id"])].append(s)
-
-    judges = sorted(set(k[0] for k in judge_item))
-    items = sorted(set(k[1] for k in judge_item))
-
-    # RS% per judge (% items with zero variance across repeats)
-    rs = {}
-    for j in judges:
-        zero_var = total = 0
-        for i in items:
-            scores = judge_item.get((j, i), [])
-            if len(scores) >= 2:
-                total += 1
-                if len(set(scores)) == 1:
-                    zero_var += 1
-        rs[j] = (zero_var / total * 100) if total > 0 else 0
-
-    # Per-judge per-item mean score
-    judge_item_mean = {}
-    for (j, i), scores in judge_item.items():
-        judge_item_mean[(j, i)] = sum(scores) / len(scores)
-
-    # Leave-one-out consensus: for judge j on item i, consensus = mean of other judges
-    mcd = {}
-    mcb = {}
-    mean_score = {}
-    for j in judges:
-        abs_devs, signed_devs, sc = [], [], []
-        for i in items:
-            if (j, i) not in judge_item_mean:
-                continue
-            others = [
-                judge_item_mean[(jj, i)]
-                for jj in judges
-                if jj != j and (jj, i) in judge_item_mean
-            ]
-            if not others:
-                continue
-            loo_consensus = sum(others) / len(others)
-            diff = judge_item_mean[(j, i)] - loo_consensus
-            abs_devs.append(abs(diff))
-            signed_devs.append(diff)
-            sc.append(judge_item_mean[(j, i)])
-        mcd[j] = sum(abs_devs) / len(abs_devs) if abs_devs else 0
-        mcb[j] = sum(signed_devs) / len(signed_devs) if signed_devs else 0
-        mean_score[j] = sum(sc) / len(sc) if sc else 0
-
-    return judges, items, rs, mcd, mcb, mean_score
+    panel = JudgePanel.from_rows(rows)
+    loo = loo_consensus(panel)
+    judges = panel.judges
+    rs = {j: loo[j]["rs"] for j in judges}
+    mcd = {j: loo[j]["mcd"] if loo[j]["mcd"] is not None else 0 for j in judges}
+    mcb = {j: loo[j]["mcb"] if loo[j]["mcb"] is not None else 0 for j in judges}
+    mean_score = {j: loo[j]["mean_score"] if loo[j]["mean_score"] is not None else 0 for j in judges}
+    return judges, panel.cells, rs, mcd, mcb, mean_score
+
+
+def _config_matches(config: dict, where: Dict[str, str]) -> bool:
+    """``key=value`` filters against the manifest config; list fields match when they contain the value."""
+    for key, want in where.items():
+        have = config.get(key)
+        if isinstance(have, list):
+            if want not in [str(v) for v in have]:
+                return False
+        elif str(have) != want:
+            return False
+    return True
+
+
+def discover_runs(
+    paths: Optional[Sequence[Path]] = None,
+    *,
+    condition: Optional[str] = None,
+    dataset: Optional[str] = None,
+    judges: Sequence[str] = (),
+    where: Optional[Dict[str, str]] = None,
+    results_dir: Optional[Path] = None,
+    skipped: Optional[List[Tuple[Path, str]]] = None,
+) -> Dict[str, List[Path]]:
+    """
+    ``{condition_name: [results paths]}`` for the runs whose manifest matches the filters: every run in
+    ``results_dir`` (default ``results/``), or just ``paths``. A run matches ``judges`` if it has any of them.
+    A run without a fresh manifest gets one built in memory (nothing is written); runs without rows or that
+    cannot be read are left out.
+
+    Each condition keeps only runs that can be pooled with its newest run: matching :data:`POOL_KEYS` and no
+    judge (of those selected) already taken from a newer run. If ``skipped`` is a list it receives
+    ``(path, reason)`` for every matching run left out that way.
+    """
+    if paths:
+        catalog = [(Path(p), load_manifest(Path(p))) for p in paths]
+    else:
+        catalog = result_catalog(results_dir)
+    for n, (path, manifest) in enumerate(catalog):
+        if manifest is None:
+            try:
+                catalog[n] = (path, build_manifest(path))
+            except (OSError, ValueError) as e:
+                print(f"Could not read {path.name}: {e}", file=sys.stderr)
+    where = dict(where or {})
+    if condition:
+        where["condition_name"] = condition
+    if dataset:
+        where["dataset_id"] = dataset
+    candidates: Dict[str, list] = {}
+    for path, manifest in catalog:
+        config = (manifest or {}).get("config")
+        if not config or not manifest.get("rows"):
+            continue
+        if judges and not set(judges) & set(config.get("judge_models") or []):
+            continue
+        if _config_matches(config, where):
+            candidates.setdefault(config["condition_name"], []).append((path, manifest))
+    runs: Dict[str, List[Path]] = {}
+    for condition, group in candidates.items():
+        kept, reasons = _poolable(group, judges)
+        runs[condition] = kept
+        if skipped is not None:
+            skipped.extend(reasons)
+    return runs
+
+
+def _poolable(group: list, judges: Sequence[str] = ()) -> Tuple[List[Path], List[Tuple[Path, str]]]:
+    """
+    Split ``[(path, manifest)]`` of one condition into the runs pooled with its newest run (sorted by name) and
+    ``(path, reason)`` for the rest.
+    """
+    newest_first = sorted(group, key=lambda pm: (pm[1].get("created_at_max") or "", pm[0].name), reverse=True)
+    base_path, base_manifest = newest_first[0]
+    base = {k: base_manifest["config"].get(k) for k in POOL_KEYS}
+    taken: Dict[str, Path] = {}
+    kept: List[Path] = []
+    reasons: List[Tuple[Path, str]] = []
+    for path, manifest in newest_first:
+        config = manifest["config"]
+        differ = [f"{k}={config.get(k)!r} (not {base[k]!r})" for k in POOL_KEYS if config.get(k) != base[k]]
+        run_judges = [j for j in config.get("judge_models") or [] if not judges or j in judges]
+        clash = [j for j in run_judges if j in taken]
+        if differ:
+            reasons.append((path, f"differs from {base_path.name}: {', '.join(differ)}"))
+        elif clash:
+            reasons.append((path, f"judge {clash[0]} is already taken from {taken[clash[0]].name}"))
+        else:
+            kept.append(path)
+            taken.update((j, path) for j in run_judges)
+    return sorted(kept, key=lambda p: p.name), reasons
+
+
+def _ordered_conditions(conditions) -> List[str]:
+    """A, B, C first, then any other condition by name."""
+    known = [c for c in CONDITION_LABELS if c in conditions]
+    return known + sorted(c for c in conditions if c not in CONDITION_LABELS)
+
+
+def _mean_of(entries: List[dict], field: str) -> Optional[float]:
+    values = [e[field] for e in entries if e.get(field) is not None]
+    return sum(values) / len(values) if values else None
+
+
+def evaluate_condition(
+    condition: str, paths: Sequence[Path], judges: Sequence[str] = (), metrics: Sequence[str] = ()
+) -> dict:
+    """
+    RS% / MCD / MCB / mean score per judge for one condition, pooling the rows of ``paths``. metric_rubric
+    runs get one table per metric (``metrics`` restricts which) and a summary that is their mean.
+    """
+    rows = [r for p in paths for r in load_rows(Path(p), SCORE_COLUMNS)]
+    if judges:
+        keep = set(judges)
+        rows = [r for r in rows if r.get("judge_model") in keep]
+    rubric = condition == "metric_rubric"
+    panel = JudgePanel.from_rows(
+        rows, cell=lambda r: ((r.get("metric_name") or "") if rubric else "", str(r.get("item_id", "")))
+    )
+    names = sorted({c[0] for c in panel.cells})
+    if rubric and metrics:
+        names = [m for m in names if m in metrics]
+    by_metric = {m: loo_consensus(panel, panel.cell_mask(lambda c, m=m: c[0] == m)) for m in names}
+    summary = {}
+    for j in panel.judges:
+        entries = [by_metric[m][j] for m in names]
+        summary[j] = {f: _mean_of(entries, f) for f in FIELDS}
+        summary[j]["n_cells"] = sum(e["n_cells"] for e in entries)
+    return {
+        "condition": condition,
+        "runs": [Path(p).name for p in paths],
+        "rows": len(rows),
+        "judges": panel.judges,
+        "metrics": {m: by_metric[m] for m in names if m},
+        "summary": summary,
+    }
+
+
+def evaluate(
+    runs: Dict[str, List[Path]],
+    *,
+    judges: Sequence[str] = (),
+    metrics: Sequence[str] = (),
+    workers: Optional[int] = None,
+) -> dict:
+    """
+    Per-condition tables for every condition in ``runs`` (see :func:`discover_runs`) plus the cross-condition
+    overall (mean over the conditions a judge appears in). Conditions run in up to ``workers`` processes
+    (default: one per condition, capped at the CPU count); ``workers=1`` evaluates them in this process.
+    """
+    conditions = _ordered_conditions(runs)
+    workers = min(len(conditions), workers or os.cpu_count() or 1)
+    args = [(c, runs[c], tuple(judges), tuple(metrics)) for c in conditions]
+    if workers <= 1:
+        results = [evaluate_condition(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(evaluate_condition, *zip(*args)))
+    by_condition = {r["condition"]: r for r in results}
+    all_judges = sorted({j for r in results for j in r["judges"]})
+    overall = {}
+    for j in all_judges:
+        entries = [r["summary"][j] for r in results if j in r["summary"]]
+        overall[j] = {f: _mean_of(entries, f) for f in FIELDS}
+    return {"judges": all_judges, "conditions": by_condition, "overall": overall}
 
 
 def _pearson(xs, ys):
@@ -119,159 +253,248 @@ def _pearson(xs, ys):
     return cov / (sx * sy) if sx * sy > 0 else 0
 
 
-def main():
-    repo = Path(__file__).resolve().parent.parent
-    out_path = None
-    if "--out" in sys.argv:
-        idx = sys.argv.index("--out")
-        if idx + 1 < len(sys.argv):
-            out_path = repo / sys.argv[idx + 1]
-
-    paths = {k: repo / v for k, v in RESULT_FILES.items()}
-    for k, p in paths.items():
-        if not p.exists():
-            print(f"Missing result file for condition {k}: {p}", file=sys.stderr)
-            sys.exit(1)
-
-    a_rows = _load_jsonl(paths["A"])
-    b_rows = _load_jsonl(paths["B"])
-    c_rows = _load_jsonl(paths["C"])
-
-    judges_a, _, rs_a, mcd_a, mcb_a, ms_a = compute_rs_mcd_mcb(a_rows)
-
-    b_rs, b_mcd, b_mcb, b_ms = {}, {}, {}, {}
-    for m in B_METRICS:
-        _, _, rs_m, mcd_m, mcb_m, ms_m = compute_rs_mcd_mcb(b_rows, m)
-        b_rs[m], b_mcd[m], b_mcb[m], b_ms[m] = rs_m, mcd_m, mcb_m, ms_m
-
-    judges = judges_a
-    rs_b = {j: sum(b_rs[m][j] for m in B_METRICS) / 3 for j in judges}
-    mcd_b = {j: sum(b_mcd[m][j] for m in B_METRICS) / 3 for j in judges}
-    mcb_b = {j: sum(b_mcb[m][j] for m in B_METRICS) / 3 for j in judges}
-    ms_b = {j: sum(b_ms[m][j] for m in B_METRICS) / 3 for j in judges}
-
-    _, _, rs_c, mcd_c, mcb_c, ms_c = compute_rs_mcd_mcb(c_rows)
-
-    rs_all = {j: (rs_a[j] + rs_b[j] + rs_c[j]) / 3 for j in judges}
-    mcd_all = {j: (mcd_a[j] + mcd_b[j] + mcd_c[j]) / 3 for j in judges}
-    mcb_all = {j: (mcb_a[j] + mcb_b[j] + mcb_c[j]) / 3 for j in judges}
-    ms_all = {j: (ms_a[j] + ms_b[j] + ms_c[j]) / 3 for j in judges}
-
-    # --- Build output lines ---
+def _short_label(condition: str) -> str:
+    return CONDITION_LABELS[condition].split(" — ")[0] if condition in CONDITION_LABELS else condition
+
+
+def _num(v, suffix="") -> str:
+    return f"{v:.1f}{suffix}" if v is not None else "–"
+
+
+def _sign_str(v) -> str:
+    if v is None:
+        return "–"
+    return f"+{v:.1f}" if v >= 0 else f"{v:.1f}"
+
+
+def _panel_mean(entries: Dict[str, dict], judges: Sequence[str], field: str) -> Optional[float]:
+    return _mean_of([entries[j] for j in judges if j in entries], field)
+
+
+def render_markdown(report: dict) -> str:
+    judges = report["judges"]
+    conditions = report["conditions"]
+    overall = report["overall"]
     lines = []
 
     def p(s=""):
         lines.append(s)
 
+    def name(j):
+        return SHORT_NAMES.get(j, j)
+
     p("# Mean Consensus Deviation (MCD) & Mean Consensus Bias (MCB) — Leave-One-Out")
     p()
     p("**MCD** = mean |judge − LOO consensus| → magnitude of disagreement (always ≥ 0).")
     p("**MCB** = mean  (judge − LOO consensus) → signed direction: **+** = lenient, **−** = harsh.")
-    p("LOO consensus = average of the *other six* judges on each item (the evaluated judge excluded).")
+    p("LOO consensus = average of the *other* judges on each item (the evaluated judge excluded).")
     p()
-
-    def _sign_str(v):
-        return f"+{v:.1f}" if v >= 0 else f"{v:.1f}"
+    p("Runs:")
+    for cond, res in conditions.items():
+        p(f"- {_short_label(cond)} ({cond}): {', '.join(res['runs'])}")
+    p()
+    if report.get("skipped"):
+        p("Not pooled (incompatible with the runs above):")
+        for run, reason in report["skipped"]:
+            p(f"- {run}: {reason}")
+        p()
 
     # Per-condition detail tables
-    for cond_label, rs_d, mcd_d, mcb_d, ms_d in [
-        ("A — Generic overall", rs_a, mcd_a, mcb_a, ms_a),
-        ("B — Metric rubric (mean of accuracy/relevance/completeness)", rs_b, mcd_b, mcb_b, ms_b),
-        ("C — Per-item custom", rs_c, mcd_c, mcb_c, ms_c),
-    ]:
-        p(f"## Condition {cond_label}")
+    for cond, res in conditions.items():
+        label = CONDITION_LABELS.get(cond, cond)
+        if res["metrics"]:
+            label += f" (mean of {'/'.join(res['metrics'])})"
+        summary = res["summary"]
+        p(f"## Condition {label}")
         p()
         p("| Judge | Mean Score | MCD (pts) | MCB (pts) |")
         p("|-------|------------|-----------|-----------|")
-        for j in judges:
-            p(f"| {SHORT_NAMES.get(j, j)} | {ms_d[j]:.1f} | {mcd_d[j]:.1f} | {_sign_str(mcb_d[j])} |")
-        n_j = len(judges)
-        panel_mcd = sum(mcd_d[j] for j in judges) / n_j
-        panel_mcb = sum(mcb_d[j] for j in judges) / n_j
-        p(f"| **Panel mean** | | **{panel_mcd:.1f}** | **{_sign_str(panel_mcb)}** |")
+        for j in res["judges"]:
+            s = summary[j]
+            p(f"| {name(j)} | {_num(s['mean_score'])} | {_num(s['mcd'])} | {_sign_str(s['mcb'])} |")
+        panel_mcd = _panel_mean(summary, res["judges"], "mcd")
+        panel_mcb = _panel_mean(summary, res["judges"], "mcb")
+        p(f"| **Panel mean** | | **{_num(panel_mcd)}** | **{_sign_str(panel_mcb)}** |")
         p()
 
-    # B per-metric breakdown
-    p("## Condition B — per-metric detail")
-    p()
-    p("| Judge | Acc MCD | Acc MCB | Rel MCD | Rel MCB | Comp MCD | Comp MCB |")
-    p("|-------|---------|---------|---------|---------|----------|----------|")
-    for j in judges:
-        p(
-            f"| {SHORT_NAMES.get(j, j)} "
-            f"| {b_mcd['accuracy'][j]:.1f} | {_sign_str(b_mcb['accuracy'][j])} "
-            f"| {b_mcd['relevance'][j]:.1f} | {_sign_str(b_mcb['relevance'][j])} "
-            f"| {b_mcd['completeness'][j]:.1f} | {_sign_str(b_mcb['completeness'][j])} |"
-        )
-    p()
+    # Per-metric breakdown of rubric conditions
+    for cond, res in conditions.items():
+        if not res["metrics"]:
+            continue
+        metrics = list(res["metrics"])
+        p(f"## Condition {_short_label(cond)} — per-metric detail")
+        p()
+        p("| Judge | " + " | ".join(f"{m.capitalize()} MCD | {m.capitalize()} MCB" for m in metrics) + " |")
+        p("|-------|" + "|".join("-------|-------" for _ in metrics) + "|")
+        for j in res["judges"]:
+            cells = " | ".join(
+                f"{_num(res['metrics'][m][j]['mcd'])} | {_sign_str(res['metrics'][m][j]['mcb'])}" for m in metrics
+            )
+            p(f"| {name(j)} | {cells} |")
+        p()
 
     # Cross-condition summary
+    labels = [_short_label(c) for c in conditions]
+    header = [f"{lbl}: {col}" for lbl in labels for col in ("RS%", "MCD", "MCB", "Score")]
+    if len(conditions) > 1:
+        header += ["**Overall RS%**", "**Overall MCD**", "**Overall MCB**", "**Overall Score**"]
+
+    def _quad(s, bold=False):
+        b = "**" if bold else ""
+        return [
+            f"{b}{_num(s.get('rs'), '%')}{b}",
+            f"{b}{_num(s.get('mcd'))}{b}",
+            f"{b}{_sign_str(s.get('mcb'))}{b}",
+            f"{b}{_num(s.get('mean_score'))}{b}",
+        ]
+
     p("## Cross-condition summary (RS% / MCD / MCB / Mean Score)")
     p()
-    p("| Judge | A: RS% | A: MCD | A: MCB | A: Score | B: RS% | B: MCD | B: MCB | B: Score | C: RS% | C: MCD | C: MCB | C: Score | **Overall RS%** | **Overall MCD** | **Overall MCB** | **Overall Score** |")
-    p("|-------|--------|--------|--------|----------|--------|--------|--------|----------|--------|--------|--------|----------|----------------|----------------|----------------|-------------------|")
+    p("| Judge | " + " | ".join(header) + " |")
+    p("|-------|" + "|".join("-" * (len(h) + 2) for h in header) + "|")
     for j in judges:
-        n = SHORT_NAMES.get(j, j)
-        p(
-            f"| {n} "
-            f"| {rs_a[j]:.1f}% | {mcd_a[j]:.1f} | {_sign_str(mcb_a[j])} | {ms_a[j]:.1f} "
-            f"| {rs_b[j]:.1f}% | {mcd_b[j]:.1f} | {_sign_str(mcb_b[j])} | {ms_b[j]:.1f} "
-            f"| {rs_c[j]:.1f}% | {mcd_c[j]:.1f} | {_sign_str(mcb_c[j])} | {ms_c[j]:.1f} "
-            f"| **{rs_all[j]:.1f}%** | **{mcd_all[j]:.1f}** | **{_sign_str(mcb_all[j])}** | **{ms_all[j]:.1f}** |"
-        )
-    n_j = len(judges)
-    p(
-        f"| **Mean** "
-        f"| {sum(rs_a[j] for j in judges)/n_j:.1f}% | {sum(mcd_a[j] for j in judges)/n_j:.1f} | {_sign_str(sum(mcb_a[j] for j in judges)/n_j)} | {sum(ms_a[j] for j in judges)/n_j:.1f} "
-        f"| {sum(rs_b[j] for j in judges)/n_j:.1f}% | {sum(mcd_b[j] for j in judges)/n_j:.1f} | {_sign_str(sum(mcb_b[j] for j in judges)/n_j)} | {sum(ms_b[j] for j in judges)/n_j:.1f} "
-        f"| {sum(rs_c[j] for j in judges)/n_j:.1f}% | {sum(mcd_c[j] for j in judges)/n_j:.1f} | {_sign_str(sum(mcb_c[j] for j in judges)/n_j)} | {sum(ms_c[j] for j in judges)/n_j:.1f} "
-        f"| **{sum(rs_all[j] for j in judges)/n_j:.1f}%** | **{sum(mcd_all[j] for j in judges)/n_j:.1f}** | **{_sign_str(sum(mcb_all[j] for j in judges)/n_j)}** | **{sum(ms_all[j] for j in judges)/n_j:.1f}** |"
-    )
+        cells = []
+        for res in conditions.values():
+            cells += _quad(res["summary"].get(j, {}))
+        if len(conditions) > 1:
+            cells += _quad(overall[j], bold=True)
+        p(f"| {name(j)} | " + " | ".join(cells) + " |")
+    cells = []
+    for res in conditions.values():
+        cells += _quad({f: _panel_mean(res["summary"], judges, f) for f in FIELDS})
+    if len(conditions) > 1:
+        cells += _quad({f: _panel_mean(overall, judges, f) for f in FIELDS}, bold=True)
+    p("| **Mean** | " + " | ".join(cells) + " |")
     p()
 
     # Key observations
-    rs_vals = [rs_all[j] for j in judges]
-    mcd_vals = [mcd_all[j] for j in judges]
-    corr = _pearson(rs_vals, mcd_vals)
+    scored = [j for j in judges if overall[j]["mcd"] is not None]
+    if scored:
+        p("## Key observations")
+        p()
+        if len(scored) >= 3:
+            corr = _pearson([overall[j]["rs"] for j in scored], [overall[j]["mcd"] for j in scored])
+            p(f"- **Correlation(RS%, MCD)** across {len(scored)} judges (overall): **r = {corr:.3f}**")
+            if corr >= 0:
+                p("  - Non-negative: higher repeat stability does *not* predict closer consensus alignment.")
+            else:
+                p("  - Negative: more stable judges also tend to be closer to consensus.")
+            p()
+        best_j = min(scored, key=lambda j: overall[j]["mcd"])
+        worst_j = max(scored, key=lambda j: overall[j]["mcd"])
+        most_lenient = max(scored, key=lambda j: overall[j]["mcb"])
+        most_harsh = min(scored, key=lambda j: overall[j]["mcb"])
+        p(f"- **Closest to consensus (lowest MCD):** {name(best_j)} — MCD = {_num(overall[best_j]['mcd'])} pts")
+        p(f"- **Farthest from consensus (highest MCD):** {name(worst_j)} — MCD = {_num(overall[worst_j]['mcd'])} pts")
+        p()
+        lenient_mcb = _sign_str(overall[most_lenient]["mcb"])
+        p(f"- **Most lenient (highest MCB):** {name(most_lenient)} — MCB = {lenient_mcb} pts")
+        p(f"- **Most harsh (lowest MCB):** {name(most_harsh)} — MCB = {_sign_str(overall[most_harsh]['mcb'])} pts")
+        p()
+        by_cond = ", ".join(
+            f"{_short_label(c)} = {_num(_panel_mean(res['summary'], res['judges'], 'mcd'))}"
+            for c, res in conditions.items()
+        )
+        p(f"- **Panel mean MCD by condition:** {by_cond}")
 
-    best_j = min(judges, key=lambda j: mcd_all[j])
-    worst_j = max(judges, key=lambda j: mcd_all[j])
-    most_lenient = max(judges, key=lambda j: mcb_all[j])
-    most_harsh = min(judges, key=lambda j: mcb_all[j])
+    return "\n".join(lines) + "\n"
+
+
+def render_csv(report: dict) -> str:
+    """One row per (condition, metric, judge); ``metric`` is empty for condition and overall rows."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(CSV_COLUMNS)
+
+    def row(condition, metric, judge, entry):
+        writer.writerow(
+            [condition, metric, judge]
+            + ["" if entry.get(f) is None else round(entry[f], 4) for f in FIELDS]
+            + [entry.get("n_cells", "")]
+        )
+
+    for cond, res in report["conditions"].items():
+        for m, table in res["metrics"].items():
+            for j in res["judges"]:
+                row(cond, m, j, table[j])
+        for j in res["judges"]:
+            row(cond, "", j, res["summary"][j])
+    for j in report["judges"]:
+        row("overall", "", j, report["overall"][j])
+    return buf.getvalue()
 
-    p("## Key observations")
-    p()
-    p(f"- **Correlation(RS%, MCD)** across 7 judges (overall): **r = {corr:.3f}**")
-    if corr >= 0:
-        p("  - Weakly positive: higher repeat stability does *not* predict closer consensus alignment.")
-    else:
-        p("  - Negative: more stable judges also tend to be closer to consensus.")
-    p()
-    p(f"- **Closest to consensus (lowest MCD):** {SHORT_NAMES[best_j]} — MCD = {mcd_all[best_j]:.1f} pts")
-    p(f"- **Farthest from consensus (highest MCD):** {SHORT_NAMES[worst_j]} — MCD = {mcd_all[worst_j]:.1f} pts")
-    p()
-    p(f"- **Most lenient (highest MCB):** {SHORT_NAMES[most_lenient]} — MCB = {_sign_str(mcb_all[most_lenient])} pts")
-    p(f"- **Most harsh (lowest MCB):** {SHORT_NAMES[most_harsh]} — MCB = {_sign_str(mcb_all[most_harsh])} pts")
-    p()
-    p(f"- **GPT-4:** RS% = {rs_all['gpt-4']:.1f}%, MCD = {mcd_all['gpt-4']:.1f}, MCB = {_sign_str(mcb_all['gpt-4'])}, Mean Score = {ms_all['gpt-4']:.1f}")
-    p("  - High stability, highest deviation, and most lenient — systematic high-scorer.")
-    p()
-    p(f"- **Claude Sonnet 4:** RS% = {rs_all['claude-sonnet-4-20250514']:.1f}%, MCD = {mcd_all['claude-sonnet-4-20250514']:.1f}, MCB = {_sign_str(mcb_all['claude-sonnet-4-20250514'])}, Mean Score = {ms_all['claude-sonnet-4-20250514']:.1f}")
-    p("  - Perfect stability but mid-pack consensus alignment; sign shows scoring direction.")
-    p()
-    panel_a = sum(mcd_a[j] for j in judges) / n_j
-    panel_b = sum(mcd_b[j] for j in judges) / n_j
-    panel_c = sum(mcd_c[j] for j in judges) / n_j
-    p(f"- **Panel mean MCD by condition:** A = {panel_a:.1f}, B = {panel_b:.1f}, C = {panel_c:.1f}")
-    p("  - Per-item custom instructions (C) nearly halve cross-judge disagreement vs generic (A).")
 
-    text = "\n".join(lines) + "\n"
+def _out_path(value: str) -> Path:
+    path = Path(value)
+    return path if path.is_absolute() else REPO_ROOT / path
+
+
+def _parse_where(terms: Sequence[str]) -> Dict[str, str]:
+    where = {}
+    for term in terms:
+        key, sep, value = term.partition("=")
+        if not sep or not key.strip():
+            raise SystemExit(f"--where expects key=value, got {term!r}")
+        where[key.strip()] = value.strip()
+    return where
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leave-one-out MCD / MCB tables over discovered results runs.")
+    parser.add_argument("paths", nargs="*", help="results files (default: every run in results/ with a manifest)")
+    parser.add_argument("--condition", help="only runs under this condition_name")
+    parser.add_argument("--dataset", help="only runs on this dataset_id")
+    parser.add_argument(
+        "--judge", action="append", default=[], help="only these judge_models (repeatable); other runs are skipped"
+    )
+    parser.add_argument("--metric", action="append", default=[], help="only these rubric metrics (repeatable)")
+    parser.add_argument(
+        "--where",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="filter on a manifest config field, e.g. repeats=5 or temperature=0.0 (repeatable)",
+    )
+    parser.add_argument("--results-dir", help=f"where to discover runs (default: {RESULTS_DIR})")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per condition)")
+    parser.add_argument("--out", help="also write the markdown report here")
+    parser.add_argument("--json", help="also write the tables as JSON here")
+    parser.add_argument("--csv", help="also write the tables as CSV here")
+    args = parser.parse_args()
+
+    skipped: List[Tuple[Path, str]] = []
+    runs = discover_runs(
+        [Path(p) for p in args.paths],
+        condition=args.condition,
+        dataset=args.dataset,
+        judges=args.judge,
+        where=_parse_where(args.where),
+        results_dir=Path(args.results_dir) if args.results_dir else None,
+        skipped=skipped,
+    )
+    if not runs:
+        print("No results runs match the filters.", file=sys.stderr)
+        sys.exit(1)
+    for path, reason in skipped:
+        print(f"Not pooling {path.name}: {reason}", file=sys.stderr)
+
+    report = evaluate(runs, judges=args.judge, metrics=args.metric, workers=args.workers)
+    report["skipped"] = [(path.name, reason) for path, reason in skipped]
+    text = render_markdown(report)
     print(text)
 
-    if out_path:
+    outputs = [
+        (args.out, lambda: text),
+        (args.json, lambda: json.dumps(report, indent=2) + "\n"),
+        (args.csv, lambda: render_csv(report)),
+    ]
+    for value, render in outputs:
+        if not value:
+            continue
+        out_path = _out_path(value)
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(text, encoding="utf-8")
-        print(f"\n[saved to {out_path}]", file=sys.stderr)
+        out_path.write_text(render(), encoding=ENCODING)
+        print(f"[saved to {out_path}]", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,17 @@
 """Compute reliability metrics from judge JSONL output."""
 
-import statistics
 import sys
 from collections import Counter
 from pathlib import Path
 
-import itertools
-from math import sqrt
+from typing import Dict, List, Optional, Tuple
 
-from typing import Dict, List, Optional
-
-from utils import REPO_ROOT, load_jsonl
+from bootstrap_ci import ScoreCube
+from reliability import across_judges, within_judges
+from row_aggregator import RowAggregator
+from run_manifest import load_manifest, result_catalog
+from stability_arrays import ScoreMatrix, exact_agreement, per_item_variance, repeat_variability_headlines
+from utils import REPO_ROOT
 
 RESULTS_DIR = REPO_ROOT / "results"
 
@@ -52,38 +53,7 @@ def metric1_per_item_variance(by_item: Dict[str, List[int]]) -> dict:
     scale (with K=2 this equals |Δscore| on that item). Often easier to read than mean variance when
     one unstable item has a large spread.
     """
-    variances = []
-    ranges: List[float] = []
-    zero_var_count = 0
-    for item_id, scores in by_item.items():
-        var_i = variance(scores)
-        variances.append(var_i)
-        if var_i == 0:
-            zero_var_count += 1
-        if len(scores) >= 2:
-            ranges.append(float(max(scores) - min(scores)))
-        else:
-            ranges.append(0.0)
-
-    n_items = len(by_item)
-    mean_var = sum(variances) / n_items if n_items else 0
-    median_var = float(statistics.median(variances)) if variances else 0.0
-    pct_zero = 100 * zero_var_count / n_items if n_items else 0
-    # Average of per-item sample SDs (sqrt of per-item variance); same units as score (0–100).
-    mean_within_item_std = sum(sqrt(v) for v in variances) / n_items if n_items else 0.0
-    mean_within_item_range = sum(ranges) / n_items if n_items and ranges else 0.0
-    max_within_item_range = max(ranges) if ranges else 0.0
-
-    return {
-        "mean_variance": mean_var,
-        "median_variance": median_var,
-        "mean_within_item_std": mean_within_item_std,
-        "mean_within_item_range": mean_within_item_range,
-        "max_within_item_range": max_within_item_range,
-        "pct_items_zero_variance": pct_zero,
-        "n_items": n_items,
-        "zero_var_count": zero_var_count,
-    }
+    return per_item_variance(ScoreMatrix.from_by_item(by_item))
 
 
 def metric_repeat_variability_headlines(by_item: Dict[str, List[int]]) -> dict:
@@ -94,73 +64,13 @@ def metric_repeat_variability_headlines(by_item: Dict[str, List[int]]) -> dict:
     - **% repeat pairs disagree**: within each item, share of unordered repeat pairs with different scores.
     - **% items with any disagreeing repeats**: how many items are unstable across K.
     """
-    all_scores: List[int] = []
-    for scores in by_item.values():
-        all_scores.extend(scores)
-
-    n_j = len(all_scores)
-    if n_j == 0:
-        return {
-            "n_items": len(by_item),
-            "n_judgments": 0,
-            "n_distinct_scores": 0,
-            "n_repeat_pairs": 0,
-            "n_repeat_pairs_disagree": 0,
-            "pct_repeat_pairs_disagree": 0.0,
-            "n_items_any_repeat_disagree": 0,
-            "pct_items_any_repeat_disagree": 0.0,
-        }
-
-    n_unique = len(set(all_scores))
-
-    n_pairs = 0
-    n_disagree_pairs = 0
-    items_disagree = 0
-    for scores in by_item.values():
-        pairs = list(itertools.combinations(scores, 2))
-        if not pairs:
-            continue
-        item_dis = False
-        for a, b in pairs:
-            n_pairs += 1
-            if a != b:
-                n_disagree_pairs += 1
-                item_dis = True
-        if item_dis:
-            items_disagree += 1
-
-    n_items = len(by_item)
-    return {
-        "n_items": n_items,
-        "n_judgments": n_j,
-        "n_distinct_scores": n_unique,
-        "n_repeat_pairs": n_pairs,
-        "n_repeat_pairs_disagree": n_disagree_pairs,
-        "pct_repeat_pairs_disagree": 100.0 * n_disagree_pairs / n_pairs if n_pairs else 0.0,
-        "n_items_any_repeat_disagree": items_disagree,
-        "pct_items_any_repeat_disagree": 100.0 * items_disagree / n_items if n_items else 0.0,
-    }
+    return repeat_variability_headlines(ScoreMatrix.from_by_item(by_item))
 
 
 def metric2_exact_agreement(by_item: Dict[str, List[int]]) -> dict:
     """Per item: among all unordered pairs of repeat scores, fraction with exact integer equality.
     Return the mean of those fractions across items (not comparable to mean score, which averages raw scores)."""
-    agreement_rates = []
-    for scores in by_item.values():
-        n = len(scores)
-        total_pairs = n * (n - 1) // 2
-        if total_pairs == 0:
-            agreement_rates.append(1.0)
-            continue
-        matching = sum(1 for a, b in itertools.combinations(scores, 2) if a == b)
-        agreement_rates.append(matching / total_pairs)
-
-    n_items = len(by_item)
-    mean_agreement = sum(agreement_rates) / n_items if n_items else 0
-    return {
-        "mean_agreement_rate": mean_agreement,
-        "n_items": n_items,
-    }
+    return exact_agreement(ScoreMatrix.from_by_item(by_item))
 
 
 def metric3_score_histogram(rows: List[dict], metric_name: Optional[str] = None) -> Dict[int, int]:
@@ -177,92 +87,22 @@ def metric3_score_histogram(rows: List[dict], metric_name: Optional[str] = None)
     return dict(Counter(scores))
 
 
+def repeat_savings(rows: List[dict]) -> dict:
+    """
+    Adaptive runs (``early_stop`` on rows): judgments made vs planned per (judge, item, metric) cell.
+    Cells stopped early have fewer than ``repeats_planned`` scores, which the per-item metrics above handle
+    (variance and pair counts use each item's own n).
+    """
+    return RowAggregator().add_rows(rows).select().savings()
+
+
 def otel_metrics(rows: List[dict]) -> dict:
     """OTEL-derived metrics: token usage, span status, trace coverage.
 
     Uses input_tokens, output_tokens, span_status when present (from instrumented runs).
     Returns empty/minimal dict for older JSONL without OTEL fields.
     """
-    if not rows:
-        return {}
-
-    has_tokens = any(r.get("input_tokens") is not None or r.get("output_tokens") is not None for r in rows)
-    has_trace = any(r.get("trace_id") for r in rows)
-
-    result = {
-        "total_spans": len(rows),
-        "trace_ids": list({r["trace_id"] for r in rows if r.get("trace_id")}),
-        "span_status_ok": sum(1 for r in rows if r.get("span_status") == "ok"),
-        "span_status_error": sum(1 for r in rows if r.get("span_status") == "error"),
-    }
-
-    if has_tokens:
-        input_tokens = [r["input_tokens"] for r in rows if r.get("input_tokens") is not None]
-        output_tokens = [r["output_tokens"] for r in rows if r.get("output_tokens") is not None]
-        result["total_input_tokens"] = sum(input_tokens)
-        result["total_output_tokens"] = sum(output_tokens)
-        result["mean_input_tokens"] = sum(input_tokens) / len(input_tokens) if input_tokens else 0
-        result["mean_output_tokens"] = sum(output_tokens) / len(output_tokens) if output_tokens else 0
-        # Per-item token variance (reliability: does token count vary for same item?)
-        by_item_tokens: Dict[str, List[int]] = {}
-        for r in rows:
-            ti, to = r.get("input_tokens"), r.get("output_tokens")
-            if ti is not None and to is not None:
-                iid = str(r.get("item_id", ""))
-                by_item_tokens.setdefault(iid, []).append(ti + to)
-        token_variances = [variance(v) for v in by_item_tokens.values() if len(v) >= 2]
-        result["mean_token_variance_per_item"] = sum(token_variances) / len(token_variances) if token_variances else 0
-    else:
-        result["total_input_tokens"] = None
-        result["total_output_tokens"] = None
-        result["mean_input_tokens"] = None
-        result["mean_output_tokens"] = None
-        result["mean_token_variance_per_item"] = None
-
-    result["has_otel"] = has_trace or has_tokens
-
-    # Per-item token details for dashboard (between-item & within-item)
-    if has_tokens:
-        by_item: Dict[str, List[dict]] = {}
-        for r in rows:
-            iid = str(r.get("item_id", ""))
-            by_item.setdefault(iid, []).append(r)
-        per_item_list = []
-        for item_id, item_rows in by_item.items():
-            inputs = [r["input_tokens"] for r in item_rows if r.get("input_tokens") is not None]
-            outputs = [r["output_tokens"] for r in item_rows if r.get("output_tokens") is not None]
-            totals = [
-                r.get("input_tokens", 0) + r.get("output_tokens", 0)
-                for r in item_rows
-                if r.get("input_tokens") is not None and r.get("output_tokens") is not None
-            ]
-            scores = [_get_score(r) for r in item_rows if _get_score(r) is not None]
-            mean_input = sum(inputs) / len(inputs) if inputs else 0
-            mean_output = sum(outputs) / len(outputs) if outputs else 0
-            within_var = variance(totals) if len(totals) >= 2 else 0
-            per_item_list.append({
-                "item_id": item_id,
-                "mean_input_tokens": round(mean_input, 1),
-                "mean_output_tokens": round(mean_output, 1),
-                "mean_total_tokens": round(mean_input + mean_output, 1),
-                "within_item_variance": round(within_var, 2),
-                "repeats": len(item_rows),
-                "mean_score": round(sum(scores) / len(scores), 2) if scores else None,
-            })
-        result["per_item_token_details"] = sorted(per_item_list, key=lambda x: x["item_id"])
-        # Between-item spread
-        if per_item_list:
-            mean_totals = [p["mean_total_tokens"] for p in per_item_list]
-            result["between_item_min_tokens"] = min(mean_totals)
-            result["between_item_max_tokens"] = max(mean_totals)
-            result["between_item_range"] = max(mean_totals) - min(mean_totals)
-    else:
-        result["per_item_token_details"] = []
-        result["between_item_min_tokens"] = None
-        result["between_item_max_tokens"] = None
-        result["between_item_range"] = None
-
-    return result
+    return RowAggregator().add_rows(rows).select().otel()
 
 
 def print_histogram(counts: Dict[int, int]) -> None:
@@ -279,25 +119,96 @@ def print_histogram(counts: Dict[int, int]) -> None:
         print(f"  {score:2d} │ {bar} {n}")
 
 
+def _reliability_line(r: dict) -> str:
+    def f(v):
+        return f"{v:.3f}" if v is not None else "–"
+
+    return (
+        f"ICC(1,1) {f(r['icc1_1'])} · ICC(2,k) {f(r['icc2_k'])} · alpha interval {f(r['alpha_interval'])} · "
+        f"alpha ordinal {f(r['alpha_ordinal'])} · kappa {f(r['fleiss_kappa'])} ({r['n_units']} items)"
+    )
+
+
+def print_reliability(agg: RowAggregator, score_range: Tuple[float, float]) -> None:
+    """Reliability per judge (repeats as raters) and, with several judges, across judges (per-item means)."""
+    judges = agg.judges()
+    for metric in agg.metrics() or [None]:
+        cube = ScoreCube.from_scores(
+            (j, item_id, scores)
+            for j in judges
+            for item_id, scores in agg.select(judge=j, metric=metric).by_item().items()
+        )
+        label = f" [{metric}]" if metric else ""
+        for j, r in within_judges(cube, score_range=score_range).items():
+            print(f"   {j}{label}: {_reliability_line(r)}")
+        if len(cube.judges) >= 2:
+            r = across_judges(cube, score_range=score_range)
+            print(f"   Across judges{label}: {_reliability_line(r)}")
+
+
+def print_catalog() -> None:
+    """One line per results file, read from the run manifests (read-only: files without one are flagged)."""
+    catalog = result_catalog(RESULTS_DIR)
+    if not catalog:
+        print("No JSONL files in results/.")
+        return
+    for path, m in catalog:
+        if m is None:
+            print(f"{path.name}: (no manifest — build it with python src/run_manifest.py)")
+            continue
+        if not m.get("config"):
+            print(f"{path.name}: (no readable rows)")
+            continue
+        cfg = m["config"]
+        tokens = m["tokens"]["input_tokens"] + m["tokens"]["output_tokens"]
+        print(
+            f"{path.name}: {cfg['condition_name']} | {cfg['dataset_id']} | {', '.join(cfg['judge_models'])} | "
+            f"K={cfg['repeats']} t={cfg['temperature']} | {m['rows']} rows ({m['error_rows']} errors, "
+            f"{m['missing_slots']} missing) | {tokens:,} tokens | {m['created_at_min']} → {m['created_at_max']}"
+        )
+
+
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == "--list":
+        print_catalog()
+        return
     if len(sys.argv) >= 2:
         path = Path(sys.argv[1])
     else:
-        jsonl_files = list(RESULTS_DIR.glob("*.jsonl")) if RESULTS_DIR.exists() else []
+        # Newest file the catalog says has rows; manifests spare opening the others.
+        jsonl_files = [p for p, m in result_catalog(RESULTS_DIR) if m is None or m["rows"]]
         if not jsonl_files:
             print("No JSONL files in results/. Run the judge first.")
             sys.exit(1)
         path = max(jsonl_files, key=lambda p: p.stat().st_mtime)
 
     print(f"File: {path}\n")
-    rows = load_jsonl(path)
-    if not rows:
+    # One pass over the rows feeds every section below.
+    agg = RowAggregator().add_file(path)
+    stats = agg.select()
+    if not stats.rows:
         print("File is empty.")
         sys.exit(1)
+    if "multi_sample" in stats.sampling_modes:
+        print(
+            "Note: multi_sample run — OpenAI repeats are n choices of one request, not independent calls "
+            "(see sampling_mode / n_choices on each row).\n"
+        )
 
-    by_item = _group_by_item(rows)
+    if stats.early_stop_rules:
+        sv = stats.savings()
+        print(f"ADAPTIVE REPEATS (early_stop={', '.join(sorted(stats.early_stop_rules))})")
+        print(
+            f"   Judgments made / planned: {sv['judgments_made']} / {sv['judgments_planned']} "
+            f"({sv['calls_saved']} calls saved, {sv['pct_calls_saved']:.1f}%)"
+        )
+        print(
+            f"   Cells stopped early: {sv['n_cells_stopped_early']} / {sv['n_cells']} "
+            f"(repeats per cell: {sv['min_repeats']}–{sv['max_repeats']})"
+        )
+        print()
 
-    hl = metric_repeat_variability_headlines(by_item)
+    hl = stats.headlines()
     print("0. REPEAT VARIABILITY (pooled judgments)")
     print(f"   Distinct scores / judgments:  {hl['n_distinct_scores']} / {hl['n_judgments']}")
     print(
@@ -311,7 +222,7 @@ def main():
     print()
 
     # 1. Per-item variance
-    m1 = metric1_per_item_variance(by_item)
+    m1 = stats.variance()
     print("1. PER-ITEM VARIANCE")
     print("   Mean variance across items:    {:.4f}".format(m1["mean_variance"]))
     print("   Median variance across items:  {:.4f}".format(m1["median_variance"]))
@@ -327,18 +238,27 @@ def main():
     print()
 
     # 2. Repeat agreement (exact)
-    m2 = metric2_exact_agreement(by_item)
+    m2 = stats.agreement()
     print("2. REPEAT AGREEMENT RATE (exact integer match within item)")
     print("   Mean agreement across items: {:.2%}".format(m2["mean_agreement_rate"]))
     print(f"   ({m2['n_items']} items)")
     print()
 
     # 3. Score distribution
-    counts = metric3_score_histogram(rows)
+    counts = dict(stats.histogram)
     print("3. SCORE DISTRIBUTION (histogram)")
     print_histogram(counts)
     print()
 
+    # 4. Inter-rater reliability
+    config = (load_manifest(path) or {}).get("config") or {}
+    lo = config.get("score_min")
+    hi = config.get("score_max")
+    score_range = (lo if lo is not None else 0, hi if hi is not None else 100)
+    print(f"4. RELIABILITY (within judge: repeats as raters; kappa on 5 bins of {score_range[0]}–{score_range[1]})")
+    print_reliability(agg, score_range)
+    print()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,132 @@
+"""
+Leave-one-out consensus engine shared by ``compute_mcd`` and the dashboard.
+
+A :class:`JudgePanel` holds one judge × cell matrix of score sums and counts, plus min/max for repeat stability.
+A cell is whatever the caller compares judges on: an item_id, or (condition, metric, item_id). Everything comes
+from those arrays in one vectorised pass, so a panel of J judges over I cells costs O(J·I), not O(J²·I).
+For judge j on cell c, with ``S[c]`` the sum of judge means and ``N[c]`` the number of judges who scored c:
+
+  LOO consensus = (S[c] − mean[j, c]) / (N[c] − 1)
+  MCD = mean |mean[j, c] − LOO|    MCB = mean (mean[j, c] − LOO)    (over cells j scored that someone else did too)
+  mean score = mean of mean[j, c] over the same cells
+  RS% = % of cells with ≥ 2 repeats where j gave identical scores
+"""
+
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class JudgePanel:
+    """Per-(judge, cell) score sums, counts, min and max; judges and cells sorted."""
+
+    def __init__(
+        self,
+        judges: List[str],
+        cells: List[Hashable],
+        sums: np.ndarray,
+        counts: np.ndarray,
+        lo: np.ndarray,
+        hi: np.ndarray,
+    ):
+        self.judges = judges
+        self.cells = cells
+        self.sums = sums
+        self.counts = counts
+        self.lo = lo
+        self.hi = hi
+
+    @classmethod
+    def from_arrays(cls, judge_of: Sequence, cell_of: Sequence, scores: Sequence) -> "JudgePanel":
+        """From parallel per-judgment sequences (null scores already dropped)."""
+        if not len(scores):
+            empty = np.zeros((0, 0))
+            return cls([], [], empty, empty.astype(np.int64), empty, empty)
+        judges = sorted(set(judge_of))
+        cells = sorted(set(cell_of))
+        j_index = {j: n for n, j in enumerate(judges)}
+        c_index = {c: n for n, c in enumerate(cells)}
+        j_codes = np.fromiter((j_index[j] for j in judge_of), dtype=np.int64, count=len(scores))
+        c_codes = np.fromiter((c_index[c] for c in cell_of), dtype=np.int64, count=len(scores))
+        flat = j_codes * len(cells) + c_codes
+        size = len(judges) * len(cells)
+        values = np.asarray(scores, dtype=np.float64)
+        sums = np.bincount(flat, weights=values, minlength=size)
+        counts = np.bincount(flat, minlength=size)
+        lo = np.full(size, np.inf)
+        hi = np.full(size, -np.inf)
+        np.minimum.at(lo, flat, values)
+        np.maximum.at(hi, flat, values)
+        shape = (len(judges), len(cells))
+        return cls(judges, cells, sums.reshape(shape), counts.reshape(shape), lo.reshape(shape), hi.reshape(shape))
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[dict],
+        cell: Callable[[dict], Hashable] = lambda r: r["item_id"],
+        judge: Callable[[dict], str] = lambda r: r["judge_model"],
+    ) -> "JudgePanel":
+        """From results rows; rows with a null score are skipped."""
+        judge_of, cell_of, scores = [], [], []
+        for r in rows:
+            s = r.get("score")
+            if s is not None:
+                judge_of.append(judge(r))
+                cell_of.append(cell(r))
+                scores.append(s)
+        return cls.from_arrays(judge_of, cell_of, scores)
+
+    @classmethod
+    def from_scores(cls, groups: Iterable[Tuple[str, Hashable, Sequence]]) -> "JudgePanel":
+        """From ``(judge, cell, scores)`` groups, e.g. the per-item scores of ``row_aggregator`` slices."""
+        judge_of: list = []
+        cell_of: list = []
+        scores: list = []
+        for j, c, s in groups:
+            judge_of.extend([j] * len(s))
+            cell_of.extend([c] * len(s))
+            scores.extend(s)
+        return cls.from_arrays(judge_of, cell_of, scores)
+
+    def cell_mask(self, keep: Callable[[Hashable], bool]) -> np.ndarray:
+        return np.fromiter((bool(keep(c)) for c in self.cells), dtype=bool, count=len(self.cells))
+
+
+def loo_consensus(panel: JudgePanel, cells: Optional[np.ndarray] = None) -> Dict[str, dict]:
+    """
+    ``{judge: {"mcd", "mcb", "mean_score", "rs", "n_cells"}}`` over all cells or the boolean mask ``cells``.
+    mcd / mcb / mean_score are ``None`` for a judge with no cell shared with another judge; rs is 0.0 when no
+    cell has two or more repeats.
+    """
+    counts, sums, lo, hi = panel.counts, panel.sums, panel.lo, panel.hi
+    if cells is not None:
+        counts, sums, lo, hi = counts[:, cells], sums[:, cells], lo[:, cells], hi[:, cells]
+    present = counts > 0
+    mean = np.divide(sums, counts, out=np.zeros_like(sums), where=present)
+    col_sum = mean.sum(axis=0)
+    col_n = present.sum(axis=0)
+    others = col_n[None, :] - present
+    valid = present & (others > 0)
+    loo = np.divide(col_sum[None, :] - mean, others, out=np.zeros_like(mean), where=valid)
+    diff = np.where(valid, mean - loo, 0.0)
+    n_valid = valid.sum(axis=1)
+    repeated = counts >= 2
+    stable = repeated & (lo == hi)
+    n_repeated = repeated.sum(axis=1)
+    denom = np.maximum(n_valid, 1)
+    mcd = np.abs(diff).sum(axis=1) / denom
+    mcb = diff.sum(axis=1) / denom
+    mean_score = np.where(valid, mean, 0.0).sum(axis=1) / denom
+    rs = np.divide(stable.sum(axis=1), n_repeated, out=np.zeros(len(n_repeated)), where=n_repeated > 0) * 100
+    out = {}
+    for n, j in enumerate(panel.judges):
+        has = bool(n_valid[n])
+        out[j] = {
+            "mcd": float(mcd[n]) if has else None,
+            "mcb": float(mcb[n]) if has else None,
+            "mean_score": float(mean_score[n]) if has else None,
+            "rs": float(rs[n]),
+            "n_cells": int(n_valid[n]),
+        }
+    return out
@@ -0,0 +1,217 @@
+"""
+Sidecar index for result JSONLs, so resume and end-of-run validation never re-parse the whole results file.
+
+``<run>.jsonl.idx`` is itself JSONL: a header ``{"v": 1, "execution_id": ...}`` followed by one entry per row,
+``[offset, length, key, score, input_tokens, output_tokens, cache_read, cache_write, cache_hit, created_at]`` —
+the byte range of the row, its judgment key, and the fields resume and the run manifest need.
+``JsonlWriter`` appends entries right after each batch reaches the results file, so the index can lag the data
+but never runs ahead of it.
+
+:func:`load_resume_index` trusts the indexed prefix (after checking that it fits the file and ends on a row
+boundary), parses only the rows beyond it, and brings the index up to date. A truncated last line (crash
+mid-write) is cut off so the file ends on its last complete row; that slot is judged again on resume. A damaged
+index tail is cut back the same way before anything is appended to it. A missing or stale index costs one full
+scan, which rebuilds it. With ``read_only`` (dry runs) the same scan runs but nothing is repaired or written.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, List, Optional, Set, Tuple
+
+from utils import ENCODING
+
+INDEX_VERSION = 1
+
+
+def index_path(results_path: Path) -> Path:
+    results_path = Path(results_path)
+    return results_path.with_name(results_path.name + ".idx")
+
+
+def index_entry(row: dict, offset: int, length: int, key: Tuple) -> list:
+    return [
+        offset,
+        length,
+        list(key),
+        row.get("score"),
+        row.get("input_tokens"),
+        row.get("output_tokens"),
+        row.get("cache_read_input_tokens"),
+        row.get("cache_creation_input_tokens"),
+        bool(row.get("cache_hit")),
+        row.get("created_at"),
+    ]
+
+
+def index_header(execution_id: Optional[str]) -> dict:
+    return {"v": INDEX_VERSION, "execution_id": execution_id}
+
+
+class ResumeIndex:
+    """What resume needs from an existing results file, without its rows."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: List[list] = []
+        self.first_row: Optional[dict] = None
+        self.execution_ids: Set[str] = set()
+        self.end_offset = 0
+        self.scanned_rows = 0
+        self.repaired = False
+
+    @property
+    def keys(self) -> List[Tuple]:
+        return [tuple(e[2]) for e in self.entries]
+
+    def scores(self) -> dict:
+        return {tuple(e[2]): e[3] for e in self.entries}
+
+    def usage_rows(self) -> List[dict]:
+        """Minimal row dicts (judge, tokens, cache_hit) for ``RunBudget.charge``."""
+        return [
+            {
+                "judge_model": e[2][1],
+                "input_tokens": e[4],
+                "output_tokens": e[5],
+                "cache_read_input_tokens": e[6],
+                "cache_creation_input_tokens": e[7],
+                "cache_hit": e[8],
+            }
+            for e in self.entries
+        ]
+
+
+def _read_index(ipath: Path, repair: bool = True) -> Tuple[Optional[dict], List[list]]:
+    """
+    Header and entries. An index cut short by a crash (an unreadable or unterminated line) is rewritten to its
+    readable prefix here (unless ``repair`` is False), so later appends never land after the damaged line.
+    """
+    header = None
+    entries: List[list] = []
+    damaged = False
+    with ipath.open("r", encoding=ENCODING) as f:
+        for i, line in enumerate(f):
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                damaged = True
+                break
+            if not line.endswith("\n"):
+                damaged = True
+                break
+            if i == 0:
+                if not isinstance(item, dict) or item.get("v") != INDEX_VERSION:
+                    return None, []
+                header = item
+            else:
+                entries.append(item)
+    if damaged and repair:
+        if header is None:
+            ipath.unlink()
+        else:
+            _write_index(ipath, header, entries)
+    return header, entries
+
+
+def repair_index(ipath: Path) -> None:
+    """Cut ``ipath`` back to its last complete entry (no-op for a missing or intact index)."""
+    ipath = Path(ipath)
+    if ipath.is_file():
+        _read_index(ipath)
+
+
+def _first_row(path: Path) -> Optional[dict]:
+    with path.open("rb") as f:
+        for raw in f:
+            if raw.strip():
+                try:
+                    return json.loads(raw)
+                except json.JSONDecodeError:
+                    return None
+    return None
+
+
+def _write_index(ipath: Path, header: dict, entries: List[list]) -> None:
+    tmp = ipath.with_name(ipath.name + ".tmp")
+    with tmp.open("w", encoding=ENCODING) as f:
+        f.write(json.dumps(header) + "\n")
+        for e in entries:
+            f.write(json.dumps(e) + "\n")
+    os.replace(tmp, ipath)
+
+
+def load_resume_index(path: Path, key_fn: Callable[[dict], Tuple], read_only: bool = False) -> ResumeIndex:
+    """
+    Index of ``path`` (a results JSONL) for resume: trusted prefix from the sidecar, tail rows parsed with
+    ``key_fn``, truncated last line repaired, sidecar rewritten or extended as needed.
+    ``read_only`` leaves both files untouched: a truncated last line is only skipped and the sidecar is not written.
+    Raises ``json.JSONDecodeError`` for a corrupt line that is not the last one.
+    """
+    path = Path(path)
+    ipath = index_path(path)
+    out = ResumeIndex(path)
+    size = path.stat().st_size
+
+    header, entries = _read_index(ipath, repair=not read_only) if ipath.is_file() else (None, [])
+    indexed_end = entries[-1][0] + entries[-1][1] if entries else 0
+    if header is not None and entries and indexed_end <= size:
+        with path.open("rb") as f:
+            f.seek(indexed_end - 1)
+            boundary_ok = f.read(1) == b"\n"
+    else:
+        boundary_ok = header is not None and not entries
+    rebuild = not boundary_ok
+    if rebuild:
+        header, entries, indexed_end = None, [], 0
+    elif header.get("execution_id"):
+        out.execution_ids.add(str(header["execution_id"]))
+
+    new_entries: List[list] = []
+    offset = indexed_end
+    truncate_at: Optional[int] = None
+    with path.open("rb") as f:
+        f.seek(indexed_end)
+        for raw in f:
+            if not raw.strip():
+                offset += len(raw)
+                continue
+            try:
+                row = json.loads(raw)
+            except json.JSONDecodeError:
+                if raw.endswith(b"\n"):
+                    raise
+                truncate_at = offset
+                break
+            if not raw.endswith(b"\n"):
+                # Complete JSON but no newline: terminate it so later appends start on a fresh line.
+                if not read_only:
+                    with path.open("ab") as fa:
+                        fa.write(b"\n")
+                raw += b"\n"
+            new_entries.append(index_entry(row, offset, len(raw), key_fn(row)))
+            eid = str(row.get("execution_id") or "").strip()
+            if eid:
+                out.execution_ids.add(eid)
+            offset += len(raw)
+    if truncate_at is not None and not read_only:
+        with path.open("r+b") as f:
+            f.truncate(truncate_at)
+        out.repaired = True
+        print(f"Repaired {path.name}: dropped a truncated last line at byte {truncate_at} (that slot will be re-judged).")
+
+    out.entries = entries + new_entries
+    out.scanned_rows = len(new_entries)
+    out.end_offset = offset if truncate_at is None else truncate_at
+    out.first_row = _first_row(path) if out.entries else None
+    if out.first_row is not None and header is None:
+        header = index_header(out.first_row.get("execution_id"))
+    if read_only:
+        return out
+    if header is not None and (rebuild or not ipath.is_file()):
+        _write_index(ipath, header, out.entries)
+    elif new_entries:
+        with ipath.open("a", encoding=ENCODING) as f:
+            for e in new_entries:
+                f.write(json.dumps(e) + "\n")
+    return out
@@ -2,17 +2,56 @@
 LLM-as-a-judge: call judge API (OpenAI or Anthropic) for structured JSON output.
 Supports OpenAI (gpt-*) and Anthropic (claude-*). Returns raw content and token usage.
 call_judge retries transient failures (429, 5xx, timeouts) with exponential backoff (see JUDGE_MAX_RETRIES).
+Before each attempt it waits on the shared rate limiter (rate_limit.py), which paces requests and tokens
+per provider/model and learns limits from rate-limit response headers; a 429 pauses that model for every
+worker instead of each one backing off separately.
+acall_judge / acall_text_model are asyncio counterparts (AsyncOpenAI / AsyncAnthropic) with the same
+retry classification and structured-output fallback chain.
+SDK clients come from a registry (get_client): one per provider / API key / HTTP settings, so every
+judgment and thread reuses the same connection pool (keep-alive, TLS sessions) — see JUDGE_HTTP_* env.
+Identical judge requests (same prompt, model, temperature, repeat index) are answered from the on-disk
+judgment cache (judge_cache.py) when it is enabled (use_cache=True / JUDGE_CACHE=1; off by default).
+Claude calls send the prompt's shared prefix (prompt_prefix) as a cache_control block (provider prompt caching);
+cache read / write token counts are reported through call_meta.
 Raises RuntimeError if the selected provider's API key is not set.
 """
 
+import asyncio
+import inspect
 import json
 import os
 import random
 import sys
+import threading
 import time
 from typing import Optional
 
+from judge_cache import cache_enabled, get_judgment_cache, judgment_cache_key
+from rate_limit import approx_tokens, estimate_request_tokens, get_rate_limiter
+
 JUDGE_TEMPERATURE = 0.0
+# Output cap for judge calls (also counted against the tokens-per-minute budget before each request).
+JUDGE_MAX_OUTPUT_TOKENS = 500
+# Anthropic only caches prompt prefixes at least this long (1024 for most models; Haiku needs 2048–4096).
+# Shorter prefixes are sent as one plain block: a cache_control marker on them would never produce a hit.
+ANTHROPIC_MIN_CACHEABLE_TOKENS = 1024
+ANTHROPIC_MIN_CACHEABLE_TOKENS_HAIKU = 2048
+ANTHROPIC_MIN_CACHEABLE_TOKENS_HAIKU_4_5 = 4096
+
+
+def anthropic_min_cacheable_tokens(model: str) -> int:
+    """Shortest prefix (tokens, system prompt included) the API caches for ``model``."""
+    m = str(model).lower()
+    if "haiku-4-5" in m or "haiku-4.5" in m:
+        return ANTHROPIC_MIN_CACHEABLE_TOKENS_HAIKU_4_5
+    if "haiku" in m:
+        return ANTHROPIC_MIN_CACHEABLE_TOKENS_HAIKU
+    return ANTHROPIC_MIN_CACHEABLE_TOKENS
+
+
+def prompt_cache_enabled() -> bool:
+    """Mark the shared prompt prefix with ``cache_control`` on Claude calls (env JUDGE_PROMPT_CACHE, default on)."""
+    return (os.environ.get("JUDGE_PROMPT_CACHE") or "1").strip().lower() not in ("0", "false", "off", "no")
 
 # Transient API failures (rate limits, 5xx, timeouts): retry with exponential backoff.
 JUDGE_MAX_RETRIES_DEFAULT = 5
@@ -28,6 +67,113 @@ def _max_judge_retries() -> int:
     except ValueError:
         return JUDGE_MAX_RETRIES_DEFAULT
 
+# Shared SDK clients / HTTP pools. None timeout = SDK default. Env JUDGE_HTTP_TIMEOUT_SEC,
+# JUDGE_HTTP_MAX_CONNECTIONS, JUDGE_HTTP_MAX_KEEPALIVE, JUDGE_HTTP_KEEPALIVE_EXPIRY_SEC.
+JUDGE_HTTP_TIMEOUT_SEC_DEFAULT: Optional[float] = None
+JUDGE_HTTP_MAX_CONNECTIONS_DEFAULT = 100
+JUDGE_HTTP_MAX_KEEPALIVE_DEFAULT = 100
+JUDGE_HTTP_KEEPALIVE_EXPIRY_SEC_DEFAULT = 60.0
+
+_PROVIDER_API_KEY_ENV = {"openai": "OPENAI_API_KEY", "anthropic": "ANTHROPIC_API_KEY"}
+_PROVIDER_BASE_URL_ENV = {"openai": "OPENAI_BASE_URL", "anthropic": "ANTHROPIC_BASE_URL"}
+_CLIENTS: dict = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def http_pool_settings() -> dict:
+    """Timeout and connection-pool limits used for new SDK clients (env overrides the defaults)."""
+
+    def _env_num(name: str, default, cast):
+        raw = (os.environ.get(name) or "").strip()
+        if not raw:
+            return default
+        try:
+            return cast(raw)
+        except ValueError:
+            return default
+
+    return {
+        "timeout_sec": _env_num("JUDGE_HTTP_TIMEOUT_SEC", JUDGE_HTTP_TIMEOUT_SEC_DEFAULT, float),
+        "max_connections": _env_num("JUDGE_HTTP_MAX_CONNECTIONS", JUDGE_HTTP_MAX_CONNECTIONS_DEFAULT, int),
+        "max_keepalive_connections": _env_num("JUDGE_HTTP_MAX_KEEPALIVE", JUDGE_HTTP_MAX_KEEPALIVE_DEFAULT, int),
+        "keepalive_expiry_sec": _env_num(
+            "JUDGE_HTTP_KEEPALIVE_EXPIRY_SEC", JUDGE_HTTP_KEEPALIVE_EXPIRY_SEC_DEFAULT, float
+        ),
+    }
+
+
+def _http_limits(settings: dict):
+    """httpx.Limits for the SDK's HTTP client, or None if httpx is not importable (SDK defaults apply)."""
+    try:
+        import httpx
+    except ImportError:
+        return None
+    return httpx.Limits(
+        max_connections=settings["max_connections"],
+        max_keepalive_connections=settings["max_keepalive_connections"],
+        keepalive_expiry=settings["keepalive_expiry_sec"],
+    )
+
+
+def _build_client(provider: str, api_key: str, settings: dict, async_client: bool):
+    sdk = _anthropic_sdk() if provider == "anthropic" else _openai_sdk()
+    kw: dict = {"api_key": api_key}
+    if settings["timeout_sec"] is not None:
+        kw["timeout"] = settings["timeout_sec"]
+    limits = _http_limits(settings)
+    if limits is not None:
+        http_cls = sdk.DefaultAsyncHttpxClient if async_client else sdk.DefaultHttpxClient
+        kw["http_client"] = http_cls(limits=limits)
+    if provider == "anthropic":
+        cls = sdk.AsyncAnthropic if async_client else sdk.Anthropic
+    else:
+        cls = sdk.AsyncOpenAI if async_client else sdk.OpenAI
+    return cls(**kw)
+
+
+def get_client(provider: str, *, async_client: bool = False):
+    """
+    Shared OpenAI / Anthropic SDK client for ``provider`` ("openai" or "anthropic").
+    One client per (provider, API key, base URL, timeout / pool settings) — reused by every judgment and
+    thread so keep-alive connections and TLS sessions survive between calls. Async clients are additionally
+    keyed by the running event loop (their pools cannot cross loops). Do not close the returned client.
+    """
+    api_key = _require_api_key(_PROVIDER_API_KEY_ENV[provider])
+    settings = http_pool_settings()
+    loop = asyncio.get_running_loop() if async_client else None
+    key = (
+        provider,
+        async_client,
+        id(loop) if loop is not None else None,
+        api_key,
+        (os.environ.get(_PROVIDER_BASE_URL_ENV[provider]) or "").strip(),
+        tuple(sorted(settings.items())),
+    )
+    with _CLIENTS_LOCK:
+        entry = _CLIENTS.get(key)
+        if entry is None:
+            if async_client:
+                # Drop async clients whose event loop has finished (e.g. earlier asyncio.run calls).
+                for k in [k for k, (_c, lp) in _CLIENTS.items() if lp is not None and lp.is_closed()]:
+                    del _CLIENTS[k]
+            entry = (_build_client(provider, api_key, settings, async_client), loop)
+            _CLIENTS[key] = entry
+        return entry[0]
+
+
+def close_clients() -> None:
+    """Close pooled sync clients and forget every registered client (next call builds fresh ones)."""
+    with _CLIENTS_LOCK:
+        entries = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client, loop in entries:
+        if loop is None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
 # JSON schema for structured output: { score: int 0-100, justification: str }
 JUDGE_RESPONSE_SCHEMA = {
     "type": "object",
@@ -80,20 +226,47 @@ def call_text_model(
     return _call_openai_text(user_prompt, model, system_content, temperature=t, max_tokens=max_tokens)
 
 
-def _call_openai_text(prompt: str, model: str, system_content: str, temperature: float, max_tokens: int):
-    api_key = os.environ.get("OPENAI_API_KEY")
+async def acall_text_model(
+    user_prompt: str,
+    model: str,
+    system_content: str = RUBRIC_GENERATOR_SYSTEM,
+    temperature: float = 0.2,
+    max_tokens: int = 2048,
+):
+    """Async :func:`call_text_model`. Returns (text, input_tokens, output_tokens)."""
+    t = float(temperature)
+    if is_claude_model(model):
+        return await _acall_anthropic_text(user_prompt, model, system_content, temperature=t, max_tokens=max_tokens)
+    return await _acall_openai_text(user_prompt, model, system_content, temperature=t, max_tokens=max_tokens)
+
+
+def _require_api_key(env_name: str) -> str:
+    api_key = os.environ.get(env_name)
     if not api_key or not api_key.strip():
         raise RuntimeError(
-            "OPENAI_API_KEY is not set. Add it to .env at the repo root, or export it before running."
+            f"{env_name} is not set. Add it to .env at the repo root, or export it before running."
         )
+    return api_key.strip()
+
+
+def _openai_sdk():
     try:
-        from openai import OpenAI
+        import openai
     except ImportError:
         raise RuntimeError("openai package is not installed. Run: pip install openai")
+    return openai
 
-    print(f"[judge] OpenAI text call ({model})...", file=sys.stderr)
-    client = OpenAI(api_key=api_key.strip())
-    resp = client.chat.completions.create(
+
+def _anthropic_sdk():
+    try:
+        import anthropic
+    except ImportError:
+        raise RuntimeError("anthropic package is not installed. Run: pip install anthropic")
+    return anthropic
+
+
+def _openai_text_request(prompt: str, model: str, system_content: str, temperature: float, max_tokens: int) -> dict:
+    return dict(
         model=model,
         messages=[
             {"role": "system", "content": system_content},
@@ -102,31 +275,10 @@ def _call_openai_text(prompt: str, model: str, system_content: str, temperature:
         temperature=temperature,
         max_tokens=max_tokens,
     )
-    content = ""
-    if resp.choices and resp.choices[0].message.content:
-        content = resp.choices[0].message.content.strip()
-    if not content:
-        raise RuntimeError("API returned empty text response.")
-    usage = resp.usage
-    input_tokens = usage.prompt_tokens if usage else None
-    output_tokens = usage.completion_tokens if usage else None
-    return content, input_tokens, output_tokens
 
 
-def _call_anthropic_text(prompt: str, model: str, system_content: str, temperature: float, max_tokens: int):
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key or not api_key.strip():
-        raise RuntimeError(
-            "ANTHROPIC_API_KEY is not set. Add it to .env at the repo root, or export it before running."
-        )
-    try:
-        import anthropic
-    except ImportError:
-        raise RuntimeError("anthropic package is not installed. Run: pip install anthropic")
-
-    print(f"[judge] Anthropic text call ({model})...", file=sys.stderr)
-    client = anthropic.Anthropic(api_key=api_key.strip())
-    kwargs = {
+def _anthropic_text_request(prompt: str, model: str, system_content: str, temperature: float, max_tokens: int) -> dict:
+    return {
         "model": model,
         "max_tokens": max_tokens,
         "system": system_content,
@@ -134,26 +286,96 @@ def _call_anthropic_text(prompt: str, model: str, system_content: str, temperatu
         "temperature": temperature,
         "thinking": {"type": "disabled"},
     }
-    resp = client.messages.create(**kwargs)
+
+
+async def _maybe_await(value):
+    """``raw.parse()`` is sync on legacy raw responses and a coroutine on newer async ones."""
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+def _openai_content_and_usage(resp):
+    """(stripped text of the first choice, input_tokens, output_tokens) from a chat completion."""
+    content = ""
+    if resp.choices and resp.choices[0].message.content:
+        content = resp.choices[0].message.content.strip()
+    usage = resp.usage
+    input_tokens = usage.prompt_tokens if usage else None
+    output_tokens = usage.completion_tokens if usage else None
+    return content, input_tokens, output_tokens
+
+
+def _anthropic_content_and_usage(resp):
+    """(first non-empty text block, input_tokens, output_tokens) from a Messages response."""
     content = ""
     if resp.content:
         for block in resp.content:
             if hasattr(block, "text") and block.text:
                 content = block.text.strip()
                 break
-    if not content:
-        raise RuntimeError("API returned empty text response.")
     usage = getattr(resp, "usage", None)
     input_tokens = usage.input_tokens if usage else None
     output_tokens = usage.output_tokens if usage else None
     return content, input_tokens, output_tokens
 
 
+def _call_openai_text(prompt: str, model: str, system_content: str, temperature: float, max_tokens: int):
+    client = get_client("openai")
+    print(f"[judge] OpenAI text call ({model})...", file=sys.stderr)
+    resp = client.chat.completions.create(
+        **_openai_text_request(prompt, model, system_content, temperature, max_tokens)
+    )
+    content, input_tokens, output_tokens = _openai_content_and_usage(resp)
+    if not content:
+        raise RuntimeError("API returned empty text response.")
+    return content, input_tokens, output_tokens
+
+
+async def _acall_openai_text(prompt: str, model: str, system_content: str, temperature: float, max_tokens: int):
+    client = get_client("openai", async_client=True)
+    print(f"[judge] OpenAI text call ({model}, async)...", file=sys.stderr)
+    resp = await client.chat.completions.create(
+        **_openai_text_request(prompt, model, system_content, temperature, max_tokens)
+    )
+    content, input_tokens, output_tokens = _openai_content_and_usage(resp)
+    if not content:
+        raise RuntimeError("API returned empty text response.")
+    return content, input_tokens, output_tokens
+
+
+def _call_anthropic_text(prompt: str, model: str, system_content: str, temperature: float, max_tokens: int):
+    client = get_client("anthropic")
+    print(f"[judge] Anthropic text call ({model})...", file=sys.stderr)
+    resp = client.messages.create(**_anthropic_text_request(prompt, model, system_content, temperature, max_tokens))
+    content, input_tokens, output_tokens = _anthropic_content_and_usage(resp)
+    if not content:
+        raise RuntimeError("API returned empty text response.")
+    return content, input_tokens, output_tokens
+
+
+async def _acall_anthropic_text(prompt: str, model: str, system_content: str, temperature: float, max_tokens: int):
+    client = get_client("anthropic", async_client=True)
+    print(f"[judge] Anthropic text call ({model}, async)...", file=sys.stderr)
+    resp = await client.messages.create(
+        **_anthropic_text_request(prompt, model, system_content, temperature, max_tokens)
+    )
+    content, input_tokens, output_tokens = _anthropic_content_and_usage(resp)
+    if not content:
+        raise RuntimeError("API returned empty text response.")
+    return content, input_tokens, output_tokens
+
+
 def is_claude_model(model_id):
     """True if model uses Anthropic API (claude-*)."""
     return model_id and str(model_id).strip().lower().startswith("claude")
 
 
+def provider_for_model(model_id) -> str:
+    """Provider bucket for a judge model id: ``"anthropic"`` (claude-*) or ``"openai"``."""
+    return "anthropic" if is_claude_model(model_id) else "openai"
+
+
 def _retryable_judge_error(exc: BaseException) -> bool:
     """True for rate limits, server errors, and network timeouts — safe to retry once or more."""
     if not isinstance(exc, Exception):
@@ -234,52 +456,300 @@ def _call_judge_once(
     model: str,
     system_content: str,
     temperature: float,
+    prompt_prefix: Optional[str] = None,
+    call_meta: Optional[dict] = None,
 ):
     if is_claude_model(model):
-        return _call_anthropic(prompt, model, system_content, temperature=temperature)
+        return _call_anthropic(
+            prompt, model, system_content, temperature=temperature, prompt_prefix=prompt_prefix, call_meta=call_meta
+        )
     return _call_openai(prompt, model, system_content, temperature=temperature)
 
 
+async def _acall_judge_once(
+    prompt: str,
+    model: str,
+    system_content: str,
+    temperature: float,
+    prompt_prefix: Optional[str] = None,
+    call_meta: Optional[dict] = None,
+):
+    if is_claude_model(model):
+        return await _acall_anthropic(
+            prompt, model, system_content, temperature=temperature, prompt_prefix=prompt_prefix, call_meta=call_meta
+        )
+    return await _acall_openai(prompt, model, system_content, temperature=temperature)
+
+
+def _retry_delay_sec(attempt: int) -> float:
+    """Exponential backoff with jitter before retry ``attempt + 1``."""
+    return JUDGE_RETRY_BASE_SEC * (2**attempt) + random.uniform(0, 0.35)
+
+
+def _is_rate_limit_error(exc: BaseException) -> bool:
+    if getattr(exc, "status_code", None) == 429 or type(exc).__name__ == "RateLimitError":
+        return True
+    msg = str(exc).lower()
+    return "rate limit" in msg or "too many requests" in msg
+
+
+def _pause_after_rate_limit(limiter, provider: str, model: str, exc: BaseException, delay: float) -> bool:
+    """
+    On a 429, feed the error's rate-limit headers (incl. ``retry-after``) to the shared limiter and pause the
+    model for every worker — the next ``acquire`` does the waiting. Returns False for other errors
+    (caller sleeps ``delay`` locally).
+    """
+    if not _is_rate_limit_error(exc) or not limiter.enabled:
+        return False
+    response = getattr(exc, "response", None)
+    limiter.update_from_headers(provider, model, getattr(response, "headers", None))
+    limiter.pause(provider, model, delay)
+    return True
+
+
+def _record_judge_usage(limiter, provider: str, model: str, est_tokens: int, out) -> None:
+    _content, input_tokens, output_tokens = out
+    if isinstance(output_tokens, list):  # call_judge_n: per-choice output tokens
+        output_tokens = sum(t or 0 for t in output_tokens)
+    if input_tokens is not None and output_tokens is not None:
+        limiter.record_usage(provider, model, est_tokens, int(input_tokens) + int(output_tokens))
+
+
+def _observe_rate_limit_headers(provider: str, model: str, raw) -> None:
+    """Adapt the shared limiter from a raw SDK response's rate-limit headers."""
+    get_rate_limiter().update_from_headers(provider, model, getattr(raw, "headers", None))
+
+
+def _log_retry(attempt: int, attempts: int, exc: BaseException, delay: float) -> None:
+    print(
+        f"[judge] transient error (attempt {attempt + 1}/{attempts}): {exc!s}; "
+        f"retrying in {delay:.1f}s…",
+        file=sys.stderr,
+    )
+
+
 def call_judge(
     prompt: str,
     model: str,
     system_content: str = "You are an evaluator. Output JSON only.",
     temperature: Optional[float] = None,
+    *,
+    repeat_idx: Optional[int] = None,
+    use_cache: Optional[bool] = None,
+    call_meta: Optional[dict] = None,
+    prompt_prefix: Optional[str] = None,
 ):
     """
     Call judge LLM. Routes to OpenAI or Anthropic based on model id.
     Returns (raw_content_str, input_tokens, output_tokens).
     Retries transient errors (429, 5xx, timeouts) with backoff; attempts = 1 + JUDGE_MAX_RETRIES (default 5).
+    With ``use_cache=True`` (or env JUDGE_CACHE=1) results are served from / stored in the on-disk judgment
+    cache (judge_cache.py) keyed on prompt, system, model, temperature, response schema and ``repeat_idx``;
+    by default every call goes to the API. If ``call_meta`` is a dict it receives ``cache_hit`` (bool) and, for Claude,
+    ``cache_read_input_tokens`` / ``cache_creation_input_tokens``.
+    prompt_prefix: leading part of ``prompt`` shared across items/repeats (instructions, metric gloss); Claude
+    requests send it as a separate text block marked ``cache_control`` so the provider caches it.
     Raises RuntimeError if API key not set or on non-retryable failure.
     """
     t = JUDGE_TEMPERATURE if temperature is None else temperature
+    cache, key = _judgment_cache_for(prompt, model, system_content, t, repeat_idx, use_cache)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            _set_cache_hit(call_meta, True)
+            return hit
+    out = _call_judge_with_retries(prompt, model, system_content, t, prompt_prefix, call_meta)
+    if cache is not None:
+        cache.put(key, model, *out)
+    _set_cache_hit(call_meta, False)
+    return out
+
+
+def _call_judge_with_retries(
+    prompt: str,
+    model: str,
+    system_content: str,
+    t: float,
+    prompt_prefix: Optional[str] = None,
+    call_meta: Optional[dict] = None,
+):
+    est_tokens = estimate_request_tokens(prompt, system_content, JUDGE_MAX_OUTPUT_TOKENS)
+    return _with_judge_retries(
+        lambda: _call_judge_once(prompt, model, system_content, t, prompt_prefix, call_meta), model, est_tokens
+    )
+
+
+def _with_judge_retries(call, model: str, est_tokens: int):
+    """Run ``call()`` under the shared rate limiter, retrying transient errors with backoff."""
     max_retries = _max_judge_retries()
     attempts = max_retries + 1
     last_exc: Optional[BaseException] = None
+    provider = provider_for_model(model)
+    limiter = get_rate_limiter()
     for attempt in range(attempts):
+        limiter.acquire(provider, model, est_tokens)
         try:
-            return _call_judge_once(prompt, model, system_content, t)
+            out = call()
         except Exception as e:
             last_exc = e
             if attempt >= max_retries or not _retryable_judge_error(e):
                 raise
-            delay = JUDGE_RETRY_BASE_SEC * (2**attempt) + random.uniform(0, 0.35)
-            print(
-                f"[judge] transient error (attempt {attempt + 1}/{attempts}): {e!s}; "
-                f"retrying in {delay:.1f}s…",
-                file=sys.stderr,
-            )
-            time.sleep(delay)
+            delay = _retry_delay_sec(attempt)
+            _log_retry(attempt, attempts, e, delay)
+            if not _pause_after_rate_limit(limiter, provider, model, e, delay):
+                time.sleep(delay)
+            continue
+        _record_judge_usage(limiter, provider, model, est_tokens, out)
+        return out
     assert last_exc is not None
     raise last_exc
 
 
-def _openai_response_format_not_supported(err: BaseException) -> bool:
-    """True if the API rejected structured output mode for this model (e.g. base gpt-4)."""
-    msg = str(err).lower()
-    code = getattr(err, "status_code", None)
-    if code != 400:
+async def acall_judge(
+    prompt: str,
+    model: str,
+    system_content: str = "You are an evaluator. Output JSON only.",
+    temperature: Optional[float] = None,
+    *,
+    repeat_idx: Optional[int] = None,
+    use_cache: Optional[bool] = None,
+    call_meta: Optional[dict] = None,
+    prompt_prefix: Optional[str] = None,
+):
+    """
+    Async :func:`call_judge` on AsyncOpenAI / AsyncAnthropic: same return value, judgment cache, retry
+    classification (``_retryable_judge_error``) and backoff, but waits with ``asyncio.sleep`` so many
+    judgments can share one event loop (e.g. ``asyncio.gather`` under a semaphore).
+    """
+    t = JUDGE_TEMPERATURE if temperature is None else temperature
+    cache, key = _judgment_cache_for(prompt, model, system_content, t, repeat_idx, use_cache)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            _set_cache_hit(call_meta, True)
+            return hit
+    out = await _acall_judge_with_retries(prompt, model, system_content, t, prompt_prefix, call_meta)
+    if cache is not None:
+        cache.put(key, model, *out)
+    _set_cache_hit(call_meta, False)
+    return out
+
+
+async def _acall_judge_with_retries(
+    prompt: str,
+    model: str,
+    system_content: str,
+    t: float,
+    prompt_prefix: Optional[str] = None,
+    call_meta: Optional[dict] = None,
+):
+    max_retries = _max_judge_retries()
+    attempts = max_retries + 1
+    last_exc: Optional[BaseException] = None
+    provider = provider_for_model(model)
+    limiter = get_rate_limiter()
+    est_tokens = estimate_request_tokens(prompt, system_content, JUDGE_MAX_OUTPUT_TOKENS)
+    for attempt in range(attempts):
+        await limiter.aacquire(provider, model, est_tokens)
+        try:
+            out = await _acall_judge_once(prompt, model, system_content, t, prompt_prefix, call_meta)
+        except Exception as e:
+            last_exc = e
+            if attempt >= max_retries or not _retryable_judge_error(e):
+                raise
+            delay = _retry_delay_sec(attempt)
+            _log_retry(attempt, attempts, e, delay)
+            if not _pause_after_rate_limit(limiter, provider, model, e, delay):
+                await asyncio.sleep(delay)
+            continue
+        _record_judge_usage(limiter, provider, model, est_tokens, out)
+        return out
+    assert last_exc is not None
+    raise last_exc
+
+
+def _judgment_cache_for(
+    prompt: str,
+    model: str,
+    system_content: str,
+    temperature: float,
+    repeat_idx: Optional[int],
+    use_cache: Optional[bool],
+):
+    """(cache, key) for this request, or (None, None) when caching is off."""
+    if not cache_enabled(use_cache):
+        return None, None
+    key = judgment_cache_key(prompt, system_content, model, temperature, JUDGE_RESPONSE_SCHEMA, repeat_idx)
+    return get_judgment_cache(), key
+
+
+def _set_cache_hit(call_meta: Optional[dict], hit: bool) -> None:
+    if call_meta is not None:
+        call_meta["cache_hit"] = hit
+
+
+def call_judge_n(
+    prompt: str,
+    model: str,
+    n: int,
+    system_content: str = "You are an evaluator. Output JSON only.",
+    temperature: Optional[float] = None,
+):
+    """
+    One OpenAI request for ``n`` choices of the same judge prompt (the ``n`` parameter), for multi-sample runs.
+    Returns (contents, input_tokens, output_tokens_per_choice): the prompt is billed once, and the completion
+    total (the API reports only the sum) is split across choices by their share of the output text.
+    Same retries, rate limiting and structured-output fallback as :func:`call_judge`; no judgment cache.
+    Raises ValueError for Claude models (Messages API has no ``n``).
+    """
+    if is_claude_model(model):
+        raise ValueError(f"call_judge_n needs an OpenAI judge; {model!r} has no multi-choice sampling.")
+    if n < 1:
+        raise ValueError(f"n must be >= 1, got {n}.")
+    t = JUDGE_TEMPERATURE if temperature is None else temperature
+    est_tokens = estimate_request_tokens(prompt, system_content, JUDGE_MAX_OUTPUT_TOKENS * n)
+    return _with_judge_retries(lambda: _call_openai(prompt, model, system_content, t, n=n), model, est_tokens)
+
+
+def _split_output_tokens(contents: list, total: Optional[int]) -> list:
+    """Apportion ``total`` completion tokens over choices by text length (largest remainder; sums to total)."""
+    if total is None:
+        return [None] * len(contents)
+    weights = [max(1, len(c)) for c in contents]
+    wsum = sum(weights)
+    exact = [total * w / wsum for w in weights]
+    shares = [int(x) for x in exact]
+    by_remainder = sorted(range(len(exact)), key=lambda i: exact[i] - shares[i], reverse=True)
+    for i in by_remainder[: total - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+
+def judge_request_params(
+    prompt: str,
+    model: str,
+    system_content: str = "You are an evaluator. Output JSON only.",
+    temperature: Optional[float] = None,
+    prompt_prefix: Optional[str] = None,
+    format_step: int = 0,
+) -> dict:
+    """
+    Request body of call_judge's attempt for ``model``'s provider (OpenAI: the ``format_step``-th
+    response_format of the structured-output fallback chain, see OPENAI_FORMAT_STEPS; Anthropic: JSON hint in
+    system, thinking disabled, cacheable ``prompt_prefix`` block). Used for batch submissions (batch_judging.py).
+    """
+    t = JUDGE_TEMPERATURE if temperature is None else temperature
+    if is_claude_model(model):
+        return _anthropic_judge_request(prompt, model, system_content, t, prompt_prefix)
+    response_format = _OPENAI_RESPONSE_FORMAT_CHAIN[format_step][0]
+    return _openai_judge_request(prompt, model, system_content, t, response_format)
+
+
+def response_format_rejected(status_code: Optional[int], message: str) -> bool:
+    """True if an OpenAI error (status + message) rejected the structured output mode (e.g. base gpt-4)."""
+    if status_code != 400:
         return False
+    msg = str(message).lower()
     return (
         "json_schema" in msg
         or "response_format" in msg
@@ -288,76 +758,114 @@ def _openai_response_format_not_supported(err: BaseException) -> bool:
     )
 
 
-def _call_openai(prompt: str, model: str, system_content: str, temperature: float):
-    """Call OpenAI judge. Requires OPENAI_API_KEY."""
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key or not api_key.strip():
-        raise RuntimeError(
-            "OPENAI_API_KEY is not set. Add it to .env at the repo root, or export it before running."
-        )
-    try:
-        from openai import OpenAI
-    except ImportError:
-        raise RuntimeError("openai package is not installed. Run: pip install openai")
+def _openai_response_format_not_supported(err: BaseException) -> bool:
+    """True if the API rejected structured output mode for this model (e.g. base gpt-4)."""
+    return response_format_rejected(getattr(err, "status_code", None), str(err))
 
-    print(f"[judge] Calling OpenAI ({model})...", file=sys.stderr)
-    client = OpenAI(api_key=api_key.strip())
-    messages = [
-        {"role": "system", "content": system_content},
-        {"role": "user", "content": prompt},
-    ]
-    base_kw = dict(
+
+_OPENAI_JUDGE_SCHEMA_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "judge_output",
+        "strict": True,
+        "schema": JUDGE_RESPONSE_SCHEMA,
+    },
+}
+
+# Structured-output fallback chain: (response_format, message logged when the *previous* mode was rejected).
+_OPENAI_RESPONSE_FORMAT_CHAIN = (
+    (_OPENAI_JUDGE_SCHEMA_FORMAT, None),
+    ({"type": "json_object"}, "json_schema not supported for {model}; retrying with json_object mode…"),
+    (None, "json_object mode not supported for {model}; plain completion + parse…"),
+)
+OPENAI_FORMAT_STEPS = len(_OPENAI_RESPONSE_FORMAT_CHAIN)
+
+
+def _openai_judge_request(
+    prompt: str,
+    model: str,
+    system_content: str,
+    temperature: float,
+    response_format,
+    n: int = 1,
+) -> dict:
+    kw = dict(
         model=model,
-        messages=messages,
+        messages=[
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": prompt},
+        ],
         temperature=temperature,
-        max_tokens=500,
+        max_tokens=JUDGE_MAX_OUTPUT_TOKENS,
     )
-    schema_format = {
-        "type": "json_schema",
-        "json_schema": {
-            "name": "judge_output",
-            "strict": True,
-            "schema": JUDGE_RESPONSE_SCHEMA,
-        },
-    }
-
-    def _complete(response_format: Optional[dict]):
-        kw = dict(base_kw)
-        if response_format is not None:
-            kw["response_format"] = response_format
-        return client.chat.completions.create(**kw)
+    if response_format is not None:
+        kw["response_format"] = response_format
+    if n > 1:
+        kw["n"] = n
+    return kw
 
-    try:
-        resp = _complete(schema_format)
-    except Exception as e:
-        if not _openai_response_format_not_supported(e):
-            raise
-        print(
-            f"[judge] json_schema not supported for {model}; retrying with json_object mode…",
-            file=sys.stderr,
-        )
-        try:
-            resp = _complete({"type": "json_object"})
-        except Exception as e2:
-            if not _openai_response_format_not_supported(e2):
-                raise
-            print(
-                f"[judge] json_object mode not supported for {model}; plain completion + parse…",
-                file=sys.stderr,
-            )
-            resp = _complete(None)
 
-    content = ""
-    if resp.choices and resp.choices[0].message.content:
-        content = resp.choices[0].message.content.strip()
+def _openai_judge_result(resp):
+    content, input_tokens, output_tokens = _openai_content_and_usage(resp)
     print(f"[judge] OpenAI response received ({len(content)} chars)", file=sys.stderr)
     if not content:
         raise RuntimeError("Judge API returned empty response.")
+    return content, input_tokens, output_tokens
+
 
+def _openai_judge_n_result(resp, n: int):
+    """(contents by choice index, input_tokens, per-choice output tokens) for an ``n``-choice completion."""
+    choices = sorted(resp.choices or [], key=lambda c: c.index)
+    contents = [(c.message.content or "").strip() for c in choices]
+    print(f"[judge] OpenAI response received ({len(contents)}/{n} choices)", file=sys.stderr)
+    if len(contents) != n or not all(contents):
+        raise RuntimeError(f"Judge API returned {len(contents)} choice(s) (expected {n}) or an empty choice.")
     usage = resp.usage
     input_tokens = usage.prompt_tokens if usage else None
     output_tokens = usage.completion_tokens if usage else None
-    return content, input_tokens, output_tokens
+    return contents, input_tokens, _split_output_tokens(contents, output_tokens)
+
+
+def _call_openai(prompt: str, model: str, system_content: str, temperature: float, n: int = 1):
+    """Call OpenAI judge (``n`` > 1: one request, n choices — see call_judge_n). Requires OPENAI_API_KEY."""
+    client = get_client("openai")
+    print(f"[judge] Calling OpenAI ({model})...", file=sys.stderr)
+    last = len(_OPENAI_RESPONSE_FORMAT_CHAIN) - 1
+    for i, (response_format, fallback_msg) in enumerate(_OPENAI_RESPONSE_FORMAT_CHAIN):
+        if fallback_msg:
+            print(f"[judge] {fallback_msg.format(model=model)}", file=sys.stderr)
+        try:
+            raw = client.chat.completions.with_raw_response.create(
+                **_openai_judge_request(prompt, model, system_content, temperature, response_format, n=n)
+            )
+            break
+        except Exception as e:
+            if i == last or not _openai_response_format_not_supported(e):
+                raise
+    _observe_rate_limit_headers("openai", model, raw)
+    if n > 1:
+        return _openai_judge_n_result(raw.parse(), n)
+    return _openai_judge_result(raw.parse())
+
+
+async def _acall_openai(prompt: str, model: str, system_content: str, temperature: float):
+    """Async OpenAI judge call (same structured-output fallback chain as ``_call_openai``)."""
+    client = get_client("openai", async_client=True)
+    print(f"[judge] Calling OpenAI ({model}, async)...", file=sys.stderr)
+    last = len(_OPENAI_RESPONSE_FORMAT_CHAIN) - 1
+    for i, (response_format, fallback_msg) in enumerate(_OPENAI_RESPONSE_FORMAT_CHAIN):
+        if fallback_msg:
+            print(f"[judge] {fallback_msg.format(model=model)}", file=sys.stderr)
+        try:
+            raw = await client.chat.completions.with_raw_response.create(
+                **_openai_judge_request(prompt, model, system_content, temperature, response_format)
+            )
+            break
+        except Exception as e:
+            if i == last or not _openai_response_format_not_supported(e):
+                raise
+    _observe_rate_limit_headers("openai", model, raw)
+    return _openai_judge_result(await _maybe_await(raw.parse()))
 
 
 def extract_json_from_text(text: str):
@@ -389,46 +897,93 @@ def extract_json_from_text(text: str):
     return None
 
 
-def _call_anthropic(prompt: str, model: str, system_content: str, temperature: float):
-    """Call Anthropic Claude judge. Requires ANTHROPIC_API_KEY."""
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key or not api_key.strip():
-        raise RuntimeError(
-            "ANTHROPIC_API_KEY is not set. Add it to .env at the repo root, or export it before running."
-        )
-    try:
-        import anthropic
-    except ImportError:
-        raise RuntimeError("anthropic package is not installed. Run: pip install anthropic")
-
-    print(f"[judge] Calling Anthropic Claude ({model})...", file=sys.stderr)
-    client = anthropic.Anthropic(api_key=api_key.strip())
-
+def _anthropic_user_content(prompt: str, prompt_prefix: Optional[str], model: str = "", system: str = ""):
+    """
+    Plain string, or [prefix block with ``cache_control``, rest of prompt] when ``prompt_prefix`` leads ``prompt``
+    and the cached span (``system`` + prefix, estimated) reaches :func:`anthropic_min_cacheable_tokens`. The
+    concatenated text is identical either way.
+    """
+    if not prompt_prefix or not prompt.startswith(prompt_prefix) or not prompt_cache_enabled():
+        return prompt
+    if approx_tokens(system) + approx_tokens(prompt_prefix) < anthropic_min_cacheable_tokens(model):
+        return prompt
+    blocks = [{"type": "text", "text": prompt_prefix, "cache_control": {"type": "ephemeral"}}]
+    rest = prompt[len(prompt_prefix):]
+    if rest:
+        blocks.append({"type": "text", "text": rest})
+    return blocks
+
+
+def _anthropic_judge_request(
+    prompt: str,
+    model: str,
+    system_content: str,
+    temperature: float,
+    prompt_prefix: Optional[str] = None,
+) -> dict:
     # Use prompt-only (structured output API varies by SDK version)
     # Disable extended thinking for simpler, faster responses (no thinking blocks)
-    kwargs = {
+    system = f"{system_content}\n\nRespond with a JSON object: {{\"score\": <0-100>, \"justification\": \"<short explanation>\"}}"
+    return {
         "model": model,
-        "max_tokens": 500,
-        "system": f"{system_content}\n\nRespond with a JSON object: {{\"score\": <0-100>, \"justification\": \"<short explanation>\"}}",
-        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": JUDGE_MAX_OUTPUT_TOKENS,
+        "system": system,
+        "messages": [{"role": "user", "content": _anthropic_user_content(prompt, prompt_prefix, model, system)}],
         "temperature": temperature,
         "thinking": {"type": "disabled"},
     }
 
-    resp = client.messages.create(**kwargs)
 
-    content = ""
-    if resp.content:
-        for block in resp.content:
-            if hasattr(block, "text") and block.text:
-                content = block.text.strip()
-                break
+def anthropic_cache_usage(usage) -> dict:
+    """``cache_read_input_tokens`` / ``cache_creation_input_tokens`` from a Messages usage object or dict."""
+    get = usage.get if isinstance(usage, dict) else (lambda k: getattr(usage, k, None))
+    return {
+        "cache_read_input_tokens": get("cache_read_input_tokens") if usage else None,
+        "cache_creation_input_tokens": get("cache_creation_input_tokens") if usage else None,
+    }
+
+
+def _anthropic_judge_result(resp, call_meta: Optional[dict] = None):
+    content, input_tokens, output_tokens = _anthropic_content_and_usage(resp)
+    if call_meta is not None:
+        call_meta.update(anthropic_cache_usage(getattr(resp, "usage", None)))
     print(f"[judge] Anthropic response received ({len(content)} chars)", file=sys.stderr)
     if not content:
         raise RuntimeError("Judge API returned empty response.")
+    return content, input_tokens, output_tokens
 
-    usage = getattr(resp, "usage", None)
-    input_tokens = usage.input_tokens if usage else None
-    output_tokens = usage.output_tokens if usage else None
 
-    return content, input_tokens, output_tokens
+def _call_anthropic(
+    prompt: str,
+    model: str,
+    system_content: str,
+    temperature: float,
+    prompt_prefix: Optional[str] = None,
+    call_meta: Optional[dict] = None,
+):
+    """Call Anthropic Claude judge. Requires ANTHROPIC_API_KEY."""
+    client = get_client("anthropic")
+    print(f"[judge] Calling Anthropic Claude ({model})...", file=sys.stderr)
+    raw = client.messages.with_raw_response.create(
+        **_anthropic_judge_request(prompt, model, system_content, temperature, prompt_prefix)
+    )
+    _observe_rate_limit_headers("anthropic", model, raw)
+    return _anthropic_judge_result(raw.parse(), call_meta)
+
+
+async def _acall_anthropic(
+    prompt: str,
+    model: str,
+    system_content: str,
+    temperature: float,
+    prompt_prefix: Optional[str] = None,
+    call_meta: Optional[dict] = None,
+):
+    """Async Anthropic Claude judge call. Requires ANTHROPIC_API_KEY."""
+    client = get_client("anthropic", async_client=True)
+    print(f"[judge] Calling Anthropic Claude ({model}, async)...", file=sys.stderr)
+    raw = await client.messages.with_raw_response.create(
+        **_anthropic_judge_request(prompt, model, system_content, temperature, prompt_prefix)
+    )
+    _observe_rate_limit_headers("anthropic", model, raw)
+    return _anthropic_judge_result(await _maybe_await(raw.parse()), call_meta)
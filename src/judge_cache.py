@@ -0,0 +1,175 @@
+"""
+On-disk judgment cache: identical judge requests are answered from SQLite instead of the API.
+
+Key = SHA-256 of (rendered prompt, system_content, model, temperature, response schema, repeat index), so a
+re-run of the same condition/dataset at the same repeat slot replays the stored
+``(raw_content, input_tokens, output_tokens)`` — dashboard re-runs and smoke runs become local lookups.
+Stored token counts are the original call's usage (what the judgment cost when it was paid for); rows
+served from here are marked ``cache_hit: true``.
+
+The store is size-bounded (least-recently-used entries are evicted past JUDGE_CACHE_MAX_ENTRIES).
+It is **opt-in**: replayed outputs are not new samples, so a stability run that hit the cache would report
+agreement that was never measured. Enable it for smoke runs and dashboard re-runs only:
+JUDGE_CACHE=1, ``run_experiment(use_cache=True)`` or ``call_judge(..., use_cache=True)``.
+
+Env: JUDGE_CACHE (default 0), JUDGE_CACHE_PATH (default ``.cache/judgments.sqlite3`` under the repo root),
+JUDGE_CACHE_MAX_ENTRIES (default 50000).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from utils import REPO_ROOT
+
+JUDGE_CACHE_PATH_DEFAULT = REPO_ROOT / ".cache" / "judgments.sqlite3"
+JUDGE_CACHE_MAX_ENTRIES_DEFAULT = 50_000
+# Evict down to this fraction of the cap, so eviction runs once per batch of inserts rather than every put.
+_EVICT_TO_FRACTION = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS judgments (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    content TEXT,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS judgments_last_used ON judgments (last_used);
+"""
+
+
+def cache_enabled(use_cache: Optional[bool] = None) -> bool:
+    """Explicit ``use_cache`` wins; otherwise env JUDGE_CACHE (off unless 1/true/on/yes)."""
+    if use_cache is not None:
+        return bool(use_cache)
+    return (os.environ.get("JUDGE_CACHE") or "0").strip().lower() in ("1", "true", "on", "yes")
+
+
+def judgment_cache_key(
+    prompt: str,
+    system_content: str,
+    model: str,
+    temperature: float,
+    response_schema: Optional[dict],
+    repeat_idx: Optional[int],
+) -> str:
+    """Content address for one judge request (hex SHA-256 of a canonical JSON encoding)."""
+    payload = json.dumps(
+        {
+            "prompt": prompt,
+            "system": system_content,
+            "model": str(model).strip(),
+            "temperature": float(temperature),
+            "schema": response_schema,
+            "repeat_idx": repeat_idx,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class JudgmentCache:
+    """SQLite-backed LRU of judge results; one connection shared across threads behind a lock."""
+
+    def __init__(self, path: Path, max_entries: int = JUDGE_CACHE_MAX_ENTRIES_DEFAULT):
+        self.path = Path(path)
+        self.max_entries = max(1, int(max_entries))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM judgments").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[int], Optional[int]]]:
+        """Stored ``(content, input_tokens, output_tokens)`` or None; a hit refreshes its LRU position."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, input_tokens, output_tokens FROM judgments WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE judgments SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return row[0], row[1], row[2]
+
+    def put(
+        self,
+        key: str,
+        model: str,
+        content: str,
+        input_tokens: Optional[int],
+        output_tokens: Optional[int],
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO judgments "
+                "(key, model, content, input_tokens, output_tokens, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, str(model), content, input_tokens, output_tokens, now, now),
+            )
+            self._count += cur.rowcount
+            if self._count > self.max_entries:
+                self._evict_locked(int(self.max_entries * _EVICT_TO_FRACTION))
+            self._conn.commit()
+
+    def _evict_locked(self, keep: int) -> None:
+        self._conn.execute(
+            "DELETE FROM judgments WHERE key IN "
+            "(SELECT key FROM judgments ORDER BY last_used ASC LIMIT ?)",
+            (max(0, self._count - keep),),
+        )
+        self._count = self._conn.execute("SELECT COUNT(*) FROM judgments").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM judgments")
+            self._conn.commit()
+            self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_CACHE: Optional[JudgmentCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_settings() -> Tuple[Path, int]:
+    raw_path = (os.environ.get("JUDGE_CACHE_PATH") or "").strip()
+    path = Path(raw_path).expanduser() if raw_path else JUDGE_CACHE_PATH_DEFAULT
+    raw_max = (os.environ.get("JUDGE_CACHE_MAX_ENTRIES") or "").strip()
+    try:
+        max_entries = int(raw_max) if raw_max else JUDGE_CACHE_MAX_ENTRIES_DEFAULT
+    except ValueError:
+        max_entries = JUDGE_CACHE_MAX_ENTRIES_DEFAULT
+    return path, max_entries
+
+
+def get_judgment_cache() -> JudgmentCache:
+    """Process-wide cache for the configured path (reopened if JUDGE_CACHE_PATH / max entries change)."""
+    global _CACHE
+    path, max_entries = _cache_settings()
+    with _CACHE_LOCK:
+        if _CACHE is None or _CACHE.path != path:
+            if _CACHE is not None:
+                _CACHE.close()
+            _CACHE = JudgmentCache(path, max_entries)
+        else:
+            _CACHE.max_entries = max(1, max_entries)
+        return _CACHE
@@ -0,0 +1,144 @@
+"""
+In-process memo of parsed results files, so the dashboard does not reparse unchanged files on every rerun.
+
+Streamlit reruns ``dashboard.py`` on each interaction, but imported modules live as long as the server process.
+Entries here therefore survive reruns, tabs and sessions. An entry is keyed by (kind, path, size, mtime_ns).
+When a file is rewritten or appended, the next lookup gets a new key, rebuilds the entry and drops the old one.
+
+Memory is bounded by LRU eviction. Each entry weighs its file's size on disk, and the total stays under
+JUDGE_DASHBOARD_CACHE_MB (default 512). A single file larger than the cap is built but not kept.
+
+Values are shared by every caller and must not be mutated:
+- :func:`cached_jsonl` / :func:`cached_rows`: the file's rows, parsed once, as a tuple of read-only mappings
+- :func:`cached_aggregator`: the file's ``RowAggregator`` over those rows; combine several with
+  ``RowAggregator.update``
+
+A cold load is one ``load_jsonl`` pass. The SQLite results catalog is for cross-file queries and is not involved.
+
+Env: JUDGE_DASHBOARD_CACHE_MB (default 512; 0 disables caching).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+from row_aggregator import RowAggregator
+from utils import load_jsonl
+
+JUDGE_DASHBOARD_CACHE_MB_DEFAULT = 512
+
+T = TypeVar("T")
+_Key = Tuple[str, str, int, int]
+
+
+class LoadCache:
+    """LRU of built values keyed by (kind, resolved path, size, mtime_ns), bounded by total file bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[_Key, Tuple[Any, int]]" = OrderedDict()
+        self._current: Dict[Tuple[str, str], _Key] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _drop(self, key: _Key) -> None:
+        _, weight = self._entries.pop(key)
+        self._bytes -= weight
+        if self._current.get(key[:2]) == key:
+            del self._current[key[:2]]
+
+    def get(self, kind: str, path: Path, build: Callable[[Path], T]) -> T:
+        """The value ``build(path)`` for the file as it is now on disk, built at most once per version."""
+        path = Path(path)
+        stat = path.stat()
+        key = (kind, str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return hit[0]
+            self.misses += 1
+        value = build(path)
+        weight = stat.st_size
+        with self._lock:
+            stale = self._current.get(key[:2])
+            if stale is not None and stale != key:
+                self._drop(stale)
+            if key not in self._entries and weight <= self.max_bytes:
+                self._entries[key] = (value, weight)
+                self._current[key[:2]] = key
+                self._bytes += weight
+                while self._bytes > self.max_bytes:
+                    self._drop(next(iter(self._entries)))
+        return value
+
+    def invalidate(self, path: Path) -> None:
+        """Forget every entry for ``path`` (e.g. after deleting the file)."""
+        resolved = str(Path(path).resolve())
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == resolved]:
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._current.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_CACHE: Optional[LoadCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def _max_bytes() -> int:
+    raw = (os.environ.get("JUDGE_DASHBOARD_CACHE_MB") or "").strip()
+    try:
+        mb = float(raw) if raw else JUDGE_DASHBOARD_CACHE_MB_DEFAULT
+    except ValueError:
+        mb = JUDGE_DASHBOARD_CACHE_MB_DEFAULT
+    return max(0, int(mb * 1024 * 1024))
+
+
+def get_load_cache() -> LoadCache:
+    """Process-wide cache (its cap follows JUDGE_DASHBOARD_CACHE_MB)."""
+    global _CACHE
+    max_bytes = _max_bytes()
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = LoadCache(max_bytes)
+        elif _CACHE.max_bytes != max_bytes:
+            _CACHE.max_bytes = max_bytes
+            _CACHE.clear()
+        return _CACHE
+
+
+def _freeze(rows) -> Tuple[Mapping, ...]:
+    return tuple(MappingProxyType(r) for r in rows)
+
+
+def cached_jsonl(path: Path) -> Tuple[Mapping, ...]:
+    """Rows of a JSONL file exactly as written."""
+    return get_load_cache().get("jsonl", path, lambda p: _freeze(load_jsonl(p)))
+
+
+def cached_rows(path: Path) -> Tuple[Mapping, ...]:
+    """Rows of a results file: the :func:`cached_jsonl` tuple, so rows and aggregator share one parse."""
+    return cached_jsonl(path)
+
+
+def cached_aggregator(path: Path) -> RowAggregator:
+    """``RowAggregator`` over :func:`cached_jsonl`, its slices keyed by the file name."""
+    return get_load_cache().get("aggregator", path, lambda p: RowAggregator().add_rows(cached_jsonl(p), p.name))
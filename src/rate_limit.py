@@ -0,0 +1,297 @@
+"""
+Proactive rate limiting for judge API calls (shared by every worker thread / coroutine).
+
+Each (provider, model) gets two token buckets refilled continuously: requests per minute (RPM) and
+tokens per minute (TPM, prompt estimate + max output tokens). Callers reserve capacity before a request and
+sleep only as long as the bucket needs to refill, so dispatch is paced just under the limit instead of
+waiting for 429s.
+
+Limits are seeded from config (``configure_rate_limits`` / env) and then adapted from response headers:
+OpenAI ``x-ratelimit-*`` and Anthropic ``anthropic-ratelimit-*`` (limit, remaining, reset), plus
+``retry-after`` on 429s, which pauses that model for **all** workers at once.
+
+Env: JUDGE_RATE_LIMIT=0 disables pacing; JUDGE_RPM / JUDGE_TPM (every provider),
+JUDGE_RPM_OPENAI / JUDGE_TPM_OPENAI / JUDGE_RPM_ANTHROPIC / JUDGE_TPM_ANTHROPIC, and JUDGE_RATE_LIMITS as
+JSON for per-model seeds, e.g. ``{"gpt-4o": {"rpm": 500, "tpm": 30000}}``.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Mapping, Optional, Tuple
+
+# Pace to this fraction of the advertised limit (leaves room for clock skew and other clients on the key).
+RATE_LIMIT_HEADROOM = 0.9
+# Rough characters-per-token for English prompts (no tokenizer dependency).
+CHARS_PER_TOKEN = 4.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap token-count estimate for a prompt (≈ 4 characters per token)."""
+    if not text:
+        return 0
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def estimate_request_tokens(prompt: str, system_content: str = "", max_output_tokens: int = 0) -> int:
+    """Tokens a request counts against TPM: prompt + system estimate plus the output cap."""
+    return approx_tokens(prompt) + approx_tokens(system_content) + int(max_output_tokens or 0)
+
+
+def _parse_reset_seconds(raw: Optional[str]) -> Optional[float]:
+    """Seconds until reset from ``"6m0s"`` / ``"120ms"`` / ``"1.5"`` (OpenAI) or an RFC 3339 time (Anthropic)."""
+    if raw is None:
+        return None
+    s = str(raw).strip()
+    if not s:
+        return None
+    try:
+        return max(0.0, float(s))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(s)
+    if parts and "".join(n + u for n, u in parts) == s:
+        scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+        return sum(float(n) * scale[u] for n, u in parts)
+    try:
+        when = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _header(headers: Mapping, name: str) -> Optional[str]:
+    try:
+        v = headers.get(name)
+    except Exception:
+        return None
+    return None if v is None else str(v)
+
+
+def _header_float(headers: Mapping, name: str) -> Optional[float]:
+    v = _header(headers, name)
+    if v is None:
+        return None
+    try:
+        return float(v)
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Continuously refilled bucket sized per minute. ``reserve`` may overdraw and returns the wait in seconds."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.capacity > 0:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        self.level -= amount
+        if self.level >= 0 or self.capacity <= 0:
+            return 0.0
+        return -self.level * 60.0 / self.capacity
+
+    def refund(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def set_capacity(self, per_minute: float, now: float) -> None:
+        self._refill(now)
+        self.capacity = float(per_minute)
+        self.level = min(self.level, self.capacity)
+
+    def clamp(self, remaining: float, now: float) -> None:
+        """Server says only ``remaining`` is left: never believe we have more than that."""
+        self._refill(now)
+        self.level = min(self.level, float(remaining))
+
+
+class RateLimiter:
+    """RPM / TPM buckets per (provider, model), seeded from config and adapted from response headers."""
+
+    def __init__(self, limits: Optional[Dict[str, dict]] = None, enabled: bool = True):
+        self.enabled = enabled
+        self._limits = {str(k).strip().lower(): dict(v) for k, v in (limits or {}).items()}
+        self._lock = threading.Lock()
+        self._rpm: Dict[Tuple[str, str], TokenBucket] = {}
+        self._tpm: Dict[Tuple[str, str], TokenBucket] = {}
+        self._paused_until: Dict[Tuple[str, str], float] = {}
+
+    def _seed(self, provider: str, model: str, kind: str) -> Optional[float]:
+        for key in (str(model).strip().lower(), provider, "*"):
+            v = self._limits.get(key, {}).get(kind)
+            if v:
+                return float(v) * RATE_LIMIT_HEADROOM
+        return None
+
+    def _bucket(self, table: dict, key: Tuple[str, str], kind: str) -> Optional[TokenBucket]:
+        b = table.get(key)
+        if b is None:
+            seed = self._seed(key[0], key[1], kind)
+            if seed:
+                b = table[key] = TokenBucket(seed)
+        return b
+
+    def configured_limit(self, provider: str, model: str, kind: str) -> Optional[float]:
+        """Seeded ``"rpm"`` / ``"tpm"`` for a model (after headroom), for planning; None when not configured."""
+        return self._seed(provider, model, kind)
+
+    def reserve(self, provider: str, model: str, est_tokens: int) -> float:
+        """Reserve one request and ``est_tokens``; return seconds to wait before sending (0 = go now)."""
+        if not self.enabled:
+            return 0.0
+        key = (provider, str(model))
+        now = time.monotonic()
+        with self._lock:
+            wait = max(0.0, self._paused_until.get(key, 0.0) - now)
+            rpm = self._bucket(self._rpm, key, "rpm")
+            tpm = self._bucket(self._tpm, key, "tpm")
+            if rpm is not None:
+                wait = max(wait, rpm.reserve(1, now))
+            if tpm is not None:
+                wait = max(wait, tpm.reserve(est_tokens, now))
+        return wait
+
+    def acquire(self, provider: str, model: str, est_tokens: int) -> float:
+        """Blocking reserve: sleep until the request fits the budget. Returns the time slept."""
+        wait = self.reserve(provider, model, est_tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, provider: str, model: str, est_tokens: int) -> float:
+        """Async :meth:`acquire` (``asyncio.sleep`` instead of blocking the loop)."""
+        wait = self.reserve(provider, model, est_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record_usage(self, provider: str, model: str, est_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Return the unused part of a TPM reservation once real usage is known."""
+        if not self.enabled or actual_tokens is None:
+            return
+        key = (provider, str(model))
+        with self._lock:
+            tpm = self._tpm.get(key)
+            if tpm is not None and actual_tokens < est_tokens:
+                tpm.refund(est_tokens - actual_tokens, time.monotonic())
+
+    def pause(self, provider: str, model: str, seconds: float) -> None:
+        """Hold every caller for this model for ``seconds`` (e.g. a 429 ``retry-after``)."""
+        if not self.enabled or seconds <= 0:
+            return
+        key = (provider, str(model))
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._paused_until[key] = max(self._paused_until.get(key, 0.0), until)
+
+    def update_from_headers(self, provider: str, model: str, headers: Optional[Mapping]) -> None:
+        """Adapt limits / remaining budget from ``x-ratelimit-*`` or ``anthropic-ratelimit-*`` headers."""
+        if not self.enabled or headers is None:
+            return
+        if provider == "anthropic":
+            names = {
+                "rpm": ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining"),
+                "tpm": ("anthropic-ratelimit-tokens-limit", "anthropic-ratelimit-tokens-remaining"),
+            }
+        else:
+            names = {
+                "rpm": ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests"),
+                "tpm": ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens"),
+            }
+        key = (provider, str(model))
+        now = time.monotonic()
+        with self._lock:
+            for kind, table in (("rpm", self._rpm), ("tpm", self._tpm)):
+                limit_h, remaining_h = names[kind]
+                limit = _header_float(headers, limit_h)
+                remaining = _header_float(headers, remaining_h)
+                if limit:
+                    b = table.get(key)
+                    if b is None:
+                        b = table[key] = TokenBucket(limit * RATE_LIMIT_HEADROOM)
+                    else:
+                        b.set_capacity(limit * RATE_LIMIT_HEADROOM, now)
+                if remaining is not None and key in table:
+                    table[key].clamp(remaining * RATE_LIMIT_HEADROOM, now)
+            retry_after = _parse_reset_seconds(_header(headers, "retry-after"))
+            if retry_after:
+                self._paused_until[key] = max(self._paused_until.get(key, 0.0), now + retry_after)
+
+
+def _limits_from_env() -> Dict[str, dict]:
+    limits: Dict[str, dict] = {}
+
+    def _num(name: str) -> Optional[float]:
+        raw = (os.environ.get(name) or "").strip()
+        if not raw:
+            return None
+        try:
+            return float(raw)
+        except ValueError:
+            return None
+
+    for scope, suffix in (("*", ""), ("openai", "_OPENAI"), ("anthropic", "_ANTHROPIC")):
+        for kind in ("rpm", "tpm"):
+            v = _num(f"JUDGE_{kind.upper()}{suffix}")
+            if v:
+                limits.setdefault(scope, {})[kind] = v
+    raw = (os.environ.get("JUDGE_RATE_LIMITS") or "").strip()
+    if raw:
+        try:
+            per_model = json.loads(raw)
+        except json.JSONDecodeError:
+            per_model = {}
+        if isinstance(per_model, dict):
+            for k, v in per_model.items():
+                if isinstance(v, dict):
+                    limits.setdefault(str(k).strip().lower(), {}).update(v)
+    return limits
+
+
+_LIMITER: Optional[RateLimiter] = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def _build_limiter(limits: Optional[Dict[str, dict]]) -> RateLimiter:
+    merged = _limits_from_env()
+    for k, v in (limits or {}).items():
+        merged.setdefault(str(k).strip().lower(), {}).update(v)
+    enabled = (os.environ.get("JUDGE_RATE_LIMIT") or "1").strip().lower() not in ("0", "false", "off", "no")
+    return RateLimiter(merged, enabled=enabled)
+
+
+def configure_rate_limits(limits: Optional[Dict[str, dict]] = None) -> RateLimiter:
+    """
+    (Re)build the shared limiter. ``limits`` maps a model id, ``"openai"`` / ``"anthropic"`` or ``"*"`` to
+    ``{"rpm": ..., "tpm": ...}`` and is merged over the env seeds.
+    """
+    global _LIMITER
+    limiter = _build_limiter(limits)
+    with _LIMITER_LOCK:
+        _LIMITER = limiter
+    return limiter
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide limiter shared by all judge calls (built from env on first use)."""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            _LIMITER = _build_limiter(None)
+        return _LIMITER
@@ -0,0 +1,315 @@
+"""
+SQLite catalog of results: every judgment of every ingested JSONL in one indexed table, so questions like
+"all runs of gpt-4o on mt_bench_full under per_item_custom" are queries rather than globbing and loading files.
+
+Tables: ``files`` holds one row per results file with its run config from the run manifest and the file's
+size/mtime. ``judgments`` holds one row per judgment (the columnar-store fields plus the justification text),
+keyed by (file, row). ``file`` is the file's path relative to the repo root (absolute outside it, see
+:func:`catalog_key`), so same-named shards of different plans stay apart.
+Indexes: (execution_id), (judge_model, condition_name, dataset_id), (item_id, metric_name).
+
+Ingest is idempotent. A file whose size and mtime match its ``files`` row is skipped; a changed file (e.g. a
+resumed run) has its judgments replaced in one transaction. ``prune`` drops files no longer on disk, and
+:meth:`ResultsDB.remove` drops given files (the dashboard calls it when it deletes one). A catalog written with an
+older schema is rebuilt on open.
+
+Query API: :meth:`ResultsDB.files`, :meth:`ResultsDB.judgments`, :meth:`ResultsDB.distinct`. The dashboard's View,
+Compare and Run summary tabs read rows through it.
+
+CLI: ``python src/results_catalog.py [files…] [--prune] [--judge M] [--condition C] [--dataset D]`` ingests
+``results/`` (or the given files), then lists the runs matching the filters.
+Env: JUDGE_RESULTS_DB (default ``.cache/results.sqlite3`` under the repo root).
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from columnar_store import RESULT_FIELDS, TEXT_FIELDS
+from run_manifest import build_manifest, load_manifest
+from utils import ENCODING, REPO_ROOT
+
+RESULTS_DIR = REPO_ROOT / "results"
+JUDGE_RESULTS_DB_DEFAULT = REPO_ROOT / ".cache" / "results.sqlite3"
+INGEST_BATCH_ROWS = 5_000
+# Bumped when the table layout or the meaning of ``file`` changes; older catalogs are dropped and re-ingested.
+SCHEMA_VERSION = 2
+
+_SQL_TYPES = {"string": "TEXT", "int32": "INTEGER", "int64": "INTEGER", "float64": "REAL", "bool_": "INTEGER"}
+JUDGMENT_FIELDS = RESULT_FIELDS + TEXT_FIELDS[1:]
+JUDGMENT_COLUMNS = tuple(name for name, _ in JUDGMENT_FIELDS)
+_BOOL_COLUMNS = {name for name, t in JUDGMENT_FIELDS if t == "bool_"}
+# Filters accepted by judgments() / distinct(); each maps to an indexed column.
+_FILTER_COLUMNS = ("execution_id", "judge_model", "condition_name", "dataset_id", "item_id", "metric_name")
+
+_SCHEMA = (
+    """
+CREATE TABLE IF NOT EXISTS files (
+    file TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    execution_id TEXT,
+    condition_name TEXT,
+    dataset_id TEXT,
+    judge_models TEXT,
+    metric_names TEXT,
+    repeats INTEGER,
+    temperature REAL,
+    rows INTEGER NOT NULL,
+    error_rows INTEGER,
+    created_at_min TEXT,
+    created_at_max TEXT,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS judgments (
+    file TEXT NOT NULL,
+    row INTEGER NOT NULL,
+"""
+    + "".join(f"    {name} {_SQL_TYPES[t]},\n" for name, t in JUDGMENT_FIELDS)
+    + """    PRIMARY KEY (file, row)
+);
+CREATE INDEX IF NOT EXISTS judgments_execution ON judgments (execution_id);
+CREATE INDEX IF NOT EXISTS judgments_judge_condition_dataset ON judgments (judge_model, condition_name, dataset_id);
+CREATE INDEX IF NOT EXISTS judgments_item_metric ON judgments (item_id, metric_name);
+"""
+)
+
+
+def catalog_key(path: Path) -> str:
+    """``file`` key: POSIX path relative to the repo root (relative paths count from there), else absolute."""
+    path = Path(path)
+    if not path.is_absolute():
+        path = REPO_ROOT / path
+    path = path.resolve()
+    try:
+        return path.relative_to(REPO_ROOT.resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+class ResultsDB:
+    """SQLite results catalog; one connection shared across threads behind a lock (as in ``judge_cache``)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._conn.executescript("DROP TABLE IF EXISTS judgments; DROP TABLE IF EXISTS files;")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+
+    def ingest(self, paths: Optional[Iterable[Path]] = None, *, prune: bool = False) -> Dict[str, int]:
+        """
+        Load changed results files (default: every ``results/*.jsonl``); unchanged ones are skipped.
+        Returns ``{"ingested", "skipped", "removed", "rows"}``.
+        """
+        paths = [Path(p) for p in paths] if paths is not None else sorted(RESULTS_DIR.glob("*.jsonl"))
+        stats = {"ingested": 0, "skipped": 0, "removed": 0, "rows": 0}
+        with self._lock:
+            catalogued = self._conn.execute("SELECT file, path, bytes, mtime_ns FROM files").fetchall()
+        known = {key: (size, mtime) for key, _, size, mtime in catalogued}
+        for path in paths:
+            stat = path.stat()
+            if known.get(catalog_key(path)) == (stat.st_size, stat.st_mtime_ns):
+                stats["skipped"] += 1
+                continue
+            stats["rows"] += self._ingest_file(path, stat)
+            stats["ingested"] += 1
+        if prune:
+            gone = [key for key, stored_path, _, _ in catalogued if not Path(stored_path).is_file()]
+            stats["removed"] = self._remove_keys(gone)
+        return stats
+
+    def remove(self, paths: Iterable[Path]) -> int:
+        """Drop the judgments and ``files`` rows of ``paths``; returns how many were catalogued."""
+        return self._remove_keys([catalog_key(p) for p in paths])
+
+    def _remove_keys(self, keys: Sequence[str]) -> int:
+        removed = 0
+        with self._lock:
+            for key in keys:
+                self._conn.execute("DELETE FROM judgments WHERE file = ?", (key,))
+                removed += self._conn.execute("DELETE FROM files WHERE file = ?", (key,)).rowcount
+            self._conn.commit()
+        return removed
+
+    def _ingest_file(self, path: Path, stat: os.stat_result) -> int:
+        manifest = load_manifest(path) or build_manifest(path)
+        cfg = manifest.get("config") or {}
+        key = catalog_key(path)
+        insert = (
+            f"INSERT INTO judgments (file, row, {', '.join(JUDGMENT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * (len(JUDGMENT_COLUMNS) + 2))})"
+        )
+        n = 0
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM judgments WHERE file = ?", (key,))
+                batch: List[tuple] = []
+                with path.open("r", encoding=ENCODING) as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        row = json.loads(line)
+                        batch.append((key, n) + tuple(row.get(c) for c in JUDGMENT_COLUMNS))
+                        n += 1
+                        if len(batch) >= INGEST_BATCH_ROWS:
+                            self._conn.executemany(insert, batch)
+                            batch = []
+                if batch:
+                    self._conn.executemany(insert, batch)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        str(path.resolve()),
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                        manifest.get("execution_id"),
+                        cfg.get("condition_name"),
+                        cfg.get("dataset_id"),
+                        json.dumps(cfg.get("judge_models") or []),
+                        json.dumps(cfg.get("metric_names") or []),
+                        cfg.get("repeats"),
+                        cfg.get("temperature"),
+                        n,
+                        manifest.get("error_rows"),
+                        manifest.get("created_at_min"),
+                        manifest.get("created_at_max"),
+                        time.time(),
+                    ),
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return n
+
+    @staticmethod
+    def _where(files: Optional[Sequence[Path]], filters: Dict[str, Optional[str]]) -> Tuple[str, list]:
+        clauses, params = [], []
+        if files is not None:
+            clauses.append(f"file IN ({', '.join('?' * len(files))})")
+            params.extend(catalog_key(f) for f in files)
+        for column, value in filters.items():
+            if column not in _FILTER_COLUMNS:
+                raise ValueError(f"Unknown filter {column!r}; use one of {_FILTER_COLUMNS}.")
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def files(self, **filters: Optional[str]) -> List[dict]:
+        """Catalog rows of ingested files that contain judgments matching ``filters`` (all files if none)."""
+        where, params = self._where(None, filters)
+        sql = "SELECT * FROM files"
+        if where:
+            sql += f" WHERE file IN (SELECT DISTINCT file FROM judgments{where})"
+        with self._lock:
+            cur = self._conn.execute(sql + " ORDER BY file", params)
+            names = [d[0] for d in cur.description]
+            out = [dict(zip(names, r)) for r in cur.fetchall()]
+        for entry in out:
+            entry["judge_models"] = json.loads(entry["judge_models"] or "[]")
+            entry["metric_names"] = json.loads(entry["metric_names"] or "[]")
+        return out
+
+    def judgments(
+        self,
+        *,
+        files: Optional[Sequence[Path]] = None,
+        columns: Optional[Sequence[str]] = None,
+        **filters: Optional[str],
+    ) -> List[dict]:
+        """
+        Judgment rows (dicts of ``columns``, default all) from ``files`` (paths or ``file`` keys) matching
+        ``filters`` — any of execution_id, judge_model, condition_name, dataset_id, item_id, metric_name — in file
+        order.
+        """
+        columns = tuple(columns) if columns is not None else JUDGMENT_COLUMNS
+        unknown = set(columns) - set(JUDGMENT_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown columns {sorted(unknown)}.")
+        where, params = self._where(files, filters)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(columns)} FROM judgments{where} ORDER BY file, row", params
+            ).fetchall()
+        bools = [i for i, c in enumerate(columns) if c in _BOOL_COLUMNS]
+        out = []
+        for r in rows:
+            d = dict(zip(columns, r))
+            for i in bools:
+                if r[i] is not None:
+                    d[columns[i]] = bool(r[i])
+            out.append(d)
+        return out
+
+    def distinct(self, column: str, *, files: Optional[Sequence[Path]] = None, **filters: Optional[str]) -> list:
+        """Sorted distinct non-null values of ``column`` among matching judgments."""
+        if column not in JUDGMENT_COLUMNS:
+            raise ValueError(f"Unknown column {column!r}.")
+        where, params = self._where(files, filters)
+        where = (where + " AND " if where else " WHERE ") + f"{column} IS NOT NULL"
+        with self._lock:
+            rows = self._conn.execute(f"SELECT DISTINCT {column} FROM judgments{where} ORDER BY 1", params)
+            return [r[0] for r in rows.fetchall()]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_DB: Optional[ResultsDB] = None
+_DB_LOCK = threading.Lock()
+
+
+def _db_path() -> Path:
+    raw = (os.environ.get("JUDGE_RESULTS_DB") or "").strip()
+    return Path(raw).expanduser() if raw else JUDGE_RESULTS_DB_DEFAULT
+
+
+def get_results_db() -> ResultsDB:
+    """Process-wide catalog for the configured path (reopened if JUDGE_RESULTS_DB changes)."""
+    global _DB
+    path = _db_path()
+    with _DB_LOCK:
+        if _DB is None or _DB.path != path:
+            if _DB is not None:
+                _DB.close()
+            _DB = ResultsDB(path)
+        return _DB
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest results JSONLs into the SQLite results catalog.")
+    parser.add_argument("paths", nargs="*", help="results files (default: every results/*.jsonl)")
+    parser.add_argument("--prune", action="store_true", help="drop catalogued files that are no longer on disk")
+    parser.add_argument("--judge", help="only list runs with judgments by this judge_model")
+    parser.add_argument("--condition", help="only list runs under this condition_name")
+    parser.add_argument("--dataset", help="only list runs on this dataset_id")
+    args = parser.parse_args()
+    db = get_results_db()
+    stats = db.ingest([Path(p) for p in args.paths] or None, prune=args.prune)
+    print(
+        f"{db.path}: ingested {stats['ingested']} file(s) ({stats['rows']} rows), "
+        f"{stats['skipped']} unchanged, {stats['removed']} removed"
+    )
+    for entry in db.files(judge_model=args.judge, condition_name=args.condition, dataset_id=args.dataset):
+        print(
+            f"  {entry['file']}: {entry['condition_name']} | {entry['dataset_id']} | "
+            f"{', '.join(entry['judge_models'])} | {entry['rows']} rows"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""
+Single-pass aggregation of results rows into every statistic the metric reports and dashboard show.
+
+:class:`RowAggregator` consumes rows once, streaming, and keeps one :class:`SliceStats` per
+(file, judge_model, condition_name, metric_name). Each slice holds:
+- per-item score and token sequences (in row order)
+- the score histogram and the score sum
+- token totals and latency
+- span status / trace / cache-hit counts
+- the adaptive-repeat cells (judgments made vs planned)
+
+:meth:`RowAggregator.select` merges the slices that match a filter. From the merged slice you can read:
+- repeat-stability headlines, per-item variance and exact agreement, all from one :class:`ScoreMatrix`
+- mean score, histogram and token totals
+- the ``otel_metrics`` dict and the ``repeat_savings`` dict
+
+So a view over many files walks each file's rows once instead of once per metric. Outputs equal the per-metric
+functions in ``compute_metrics``, including float rounding: every row carries a sequence number, so merged slices
+rebuild per-item scores in row order.
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from columnar_store import METRICS_COLUMNS, load_rows
+from stability_arrays import (
+    ScoreMatrix,
+    exact_agreement,
+    per_item_variance,
+    repeat_variability_headlines,
+    sequential_mean,
+)
+
+# Columns the aggregator reads (METRICS_COLUMNS plus prompt-cache tokens and latency).
+AGGREGATE_COLUMNS = METRICS_COLUMNS + ("cache_read_input_tokens", "cache_creation_input_tokens", "latency_ms")
+
+# (file, judge_model, condition_name, metric_name); metric_name is None for conditions A and C.
+SliceKey = Tuple[str, str, str, Optional[str]]
+
+
+class _ItemAcc:
+    """One item within a slice: (seq, value) pairs in row order, plus token sums for the OTEL detail table."""
+
+    __slots__ = ("group", "rows", "planned", "scores", "tokens", "in_sum", "in_n", "out_sum", "out_n")
+
+    def __init__(self, group: int = 0):
+        self.group = group
+        self.rows = 0
+        self.planned = 0
+        self.scores: List[Tuple[int, int]] = []
+        self.tokens: List[Tuple[int, int]] = []
+        self.in_sum = self.in_n = self.out_sum = self.out_n = 0
+
+    def extend(self, other: "_ItemAcc") -> None:
+        self.rows += other.rows
+        self.planned = max(self.planned, other.planned)
+        self.scores.extend(other.scores)
+        self.tokens.extend(other.tokens)
+        self.in_sum += other.in_sum
+        self.in_n += other.in_n
+        self.out_sum += other.out_sum
+        self.out_n += other.out_n
+
+
+class SliceStats:
+    """Accumulated statistics of one slice (or of several merged with :meth:`merge`)."""
+
+    def __init__(self, key: Optional[SliceKey] = None):
+        self.key = key
+        self.items: Dict[str, _ItemAcc] = {}
+        self.rows = 0
+        self.n_scored = 0
+        self.score_sum = 0
+        self.histogram: Counter = Counter()
+        self.in_sum = self.in_n = self.out_sum = self.out_n = 0
+        self.cache_read_sum = self.cache_read_n = self.cache_write_sum = self.cache_write_n = 0
+        self.latency_sum = 0.0
+        self.latency_n = 0
+        self.trace_ids: Dict[str, None] = {}
+        self.span_ok = self.span_error = self.cache_hits = 0
+        self.early_stop_rules: set = set()
+        self.sampling_modes: set = set()
+        # (judge, item, metric) -> [made, planned]; derived from ``items`` unless this slice is a merge.
+        self._cells: Optional[Dict[tuple, list]] = None
+        self._matrix: Optional[ScoreMatrix] = None
+
+    def add(self, row: dict, seq: int) -> None:
+        get = row.get
+        self.rows += 1
+        item_id = str(get("item_id", ""))
+        acc = self.items.get(item_id)
+        if acc is None:
+            acc = self.items[item_id] = _ItemAcc()
+        acc.rows += 1
+        planned = get("repeats_planned")
+        if planned and planned > acc.planned:
+            acc.planned = int(planned)
+        s = get("score")
+        if s is not None:
+            s = int(s)
+            acc.scores.append((seq, s))
+            self.n_scored += 1
+            self.score_sum += s
+            self.histogram[s] += 1
+        ti, to = get("input_tokens"), get("output_tokens")
+        if ti is not None:
+            acc.in_sum += ti
+            acc.in_n += 1
+            self.in_sum += ti
+            self.in_n += 1
+            if to is not None:
+                acc.tokens.append((seq, ti + to))
+        if to is not None:
+            acc.out_sum += to
+            acc.out_n += 1
+            self.out_sum += to
+            self.out_n += 1
+        cr, cw = get("cache_read_input_tokens"), get("cache_creation_input_tokens")
+        if cr is not None:
+            self.cache_read_sum += cr
+            self.cache_read_n += 1
+        if cw is not None:
+            self.cache_write_sum += cw
+            self.cache_write_n += 1
+        lat = get("latency_ms")
+        if lat is not None:
+            self.latency_sum += lat
+            self.latency_n += 1
+        tid = get("trace_id")
+        if tid:
+            self.trace_ids[tid] = None
+        status = get("span_status")
+        if status == "ok":
+            self.span_ok += 1
+        elif status == "error":
+            self.span_error += 1
+        if get("cache_hit"):
+            self.cache_hits += 1
+        stop = get("early_stop")
+        if stop and stop not in self.early_stop_rules:
+            self.early_stop_rules.add(stop)
+        mode = get("sampling_mode")
+        if mode and mode not in self.sampling_modes:
+            self.sampling_modes.add(mode)
+
+    @property
+    def tokens(self) -> Dict[str, int]:
+        """Token totals as the dashboard's cost tables use them (missing counts as 0)."""
+        return {
+            "in": self.in_sum,
+            "out": self.out_sum,
+            "cache_read": self.cache_read_sum,
+            "cache_write": self.cache_write_sum,
+        }
+
+    def cells(self) -> Dict[tuple, list]:
+        """``{(judge, item_id, metric): [judgments made, repeats planned]}``."""
+        if self._cells is not None:
+            return self._cells
+        judge, metric = (self.key[1], self.key[3]) if self.key else ("", None)
+        return {(judge, item_id, metric): [acc.rows, acc.planned] for item_id, acc in self.items.items()}
+
+    @classmethod
+    def merge(
+        cls,
+        slices: Iterable["SliceStats"],
+        prefixes: Optional[Sequence[str]] = None,
+    ) -> "SliceStats":
+        """
+        Combine ``slices``. By default the same item_id across slices is one item (scores back in row order).
+        With ``prefixes`` (one per slice) each slice's items are renamed ``prefix + item_id``, e.g. to pool items
+        from several files without mixing them; pooled items then keep the order of ``slices``.
+        """
+        out = cls()
+        cells: Dict[tuple, list] = {}
+        out._cells = cells
+        slices = list(slices)
+        for group, sl in enumerate(slices):
+            out.rows += sl.rows
+            out.n_scored += sl.n_scored
+            out.score_sum += sl.score_sum
+            out.histogram.update(sl.histogram)
+            out.in_sum += sl.in_sum
+            out.in_n += sl.in_n
+            out.out_sum += sl.out_sum
+            out.out_n += sl.out_n
+            out.cache_read_sum += sl.cache_read_sum
+            out.cache_read_n += sl.cache_read_n
+            out.cache_write_sum += sl.cache_write_sum
+            out.cache_write_n += sl.cache_write_n
+            out.latency_sum += sl.latency_sum
+            out.latency_n += sl.latency_n
+            out.trace_ids.update(sl.trace_ids)
+            out.span_ok += sl.span_ok
+            out.span_error += sl.span_error
+            out.cache_hits += sl.cache_hits
+            for cell, (made, planned) in sl.cells().items():
+                acc = cells.setdefault(cell, [0, 0])
+                acc[0] += made
+                acc[1] = max(acc[1], planned)
+            out.early_stop_rules |= sl.early_stop_rules
+            out.sampling_modes |= sl.sampling_modes
+            for item_id, acc in sl.items.items():
+                name = prefixes[group] + item_id if prefixes is not None else item_id
+                target = out.items.get(name)
+                if target is None:
+                    target = out.items[name] = _ItemAcc(group if prefixes is not None else 0)
+                target.extend(acc)
+        for acc in out.items.values():
+            acc.scores.sort()
+            acc.tokens.sort()
+        return out
+
+    # --- repeat stability -------------------------------------------------------------------------------------
+
+    def by_item(self) -> Dict[str, List[int]]:
+        """``{item_id: [score, ...]}`` in first-seen order, as ``compute_metrics._group_by_item`` builds it."""
+        scored = [(acc.group, acc.scores[0][0], item_id) for item_id, acc in self.items.items() if acc.scores]
+        scored.sort()
+        return {item_id: [s for _, s in self.items[item_id].scores] for _, _, item_id in scored}
+
+    @property
+    def matrix(self) -> ScoreMatrix:
+        if self._matrix is None:
+            self._matrix = ScoreMatrix.from_by_item(self.by_item())
+        return self._matrix
+
+    def headlines(self) -> dict:
+        return repeat_variability_headlines(self.matrix)
+
+    def variance(self) -> dict:
+        return per_item_variance(self.matrix)
+
+    def agreement(self) -> dict:
+        return exact_agreement(self.matrix)
+
+    def item_variances(self) -> Dict[str, float]:
+        m = self.matrix
+        return dict(zip(m.item_ids, m.variances().tolist()))
+
+    @property
+    def mean_score(self) -> Optional[float]:
+        return self.score_sum / self.n_scored if self.n_scored else None
+
+    # --- tokens, spans, adaptive repeats ----------------------------------------------------------------------
+
+    def otel(self) -> dict:
+        """Same dict as ``compute_metrics.otel_metrics`` over these rows, plus ``mean_latency_ms``."""
+        if not self.rows:
+            return {}
+        has_tokens = bool(self.in_n or self.out_n)
+        result = {
+            "total_spans": self.rows,
+            "trace_ids": list(self.trace_ids),
+            "span_status_ok": self.span_ok,
+            "span_status_error": self.span_error,
+            "cache_hits": self.cache_hits,
+        }
+        if has_tokens:
+            result["total_input_tokens"] = self.in_sum
+            result["total_output_tokens"] = self.out_sum
+            result["mean_input_tokens"] = self.in_sum / self.in_n if self.in_n else 0
+            result["mean_output_tokens"] = self.out_sum / self.out_n if self.out_n else 0
+            with_tokens = sorted(
+                (acc.group, acc.tokens[0][0], item_id) for item_id, acc in self.items.items() if acc.tokens
+            )
+            tok_matrix = ScoreMatrix.from_by_item(
+                {item_id: [t for _, t in self.items[item_id].tokens] for _, _, item_id in with_tokens}
+            )
+            tok_var = tok_matrix.variances()
+            token_variances = tok_var[tok_matrix.counts >= 2]
+            within_item = dict(zip(tok_matrix.item_ids, tok_var.tolist()))
+            result["mean_token_variance_per_item"] = (
+                sequential_mean(token_variances, len(token_variances)) if len(token_variances) else 0
+            )
+        else:
+            result["total_input_tokens"] = None
+            result["total_output_tokens"] = None
+            result["mean_input_tokens"] = None
+            result["mean_output_tokens"] = None
+            result["mean_token_variance_per_item"] = None
+        result["total_cache_read_input_tokens"] = self.cache_read_sum if self.cache_read_n else None
+        result["total_cache_creation_input_tokens"] = self.cache_write_sum if self.cache_write_n else None
+        result["has_otel"] = bool(self.trace_ids) or has_tokens
+        result["mean_latency_ms"] = self.latency_sum / self.latency_n if self.latency_n else None
+
+        if has_tokens:
+            per_item_list = []
+            for item_id, acc in self.items.items():
+                mean_input = acc.in_sum / acc.in_n if acc.in_n else 0
+                mean_output = acc.out_sum / acc.out_n if acc.out_n else 0
+                within_var = within_item[item_id] if len(acc.tokens) >= 2 else 0
+                scores = [s for _, s in acc.scores]
+                per_item_list.append({
+                    "item_id": item_id,
+                    "mean_input_tokens": round(mean_input, 1),
+                    "mean_output_tokens": round(mean_output, 1),
+                    "mean_total_tokens": round(mean_input + mean_output, 1),
+                    "within_item_variance": round(within_var, 2),
+                    "repeats": acc.rows,
+                    "mean_score": round(sum(scores) / len(scores), 2) if scores else None,
+                })
+            result["per_item_token_details"] = sorted(per_item_list, key=lambda x: x["item_id"])
+            if per_item_list:
+                mean_totals = [p["mean_total_tokens"] for p in per_item_list]
+                result["between_item_min_tokens"] = min(mean_totals)
+                result["between_item_max_tokens"] = max(mean_totals)
+                result["between_item_range"] = max(mean_totals) - min(mean_totals)
+        else:
+            result["per_item_token_details"] = []
+            result["between_item_min_tokens"] = None
+            result["between_item_max_tokens"] = None
+            result["between_item_range"] = None
+        return result
+
+    def savings(self) -> dict:
+        """Same dict as ``compute_metrics.repeat_savings``."""
+        cells = list(self.cells().values())
+        n_planned = sum(max(planned, made) for made, planned in cells)
+        n_made = sum(made for made, _ in cells)
+        stopped = [1 for made, planned in cells if made < planned]
+        return {
+            "n_cells": len(cells),
+            "judgments_planned": n_planned,
+            "judgments_made": n_made,
+            "calls_saved": n_planned - n_made,
+            "pct_calls_saved": 100.0 * (n_planned - n_made) / n_planned if n_planned else 0.0,
+            "n_cells_stopped_early": len(stopped),
+            "min_repeats": min(made for made, _ in cells) if cells else 0,
+            "max_repeats": max(made for made, _ in cells) if cells else 0,
+        }
+
+
+class RowAggregator:
+    """Slices of one or more results files, filled in a single pass over their rows."""
+
+    def __init__(self):
+        self.slices: Dict[SliceKey, SliceStats] = {}
+        self._seq = 0
+
+    @staticmethod
+    def slice_key(row: dict, file: str = "") -> SliceKey:
+        metric = row.get("metric_name")
+        return (
+            file,
+            str(row.get("judge_model") or "").strip(),
+            str(row.get("condition_name") or ""),
+            None if metric is None else str(metric),
+        )
+
+    def add(self, row: dict, file: str = "") -> None:
+        key = self.slice_key(row, file)
+        sl = self.slices.get(key)
+        if sl is None:
+            sl = self.slices[key] = SliceStats(key)
+        sl.add(row, self._seq)
+        self._seq += 1
+
+    def add_rows(self, rows: Iterable[dict], file: str = "") -> "RowAggregator":
+        for row in rows:
+            self.add(row, file)
+        return self
+
+    def add_file(self, path: Path, file: Optional[str] = None) -> "RowAggregator":
+        """Rows of a results file (columnar copy when available), keyed by its name unless ``file`` is given."""
+        path = Path(path)
+        return self.add_rows(load_rows(path, AGGREGATE_COLUMNS), path.name if file is None else file)
+
+    def update(self, other: "RowAggregator") -> "RowAggregator":
+        """
+        Adopt ``other``'s slices (shared, not copied), e.g. per-file aggregators from ``load_cache``. Sequence
+        numbers are per source aggregator, so pool items across files with ``SliceStats.merge(prefixes=...)``.
+        """
+        self.slices.update(other.slices)
+        self._seq = max(self._seq, other._seq)
+        return self
+
+    def keys(
+        self,
+        file: Optional[str] = None,
+        judge: Optional[str] = None,
+        condition: Optional[str] = None,
+        metric: Optional[str] = None,
+    ) -> List[SliceKey]:
+        """Slice keys matching every given filter (``None`` = any), in first-seen order."""
+        return [
+            k
+            for k in self.slices
+            if (file is None or k[0] == file)
+            and (judge is None or k[1] == str(judge).strip())
+            and (condition is None or k[2] == condition)
+            and (metric is None or k[3] == str(metric))
+        ]
+
+    def select(
+        self,
+        file: Optional[str] = None,
+        judge: Optional[str] = None,
+        condition: Optional[str] = None,
+        metric: Optional[str] = None,
+    ) -> SliceStats:
+        """Merged statistics of the matching slices (all rows when no filter is given)."""
+        keys = self.keys(file, judge, condition, metric)
+        if len(keys) == 1:
+            return self.slices[keys[0]]
+        return SliceStats.merge(self.slices[k] for k in keys)
+
+    def judges(self, file: Optional[str] = None) -> List[str]:
+        """Distinct non-empty judge_model values, first-seen order."""
+        return list(dict.fromkeys(k[1] for k in self.keys(file) if k[1]))
+
+    def metrics(self, file: Optional[str] = None, judge: Optional[str] = None) -> List[str]:
+        """Distinct non-empty metric_name values, sorted."""
+        return sorted({k[3] for k in self.keys(file, judge) if k[3]})
@@ -0,0 +1,361 @@
+"""
+Streaming validation of a results JSONL and the compact run manifest it produces.
+
+:class:`ManifestBuilder` folds rows in one at a time with bounded memory. It keeps one bit per planned slot to
+check uniqueness and completeness, plus counters sized by the run config: rows per judge, metric and repeat
+index, error rows (``score`` is null), token totals and the ``created_at`` range. :func:`stream_validate` feeds it
+from the file line by line, starting at a byte offset, so a resumed run only parses what this session appended
+and seeds the prefix from the resume index instead. Unparseable lines are reported by byte offset.
+
+The manifest is written next to the results as ``<run>.manifest.json`` and doubles as the file catalog: the
+dashboard and compute_metrics read run config, counts and the ``created_at`` range from it instead of opening the
+JSONL. Its ``judge_history`` (median ``latency_ms`` and mean ``output_tokens`` per judge, see :class:`JudgeHistory`)
+feeds the dry-run forecast the same way. It records the results file's size and mtime, and :func:`load_manifest`
+treats it as stale once either changes. Listing (:func:`result_catalog`) only reads manifests; a file without a
+fresh one is listed with ``None``. Manifests are written by the judging pipeline and by the explicit backfill
+command, ``python src/run_manifest.py [--force] [results/*.jsonl]`` (:func:`backfill_manifest`). Analyses that
+need a missing one build it in memory (:func:`build_manifest`) without writing it.
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils import ENCODING, REPO_ROOT
+
+RESULTS_DIR = REPO_ROOT / "results"
+MANIFEST_VERSION = 1
+MAX_REPORTED_BAD_LINES = 20
+_TOKEN_FIELDS = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+# Latencies kept per judge for the median (a uniform reservoir sample beyond this).
+LATENCY_SAMPLE = 1000
+
+
+def manifest_path(results_path: Path) -> Path:
+    results_path = Path(results_path)
+    return results_path.with_name(results_path.stem + ".manifest.json")
+
+
+def _new_model_counts() -> dict:
+    out = {"rows": 0, "error_rows": 0, "cache_hits": 0}
+    out.update({f: 0 for f in _TOKEN_FIELDS})
+    return out
+
+
+class JudgeHistory:
+    """
+    Per-judge median ``latency_ms`` and mean ``output_tokens`` of live single-choice calls (no cache hits, no
+    multi-sample rows; batch rows have no latency but count toward output tokens). Memory is bounded by
+    ``LATENCY_SAMPLE`` latencies per judge.
+    """
+
+    def __init__(self):
+        self._latencies: Dict[str, List[float]] = {}
+        self._latency_rows: Dict[str, int] = {}
+        self._output: Dict[str, List[float]] = {}
+        self._rng = random.Random(0)
+
+    def add_row(self, row: dict, model: str) -> None:
+        if row.get("cache_hit") or int(row.get("n_choices") or 1) > 1:
+            return
+        if row.get("output_tokens") is not None:
+            out = self._output.setdefault(model, [0.0, 0])
+            out[0] += float(row["output_tokens"])
+            out[1] += 1
+        if row.get("latency_ms") is not None:
+            sample = self._latencies.setdefault(model, [])
+            n = self._latency_rows.get(model, 0) + 1
+            self._latency_rows[model] = n
+            if len(sample) < LATENCY_SAMPLE:
+                sample.append(float(row["latency_ms"]))
+            else:
+                slot = self._rng.randrange(n)
+                if slot < LATENCY_SAMPLE:
+                    sample[slot] = float(row["latency_ms"])
+
+    def summary(self) -> Dict[str, dict]:
+        """``{judge: {"latency_ms", "latency_rows", "output_tokens", "output_rows"}}`` (``None`` when no rows)."""
+        out = {}
+        for m in sorted(set(self._latencies) | set(self._output)):
+            lat = sorted(self._latencies.get(m, []))
+            total, n = self._output.get(m, (0.0, 0))
+            out[m] = {
+                "latency_ms": lat[len(lat) // 2] if lat else None,
+                "latency_rows": self._latency_rows.get(m, 0),
+                "output_tokens": total / n if n else None,
+                "output_rows": int(n),
+            }
+        return out
+
+
+class ManifestBuilder:
+    """
+    Accumulate a run manifest row by row. ``slot_position`` maps a judgment key to its position in the
+    plan (``None`` for keys the plan does not contain); ``slot_count`` is the plan size. Without a plan
+    (``slot_position=None``, used by backfill) uniqueness is tracked with a set of keys instead of the bitmap.
+    """
+
+    def __init__(self, slot_position: Optional[Callable[[Tuple], Optional[int]]], slot_count: Optional[int]):
+        self._position = slot_position
+        self.slot_count = slot_count
+        self._seen = bytearray((slot_count + 7) // 8) if slot_position is not None else None
+        self._seen_keys: set = set()
+        self.rows = 0
+        self.slots_filled = 0
+        self.duplicate_rows = 0
+        self.unknown_rows = 0
+        self.bad_lines = 0
+        self.bad_line_offsets: List[int] = []
+        self.by_model: Dict[str, dict] = {}
+        self.by_metric: Dict[str, int] = {}
+        self.by_idx: Dict[str, int] = {}
+        self.items: set = set()
+        self.created_min: Optional[str] = None
+        self.created_max: Optional[str] = None
+        self.first_row: Optional[dict] = None
+        self.history = JudgeHistory()
+
+    def _mark(self, key: Tuple) -> None:
+        if self._seen is None:
+            if key in self._seen_keys:
+                self.duplicate_rows += 1
+                return
+            self._seen_keys.add(key)
+            self.items.add(key[2])
+            self.slots_filled += 1
+            return
+        pos = self._position(key)
+        if pos is None:
+            self.unknown_rows += 1
+            return
+        byte, bit = divmod(pos, 8)
+        if self._seen[byte] >> bit & 1:
+            self.duplicate_rows += 1
+        else:
+            self._seen[byte] |= 1 << bit
+            self.slots_filled += 1
+
+    def add(self, key: Tuple, score, usage: Iterable, cache_hit: bool, created_at: Optional[str] = None) -> None:
+        """One row: its judgment key, score, token usage (``_TOKEN_FIELDS`` order), cache_hit and created_at."""
+        self.rows += 1
+        self._mark(key)
+        counts = self.by_model.setdefault(str(key[1]), _new_model_counts())
+        counts["rows"] += 1
+        if score is None:
+            counts["error_rows"] += 1
+        if cache_hit:
+            counts["cache_hits"] += 1
+        for field, value in zip(_TOKEN_FIELDS, usage):
+            counts[field] += int(value or 0)
+        if len(key) > 4:
+            self.by_metric[str(key[4])] = self.by_metric.get(str(key[4]), 0) + 1
+        self.by_idx[str(key[3])] = self.by_idx.get(str(key[3]), 0) + 1
+        if created_at:
+            if self.created_min is None or created_at < self.created_min:
+                self.created_min = created_at
+            if self.created_max is None or created_at > self.created_max:
+                self.created_max = created_at
+
+    def add_row(self, row: dict, key: Tuple) -> None:
+        if self.first_row is None:
+            self.first_row = row
+        self.history.add_row(row, str(key[1]))
+        self.add(
+            key,
+            row.get("score"),
+            (row.get(f) for f in _TOKEN_FIELDS),
+            bool(row.get("cache_hit")),
+            row.get("created_at"),
+        )
+
+    def add_index_entry(self, entry: list) -> None:
+        """An entry of ``jsonl_index`` (already parsed when it was indexed)."""
+        self.add(tuple(entry[2]), entry[3], entry[4:8], entry[8], entry[9] if len(entry) > 9 else None)
+
+    def bad_line(self, offset: int) -> None:
+        self.bad_lines += 1
+        if len(self.bad_line_offsets) < MAX_REPORTED_BAD_LINES:
+            self.bad_line_offsets.append(offset)
+
+    @property
+    def valid(self) -> bool:
+        return not (self.bad_lines or self.duplicate_rows or self.unknown_rows)
+
+    def manifest(self, **extra) -> dict:
+        totals = {f: sum(c[f] for c in self.by_model.values()) for f in _TOKEN_FIELDS}
+        planned = extra.pop("planned_slots", self.slot_count)
+        return {
+            "version": MANIFEST_VERSION,
+            **extra,
+            "rows": self.rows,
+            "planned_slots": planned,
+            "missing_slots": planned - self.slots_filled if planned is not None else None,
+            "duplicate_rows": self.duplicate_rows,
+            "unknown_rows": self.unknown_rows,
+            "bad_lines": self.bad_lines,
+            "bad_line_offsets": self.bad_line_offsets,
+            "error_rows": sum(c["error_rows"] for c in self.by_model.values()),
+            "cache_hits": sum(c["cache_hits"] for c in self.by_model.values()),
+            "tokens": totals,
+            "by_model": self.by_model,
+            "by_metric": self.by_metric,
+            "by_idx": self.by_idx,
+            "created_at_min": self.created_min,
+            "created_at_max": self.created_max,
+            # From the rows parsed here: a resumed run's indexed prefix carries no latency.
+            "judge_history": self.history.summary(),
+            "created_at": datetime.utcnow().isoformat() + "Z",
+        }
+
+
+def stream_validate(
+    path: Path, builder: ManifestBuilder, key_fn: Callable[[dict], Tuple], start_offset: int = 0
+) -> int:
+    """Feed the rows of ``path`` from ``start_offset`` into ``builder``, one line at a time. Returns bytes read."""
+    offset = start_offset
+    with Path(path).open("rb") as f:
+        f.seek(start_offset)
+        for raw in f:
+            if raw.strip():
+                try:
+                    row = json.loads(raw)
+                    key = key_fn(row)
+                except (ValueError, KeyError, TypeError):
+                    builder.bad_line(offset)
+                else:
+                    builder.add_row(row, key)
+            offset += len(raw)
+    return offset
+
+
+def write_manifest(results_path: Path, manifest: dict) -> Path:
+    """Write ``manifest`` for ``results_path``, stamped with the results file's current size and mtime."""
+    results_path = Path(results_path)
+    stat = results_path.stat()
+    manifest = dict(manifest, bytes=stat.st_size, results_mtime_ns=stat.st_mtime_ns)
+    out = manifest_path(results_path)
+    tmp = out.with_name(out.name + ".tmp")
+    with tmp.open("w", encoding=ENCODING) as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, out)
+    return out
+
+
+def read_manifest(results_path: Path) -> Optional[dict]:
+    """The manifest as stored, fresh or not (``None`` if absent or unreadable)."""
+    path = manifest_path(results_path)
+    if not path.is_file():
+        return None
+    try:
+        with path.open("r", encoding=ENCODING) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_manifest(results_path: Path) -> Optional[dict]:
+    """The manifest if it still describes ``results_path`` (same size and mtime), else ``None``."""
+    manifest = read_manifest(results_path)
+    if manifest is None or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    try:
+        stat = Path(results_path).stat()
+    except OSError:
+        return None
+    if manifest.get("bytes") != stat.st_size or manifest.get("results_mtime_ns") != stat.st_mtime_ns:
+        return None
+    return manifest
+
+
+def build_manifest(results_path: Path) -> dict:
+    """
+    The manifest of an existing results file from one streaming scan, without writing it. The run config comes
+    from the first row (judges, metrics and items from what the file contains); ``planned_slots`` assumes
+    the full K repeats of every observed item.
+    """
+    # Lazy: run_repeated_judging imports this module for end-of-run validation.
+    from run_repeated_judging import _judgment_identity
+
+    results_path = Path(results_path)
+    builder = ManifestBuilder(None, None)
+    stream_validate(results_path, builder, _judgment_identity)
+    first = builder.first_row or {}
+    config = None
+    planned = None
+    if first:
+        k = int(first.get("repeats_planned") or (max(int(i) for i in builder.by_idx) + 1))
+        cond = str(first.get("condition_name") or "")
+        metrics = list(builder.by_metric) if cond == "metric_rubric" else []
+        config = {
+            "condition_name": cond,
+            "dataset_id": str(first.get("dataset_id") or ""),
+            "item_count": len(builder.items),
+            "repeats": k,
+            "temperature": first.get("temperature"),
+            "score_min": first.get("score_min"),
+            "score_max": first.get("score_max"),
+            "judge_models": list(builder.by_model),
+            "metric_names": metrics,
+            "sampling_mode": first.get("sampling_mode") or "independent",
+            "early_stop": first.get("early_stop"),
+        }
+        planned = len(builder.by_model) * k * len(builder.items) * max(1, len(metrics))
+    manifest = builder.manifest(
+        results_file=results_path.name,
+        execution_id=first.get("execution_id"),
+        config=config,
+        planned_slots=planned,
+        backfilled=True,
+    )
+    manifest["complete"] = builder.valid and manifest["missing_slots"] == 0
+    return manifest
+
+
+def backfill_manifest(results_path: Path) -> dict:
+    """:func:`build_manifest` and write it next to the results file."""
+    write_manifest(results_path, build_manifest(results_path))
+    return read_manifest(results_path)
+
+
+def result_catalog(
+    results_dir: Optional[Path] = None, *, backfill: bool = False
+) -> List[Tuple[Path, Optional[dict]]]:
+    """
+    ``(path, manifest)`` for every ``*.jsonl`` in ``results_dir`` (default ``results/``), sorted by name. Files
+    without a fresh manifest get ``None``, unless ``backfill`` is set: then it is rebuilt and written to disk.
+    """
+    results_dir = Path(results_dir) if results_dir is not None else RESULTS_DIR
+    if not results_dir.exists():
+        return []
+    out = []
+    for path in sorted(results_dir.glob("*.jsonl"), key=lambda p: p.name):
+        manifest = load_manifest(path)
+        if manifest is None and backfill:
+            try:
+                manifest = backfill_manifest(path)
+            except (OSError, ValueError) as e:
+                print(f"Could not build a manifest for {path.name}: {e}")
+        out.append((path, manifest))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write <run>.manifest.json for existing results JSONLs.")
+    parser.add_argument("paths", nargs="*", help="results files (default: every results/*.jsonl)")
+    parser.add_argument("--force", action="store_true", help="rebuild manifests that are still fresh")
+    args = parser.parse_args()
+    paths = [Path(p) for p in args.paths] or sorted(RESULTS_DIR.glob("*.jsonl"))
+    for path in paths:
+        if not args.force and load_manifest(path) is not None:
+            print(f"{path.name}: up to date")
+            continue
+        m = backfill_manifest(path)
+        print(f"{path.name}: {m['rows']} rows, {m['error_rows']} errors, {m['bad_lines']} bad line(s)")
+
+
+if __name__ == "__main__":
+    main()
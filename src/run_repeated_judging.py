@@ -1,21 +1,32 @@
+import argparse
 import json
 import os
-import sys
 import uuid
 import time
+import zlib
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Optional, Set, Tuple
+from math import sqrt
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from dotenv import load_dotenv
 
 from opentelemetry import trace
 
 from constants import JUDGE_MODEL
-from judge import call_judge, extract_json_from_text, is_claude_model
+from compute_metrics import variance
+from budget import OUTPUT_TOKENS_SEED, budget_from_config, build_run_budget
+from batch_judging import batch_custom_id, batch_state_path, load_batch_state, run_judgment_batches
+from jsonl_index import ResumeIndex, load_resume_index
+from jsonl_writer import JsonlWriter
+from judge import call_judge, call_judge_n, extract_json_from_text, is_claude_model, provider_for_model
 from metric_rubric import gloss_for_metric
 from otel_setup import setup_tracer, get_trace_context
+from rate_limit import approx_tokens, configure_rate_limits, get_rate_limiter
+from run_manifest import JudgeHistory, ManifestBuilder, load_manifest, stream_validate, write_manifest
 from utils import ENCODING, REPO_ROOT, load_jsonl
 
 # ---------- CONFIG ----------
@@ -41,6 +52,24 @@ DEFAULT_CONDITION_NAME = "generic_overall"
 DEFAULT_SCORE_MIN = 0
 DEFAULT_SCORE_MAX = 100
 
+# Parallel judge calls per provider (1 = serial). Env JUDGE_WORKERS, JUDGE_WORKERS_OPENAI, JUDGE_WORKERS_ANTHROPIC.
+JUDGE_WORKERS_DEFAULT = 1
+# Concurrent mode keeps at most this many judgments per worker dispatched but not yet written.
+DISPATCH_WINDOW_PER_WORKER = 4
+# sync = one API call per judgment; batch = OpenAI Batch API / Anthropic Message Batches (batch_judging.py)
+EXECUTION_MODES = ("sync", "batch")
+JUDGE_SYSTEM_CONTENT = "You are an evaluator. Output JSON only."
+# independent = one API call per repeat; multi_sample = OpenAI judges get all K repeats of a prompt as n=K choices
+# of a single request (changes the experimental design — rows carry sampling_mode / n_choices).
+SAMPLING_MODES = ("independent", "multi_sample")
+# Adaptive repeats (env JUDGE_EARLY_STOP): "agree:M" or "sd:X[:M]"; see parse_stop_rule.
+EARLY_STOP_MIN_REPEATS_DEFAULT = 3
+# Dry runs: wall-clock forecast from latency_ms in the newest result JSONLs (fallback when a judge has none).
+DRY_RUN_HISTORY_FILES = 20
+DRY_RUN_LATENCY_MS_DEFAULT = 3000
+# Sharded runs: results/shards/<execution_id>/{plan.json, shard-III-of-NNN.jsonl}; merge_shards() writes results/.
+SHARDS_DIR = REPO_ROOT / "results" / "shards"
+
 # ----------------------------
 logger = logging.getLogger(__name__)
 
@@ -75,34 +104,701 @@ def _judgment_identity(row: dict) -> Tuple:
     return (cond, jm, iid, idx)
 
 
-def _prepare_resume(
-    path: Path,
+def _workers_by_provider(workers: Union[int, Dict[str, int], None] = None) -> Dict[str, int]:
+    """
+    Resolve parallel judge calls per provider (``openai`` / ``anthropic``).
+    ``workers`` may be an int (same for every provider) or a dict such as ``{"openai": 8, "anthropic": 4}``.
+    Otherwise env JUDGE_WORKERS applies to both, and JUDGE_WORKERS_OPENAI / JUDGE_WORKERS_ANTHROPIC override it.
+    """
+
+    def _env_int(name: str, default: int) -> int:
+        raw = (os.environ.get(name) or "").strip()
+        if not raw:
+            return default
+        try:
+            return max(1, int(raw))
+        except ValueError:
+            return default
+
+    base = _env_int("JUDGE_WORKERS", JUDGE_WORKERS_DEFAULT)
+    out = {p: _env_int(f"JUDGE_WORKERS_{p.upper()}", base) for p in ("openai", "anthropic")}
+    if isinstance(workers, dict):
+        for p, n in workers.items():
+            out[str(p).strip().lower()] = max(1, int(n))
+    elif workers is not None:
+        out = {p: max(1, int(workers)) for p in out}
+    return out
+
+
+# Template fields that vary per item; everything rendered before the first one is the shared, cacheable prefix.
+_PER_ITEM_FIELDS = ("{item_specific_rubric}", "{question}", "{response}")
+
+
+def _template_prefix(template: str, **fields) -> str:
+    """Rendered text of ``template`` before its first per-item field (identical across items and repeats)."""
+    cut = min((i for i in (template.find(f) for f in _PER_ITEM_FIELDS) if i >= 0), default=len(template))
+    return template[:cut].format(**fields)
+
+
+def _render_prompt(item: dict, *, cond: str, metric: Optional[str], judge_template: str, metric_template: str):
+    """Return (prompt_text, raw_instr_value) for one item (and one metric under condition B)."""
+    if cond == "metric_rubric":
+        prompt = metric_template.format(
+            metric_name=metric,
+            metric_gloss=gloss_for_metric(metric),
+            question=item["question"],
+            response=item["response"],
+        )
+        return prompt, ""
+    raw_instr = (item.get("judge_instructions") or "").strip()
+    if cond == "generic_overall":
+        raw_instr = ""
+    item_specific_rubric = (
+        f"Item-specific judge instructions:\n{raw_instr}\n\n"
+        if raw_instr
+        else ""
+    )
+    prompt = judge_template.format(
+        question=item["question"],
+        response=item["response"],
+        item_specific_rubric=item_specific_rubric,
+    )
+    return prompt, raw_instr
+
+
+def _plan_judgments(
+    dataset: list,
+    models_to_run: list,
     *,
     cond: str,
-    dset_id: str,
     k: int,
-    temp: float,
-    smin: int,
-    smax: int,
-    models_to_run: list,
     metrics_list: list,
+    judge_template: str,
+    metric_template: str,
+    interleave_models: bool = False,
+) -> List[dict]:
+    """
+    Every judgment slot of the run, in write order. One dict per slot with the resume key
+    (``_judgment_identity``), judge model, provider, item_id, idx, metric_name, rendered prompt, its shared
+    ``prompt_prefix`` (instructions + metric gloss, for provider prompt caching) and log label.
+
+    Default order is the serial schedule: per judge model, round-robin over repeats (all items at ``idx=0``,
+    then ``idx=1``, …). ``interleave_models`` moves the model loop innermost so a concurrent run keeps
+    every provider busy while still writing in a fixed order.
+    """
+    metric_axis = list(metrics_list) if cond == "metric_rubric" else [None]
+    prefixes = {
+        m: (
+            _template_prefix(metric_template, metric_name=m, metric_gloss=gloss_for_metric(m))
+            if m is not None
+            else _template_prefix(judge_template)
+        )
+        for m in metric_axis
+    }
+    rendered: Dict[Tuple, Tuple[str, str]] = {}
+    for item in dataset:
+        for m in metric_axis:
+            rendered[(str(item["item_id"]), m)] = _render_prompt(
+                item,
+                cond=cond,
+                metric=m,
+                judge_template=judge_template,
+                metric_template=metric_template,
+            )
+
+    def _slot(model: str, idx: int, item: dict, m: Optional[str]) -> dict:
+        item_id = item["item_id"]
+        prompt, raw_instr = rendered[(str(item_id), m)]
+        if m is not None:
+            key = ("metric_rubric", str(model), str(item_id), idx, str(m))
+            label = f"{model} | Item {item_id} | Metric {m} | R{idx}"
+        else:
+            key = (cond, str(model), str(item_id), idx)
+            label = f"{model} | Item {item_id} | R{idx}"
+        return {
+            "key": key,
+            "judge_model": model,
+            "provider": provider_for_model(model),
+            "item_id": item_id,
+            "idx": idx,
+            "metric_name": m,
+            "raw_instr": raw_instr,
+            "prompt": prompt,
+            "prompt_prefix": prefixes[m] if prompt.startswith(prefixes[m]) else None,
+            "log_label": label,
+        }
+
+    slots: List[dict] = []
+    if interleave_models:
+        for idx in range(k):
+            for item in dataset:
+                for m in metric_axis:
+                    for model in models_to_run:
+                        slots.append(_slot(model, idx, item, m))
+    else:
+        for model in models_to_run:
+            for idx in range(k):
+                for item in dataset:
+                    for m in metric_axis:
+                        slots.append(_slot(model, idx, item, m))
+    return slots
+
+
+def _group_multi_sample(slots: List[dict]) -> List[dict]:
+    """
+    Units of work for multi-sample mode: OpenAI slots sharing (judge, item, metric) become one unit (one request,
+    ``n`` = number of its repeats, ``idx`` ascending); Claude slots stay single. Units keep first-slot order.
+    """
+    units: List[dict] = []
+    groups: Dict[Tuple, dict] = {}
+    for slot in slots:
+        if slot["provider"] != "openai":
+            units.append({"provider": slot["provider"], "slots": [slot]})
+            continue
+        gkey = (slot["judge_model"], str(slot["item_id"]), slot["metric_name"])
+        unit = groups.get(gkey)
+        if unit is None:
+            unit = groups[gkey] = {"provider": slot["provider"], "slots": []}
+            units.append(unit)
+        unit["slots"].append(slot)
+    for unit in units:
+        unit["slots"].sort(key=lambda s: s["idx"])
+    return units
+
+
+def parse_stop_rule(spec: Optional[str]) -> Optional[Tuple[str, float, int]]:
+    """
+    Early-stopping rule for adaptive repeats. ``"agree:M"`` stops a cell once its first M repeats gave the same
+    score; ``"sd:X"`` / ``"sd:X:M"`` once at least M repeats (default 3) have sample SD ≤ X score points.
+    None, ``""``, ``"off"`` → no rule (always K repeats). Returns (kind, sd_bound, min_repeats).
+    """
+    raw = (spec or "").strip().lower()
+    if raw in ("", "0", "off", "none"):
+        return None
+    parts = raw.split(":")
+    try:
+        if parts[0] == "agree" and len(parts) == 2:
+            rule = ("agree", 0.0, int(parts[1]))
+        elif parts[0] == "sd" and len(parts) in (2, 3):
+            min_n = int(parts[2]) if len(parts) == 3 else EARLY_STOP_MIN_REPEATS_DEFAULT
+            rule = ("sd", float(parts[1]), min_n)
+        else:
+            rule = None
+    except ValueError:
+        rule = None
+    if rule is None or rule[2] < 2 or rule[1] < 0:
+        raise ValueError(f"early_stop must be 'agree:M' or 'sd:X[:M]' with M >= 2 and X >= 0, got {spec!r}.")
+    return rule
+
+
+def format_stop_rule(rule: Optional[Tuple[str, float, int]]) -> Optional[str]:
+    """Canonical spec string recorded on rows and in run configs (None when adaptive repeats are off)."""
+    if rule is None:
+        return None
+    kind, bound, min_n = rule
+    return f"agree:{min_n}" if kind == "agree" else f"sd:{bound:g}:{min_n}"
+
+
+def _cell_stopped(scores: List[Optional[int]], rule: Tuple[str, float, int]) -> bool:
+    kind, bound, min_n = rule
+    if len(scores) < min_n or any(s is None for s in scores):
+        return False
+    if kind == "agree":
+        return len(set(scores)) == 1
+    return sqrt(variance(scores)) <= bound
+
+
+def _cell_key(key: Tuple) -> Tuple:
+    """Judgment key without its repeat index: one (condition, judge, item[, metric]) cell."""
+    return key[:3] + key[4:]
+
+
+def _repeat_cells(keys: Iterable[Tuple]) -> List[List[Tuple]]:
+    """Group judgment keys into cells (first-seen order), each sorted by repeat idx."""
+    cells: Dict[Tuple, List[Tuple]] = {}
+    for key in keys:
+        cells.setdefault(_cell_key(key), []).append(key)
+    return [sorted(c, key=lambda k: k[3]) for c in cells.values()]
+
+
+def _next_repeat(
+    cell: List[Tuple], scores: Dict[Tuple, Optional[int]], rule: Tuple[str, float, int]
+) -> Optional[Tuple]:
+    """
+    Key of the next repeat ``cell`` still needs under ``rule``, or None once it is complete (all repeats judged,
+    or stopped early). Decided from the cell's earlier scores only, so resume and shard merge agree with the run.
+    """
+    seen: List[Optional[int]] = []
+    for key in cell:
+        if key not in scores:
+            return key
+        seen.append(scores[key])
+        if _cell_stopped(seen, rule):
+            return None
+    return None
+
+
+def _calls_saved(
+    cells: List[List[Tuple]], scores: Dict[Tuple, Optional[int]], rule: Tuple[str, float, int]
+) -> int:
+    """Planned repeats that stopped cells will never issue."""
+    return sum(
+        sum(1 for key in c if key not in scores) for c in cells if _next_repeat(c, scores, rule) is None
+    )
+
+
+def _scan_judge_history(path: Path, wanted: Set[str]) -> Dict[str, dict]:
+    """``JudgeHistory`` summary of one results JSONL that has no fresh manifest (one pass, read-only)."""
+    history = JudgeHistory()
+    with path.open("r", encoding=ENCODING) as f:
+        for line in f:
+            if '"latency_ms"' not in line or not any(m in line for m in wanted):
+                continue
+            try:
+                r = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            m = str(r.get("judge_model") or "")
+            if m in wanted:
+                history.add_row(r, m)
+    return history.summary()
+
+
+def _judge_history(models: list, max_files: int = DRY_RUN_HISTORY_FILES) -> Tuple[Dict[str, dict], int]:
+    """
+    Median ``latency_ms`` and mean ``output_tokens`` per judge from the newest result JSONLs (live single-choice
+    calls only: no cache hits, batch or multi-sample rows). Each file's figures come from its run manifest
+    (``judge_history``); only files without a fresh one are scanned. The latency is the row-weighted median of
+    the per-file medians. Returns (``{model: {...}}``, files used).
+    """
+    results_dir = REPO_ROOT / "results"
+    files = sorted(results_dir.glob("*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True)[:max_files]
+    wanted = {str(m) for m in models}
+    medians: Dict[str, List[Tuple[float, int]]] = {}
+    outputs: Dict[str, List[float]] = {}
+    for path in files:
+        per_judge = (load_manifest(path) or {}).get("judge_history")
+        if per_judge is None:
+            per_judge = _scan_judge_history(path, wanted)
+        for m, h in per_judge.items():
+            if m not in wanted:
+                continue
+            if h.get("latency_ms") is not None and h.get("latency_rows"):
+                medians.setdefault(m, []).append((float(h["latency_ms"]), int(h["latency_rows"])))
+            if h.get("output_tokens") is not None and h.get("output_rows"):
+                out = outputs.setdefault(m, [0.0, 0])
+                out[0] += float(h["output_tokens"]) * int(h["output_rows"])
+                out[1] += int(h["output_rows"])
+    history = {}
+    for m in wanted:
+        lat = sorted(medians.get(m, []))
+        n_rows = sum(n for _, n in lat)
+        median, seen = None, 0
+        for value, n in lat:
+            seen += n
+            if seen > n_rows // 2:
+                median = value
+                break
+        total, n_out = outputs.get(m, (0.0, 0))
+        history[m] = {
+            "latency_ms": median,
+            "output_tokens": total / n_out if n_out else None,
+            "n_rows": n_rows,
+        }
+    return history, len(files)
+
+
+def _dry_run_forecast(
+    plan: List[dict],
+    *,
+    models_to_run: list,
+    sampling: str,
+    mode: str,
+    workers_by_provider: Dict[str, int],
+    concurrent: bool,
+    pricing,
+    history: Dict[str, dict],
+) -> dict:
+    """Requests, estimated tokens / USD and wall-clock for ``plan`` without calling any API."""
+    units = _group_multi_sample(plan) if sampling == "multi_sample" else [{"slots": [s]} for s in plan]
+    system_tokens = approx_tokens(JUDGE_SYSTEM_CONTENT)
+    limiter = get_rate_limiter()
+    per_model: Dict[str, dict] = {
+        m: {"judgments": 0, "requests": 0, "input_tokens": 0, "output_tokens": 0, "est_usd": 0.0}
+        for m in models_to_run
+    }
+    for unit in units:
+        first = unit["slots"][0]
+        pm = per_model[first["judge_model"]]
+        out_mean = history[first["judge_model"]]["output_tokens"] or OUTPUT_TOKENS_SEED
+        pm["judgments"] += len(unit["slots"])
+        pm["requests"] += 1
+        pm["input_tokens"] += approx_tokens(first["prompt"]) + system_tokens
+        pm["output_tokens"] += int(out_mean * len(unit["slots"]) + 0.5)
+    priced = False
+    wall_by_provider: Dict[str, float] = {}
+    for m, pm in per_model.items():
+        rin, rout, has_rate = pricing.rates_for(m)
+        priced = priced or has_rate
+        pm["est_usd"] = pricing.cost_usd(m, pm["input_tokens"], pm["output_tokens"]) if has_rate else None
+        pm["latency_ms"] = history[m]["latency_ms"] or DRY_RUN_LATENCY_MS_DEFAULT
+        pm["latency_from_history"] = history[m]["latency_ms"] is not None
+        p = provider_for_model(m)
+        wall_by_provider[p] = wall_by_provider.get(p, 0.0) + pm["requests"] * pm["latency_ms"] / 1000.0
+    for p in wall_by_provider:
+        wall_by_provider[p] /= max(1, workers_by_provider.get(p, 1))
+    # Configured RPM / TPM seeds bound throughput no matter how many workers there are.
+    for m, pm in per_model.items():
+        p = provider_for_model(m)
+        rpm = limiter.configured_limit(p, m, "rpm") if limiter.enabled else None
+        tpm = limiter.configured_limit(p, m, "tpm") if limiter.enabled else None
+        floor = max(
+            pm["requests"] * 60.0 / rpm if rpm else 0.0,
+            (pm["input_tokens"] + pm["output_tokens"]) * 60.0 / tpm if tpm else 0.0,
+        )
+        wall_by_provider[p] = max(wall_by_provider.get(p, 0.0), floor)
+    if mode == "batch":
+        wall = None
+    elif concurrent:
+        wall = max(wall_by_provider.values()) if wall_by_provider else 0.0
+    else:
+        wall = sum(wall_by_provider.values())
+    return {
+        "requests": len(units),
+        "judgments": len(plan),
+        "per_model": per_model,
+        "input_tokens": sum(pm["input_tokens"] for pm in per_model.values()),
+        "output_tokens": sum(pm["output_tokens"] for pm in per_model.values()),
+        "est_usd": sum(pm["est_usd"] or 0.0 for pm in per_model.values()) if priced else None,
+        "wall_clock_sec": wall,
+        "wall_clock_by_provider_sec": wall_by_provider,
+    }
+
+
+def _print_dry_run(
+    report: dict,
+    *,
     expected_rows: int,
-) -> Tuple[Set[Tuple], str, bool, int]:
+    done: int,
+    history_files: int,
+    adaptive: bool,
+    workers_by_provider: Dict[str, int],
+) -> None:
+    bound = " (upper bound: adaptive repeats)" if adaptive else ""
+    print("Dry run — no API calls.")
+    print(
+        f"  Rows planned: {expected_rows} ({done} already on disk); "
+        f"to judge: {report['judgments']}, API requests: {report['requests']}{bound}"
+    )
+    print(f"  {'judge':<32} {'requests':>9} {'in tok':>11} {'out tok':>10} {'est USD':>10} {'p50 ms':>8}")
+    for m, pm in report["per_model"].items():
+        usd = f"{pm['est_usd']:.4f}" if pm["est_usd"] is not None else "—"
+        lat = f"{pm['latency_ms']:.0f}" + ("" if pm["latency_from_history"] else "*")
+        print(
+            f"  {m:<32} {pm['requests']:>9,} {pm['input_tokens']:>11,} {pm['output_tokens']:>10,} "
+            f"{usd:>10} {lat:>8}"
+        )
+    if report["est_usd"] is not None:
+        print(f"  Estimated cost: ${report['est_usd']:.4f}")
+    if report["wall_clock_sec"] is None:
+        print("  Wall-clock: batch mode — depends on the provider's batch queue (up to 24h).")
+    else:
+        workers = ", ".join(f"{p}={n}" for p, n in sorted(workers_by_provider.items()))
+        note = f"latency from {history_files} prior JSONL(s)"
+        if any(not pm["latency_from_history"] for pm in report["per_model"].values()):
+            note += f"; * = no history, assumed {DRY_RUN_LATENCY_MS_DEFAULT} ms"
+        print(f"  Wall-clock forecast: ~{_format_duration(report['wall_clock_sec'])} (workers {workers}; {note})")
+
+
+def _format_duration(sec: float) -> str:
+    sec = int(round(sec))
+    h, rem = divmod(sec, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h {m:02d}m {s:02d}s" if h else f"{m}m {s:02d}s"
+
+
+def _budget_request(unit: dict) -> Tuple[Tuple, str, str, int]:
+    """(reservation key, judge, prompt, n choices) of a slot or multi-sample unit, for ``RunBudget.gate``."""
+    slots = unit.get("slots") or [unit]
+    return slots[0]["key"], slots[0]["judge_model"], slots[0]["prompt"], len(slots)
+
+
+def _run_slots_in_order(
+    slots: Iterable[dict],
+    run_slot: Callable[[dict], Any],
+    emit: Callable[[dict, Any], None],
+    workers_by_provider: Dict[str, int],
+) -> None:
     """
-    Load existing JSONL; validate it matches this run config; return judgment keys already present.
+    Call ``run_slot`` for every slot and hand each result to ``emit`` **in slot order**. Any dict with a
+    ``provider`` key works as a slot (multi-sample mode passes units of several slots).
+
+    Serial when every provider has one worker. Otherwise each provider gets its own thread pool and up to
+    DISPATCH_WINDOW_PER_WORKER × total workers slots are in flight; finished results wait in a buffer until
+    every earlier slot has been emitted, so output order never depends on API completion order.
+    If a call fails, results that already completed are still emitted (in order) before the error is re-raised.
     """
-    rows = load_jsonl(path)
-    if not rows:
-        raise ValueError(f"Resume file is empty: {path}")
+    if all(n <= 1 for n in workers_by_provider.values()):
+        for slot in slots:
+            emit(slot, run_slot(slot))
+        return
+
+    window = DISPATCH_WINDOW_PER_WORKER * sum(workers_by_provider.values())
+    pools = {
+        p: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"judge-{p}")
+        for p, n in workers_by_provider.items()
+    }
+    inflight: deque = deque()
+    it = iter(slots)
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(inflight) < window:
+                slot = next(it, None)
+                if slot is None:
+                    exhausted = True
+                    break
+                inflight.append((slot, pools[slot["provider"]].submit(run_slot, slot)))
+            if not inflight:
+                break
+            slot, fut = inflight.popleft()
+            try:
+                result = fut.result()
+            except BaseException:
+                for _s, f in inflight:
+                    f.cancel()
+                for s2, f in inflight:
+                    if f.cancelled():
+                        continue
+                    try:
+                        r2 = f.result()
+                    except Exception:
+                        continue
+                    emit(s2, r2)
+                inflight.clear()
+                raise
+            emit(slot, result)
+    finally:
+        for _s, f in inflight:
+            f.cancel()
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+
+
+def _parse_judge_output(raw_output: str, smin: int, smax: int) -> Tuple[Optional[int], Optional[str]]:
+    """Return (score, justification) from raw judge text, or (None, None) if unparseable / out of range."""
+    try:
+        parsed = json.loads(raw_output)
+    except json.JSONDecodeError:
+        parsed = extract_json_from_text(raw_output)
+    sc = parsed.get("score") if isinstance(parsed, dict) else None
+    if isinstance(sc, int) and smin <= sc <= smax:
+        return int(sc), str(parsed.get("justification", ""))
+    return None, None
+
+
+def _default_output_path(models_to_run: list, cond: str, k: int, temp: float) -> Path:
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    t_tag = str(temp).replace(".", "p") if "." in str(temp) else str(temp)
+    cond_slug = _condition_slug(cond)
+    _fname_model = (
+        models_to_run[0].replace("/", "_")
+        if len(models_to_run) == 1
+        else f"multi{len(models_to_run)}judges"
+    )
+    return REPO_ROOT / "results" / f"mtbench_judge-{_fname_model}_cond-{cond_slug}_K{k}_t{t_tag}_{timestamp}.jsonl"
+
+
+def _shard_of(key: Tuple, shard_count: int, group_repeats: bool = False) -> int:
+    """
+    Shard for a judgment key: crc32 of its JSON form, so the split is identical in every process and machine.
+    With ``group_repeats`` (multi-sample and adaptive runs) the cell key is hashed so all repeats share one shard.
+    """
+    if group_repeats:
+        key = _cell_key(key)
+    return zlib.crc32(json.dumps(list(key)).encode("utf-8")) % shard_count
+
 
-    first = rows[0]
+def shard_dir(execution_id: str) -> Path:
+    return SHARDS_DIR / execution_id
+
+
+def shard_output_path(execution_id: str, shard_index: int, shard_count: int) -> Path:
+    return shard_dir(execution_id) / f"shard-{shard_index:03d}-of-{shard_count:03d}.jsonl"
+
+
+def _write_shard_plan(execution_id: str, info: dict) -> None:
+    """Record the sharded run's config once; every later shard must agree with it."""
+    path = shard_dir(execution_id) / "plan.json"
+    if path.is_file():
+        with path.open("r", encoding=ENCODING) as f:
+            recorded = json.load(f)
+        if recorded != info:
+            raise ValueError(
+                f"Shard plan mismatch for execution_id={execution_id}: {path} was written with different settings. "
+                "Every shard must use the same dataset, condition, K, temperature, judges, metrics and shard count."
+            )
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding=ENCODING) as f:
+        json.dump(info, f, indent=2)
+    os.replace(tmp, path)
+
+
+def merge_shards(execution_id: str, output_path: Optional[str] = None) -> dict:
+    """
+    Validate every shard of a sharded execution and write the canonical single JSONL (serial plan order:
+    judge → idx → item → metric), named like an unsharded run unless ``output_path`` is given.
+    Each shard must hold exactly its planned rows, pass the resume checks against the recorded plan, and contain
+    only slots hashed to it; together they must cover the plan without duplicates.
+    Returns a dict with output_path, written_rows, execution_id, shard_count.
+    """
+    plan_path = shard_dir(execution_id) / "plan.json"
+    if not plan_path.is_file():
+        raise FileNotFoundError(f"No shard plan for execution_id={execution_id}: {plan_path}")
+    with plan_path.open("r", encoding=ENCODING) as f:
+        info = json.load(f)
+    cfg = info["config"]
+    n = int(info["shard_count"])
+    rule = parse_stop_rule(cfg.get("early_stop"))
+    group_repeats = cfg["sampling_mode"] == "multi_sample" or rule is not None
+
+    merged: List[dict] = []
+    seen: Set[Tuple] = set()
+    incomplete = []
+    for i in range(n):
+        path = shard_output_path(execution_id, i, n)
+        rows = load_jsonl(path) if path.is_file() else []
+        want = int(info["shard_rows"][i])
+        # Adaptive shards may legitimately stop short of their planned rows; completeness is checked per cell below.
+        if len(rows) > want if rule is not None else len(rows) != want:
+            incomplete.append(f"shard {i}: {len(rows)}/{want} rows")
+            continue
+        if not rows:
+            continue
+        keys, eid, _ = _validate_run_rows(
+            rows,
+            label=f"Shard file {path.name}",
+            cond=cfg["condition_name"],
+            dset_id=cfg["dataset_id"],
+            k=int(cfg["repeats"]),
+            temp=float(cfg["temperature"]),
+            smin=int(cfg["score_min"]),
+            smax=int(cfg["score_max"]),
+            models_to_run=cfg["judge_models"],
+            metrics_list=cfg["metric_names"],
+            sampling_mode=cfg["sampling_mode"],
+            early_stop=cfg.get("early_stop"),
+        )
+        if eid != execution_id:
+            raise ValueError(f"Shard file {path.name} has execution_id={eid}, expected {execution_id}.")
+        stray = [key for key in keys if _shard_of(key, n, group_repeats) != i]
+        if stray:
+            raise ValueError(f"Shard file {path.name} contains {len(stray)} slot(s) of other shards, e.g. {stray[0]}.")
+        dup = seen.intersection(keys)
+        if dup:
+            raise ValueError(f"Judgment {next(iter(dup))} appears in more than one shard.")
+        seen.update(keys)
+        merged.extend(rows)
+    if incomplete:
+        raise ValueError(
+            "Shards incomplete — re-run these shards (they resume their own files): " + "; ".join(incomplete)
+        )
+    if rule is not None:
+        k = int(cfg["repeats"])
+        metrics = cfg["metric_names"] if cfg["condition_name"] == "metric_rubric" else [None]
+        planned_cells = [
+            [(cfg["condition_name"], m, iid, idx) + ((metric,) if metric is not None else ()) for idx in range(k)]
+            for m in cfg["judge_models"]
+            for iid in info["item_ids"]
+            for metric in metrics
+        ]
+        scores = {_judgment_identity(r): r.get("score") for r in merged}
+        open_shards = sorted(
+            {_shard_of(c[0], n, True) for c in planned_cells if _next_repeat(c, scores, rule) is not None}
+        )
+        if open_shards:
+            raise ValueError(
+                "Shards incomplete — re-run these shards (they resume their own files): "
+                + ", ".join(f"shard {i}" for i in open_shards)
+            )
+    elif len(merged) != int(info["expected_rows"]):
+        raise ValueError(f"Merged {len(merged)} rows, expected {info['expected_rows']}.")
+
+    model_pos = {m: i for i, m in enumerate(cfg["judge_models"])}
+    item_pos = {iid: i for i, iid in enumerate(info["item_ids"])}
+    metric_pos = {m: i for i, m in enumerate(cfg["metric_names"])}
+    merged.sort(
+        key=lambda r: (
+            model_pos[str(r["judge_model"])],
+            int(r["idx"]),
+            item_pos[str(r["item_id"])],
+            metric_pos.get(r.get("metric_name"), 0),
+        )
+    )
+    out = Path(output_path) if output_path else _default_output_path(
+        cfg["judge_models"], cfg["condition_name"], int(cfg["repeats"]), float(cfg["temperature"])
+    )
+    tmp = out.with_name(out.name + ".tmp")
+    with tmp.open("w", encoding=ENCODING) as f:
+        for r in merged:
+            f.write(json.dumps(r) + "\n")
+    os.replace(tmp, out)
+
+    k = int(cfg["repeats"])
+    n_metrics = len(metric_pos) if cfg["condition_name"] == "metric_rubric" else 1
+
+    def _position(key: Tuple) -> Optional[int]:
+        m, iid = model_pos.get(key[1]), item_pos.get(key[2])
+        metric = metric_pos.get(key[4]) if len(key) > 4 else 0
+        if m is None or iid is None or metric is None:
+            return None
+        return ((m * k + int(key[3])) * len(item_pos) + iid) * n_metrics + metric
+
+    manifest = ManifestBuilder(_position, len(model_pos) * k * len(item_pos) * n_metrics)
+    for r in merged:
+        manifest.add_row(r, _judgment_identity(r))
+    expected = int(info["expected_rows"])
+    write_manifest(
+        out,
+        manifest.manifest(
+            results_file=out.name,
+            execution_id=execution_id,
+            config=cfg,
+            expected_rows=expected,
+            calls_saved=expected - len(merged),
+            budget_exhausted=False,
+            complete=True,
+            shard_count=n,
+        ),
+    )
+    print(f"Merged {n} shard(s) of execution_id={execution_id} → {out} ({len(merged)} rows)")
+    return {"output_path": str(out), "written_rows": len(merged), "execution_id": execution_id, "shard_count": n}
+
+
+def _validate_run_header(
+    first: Optional[dict],
+    *,
+    label: str,
+    cond: str,
+    dset_id: str,
+    temp: float,
+    smin: int,
+    smax: int,
+    sampling_mode: str = "independent",
+    early_stop: Optional[str] = None,
+) -> Tuple[str, bool]:
+    """Check the first row's run metadata against this run config. Returns (execution_id, multi_judge_run)."""
+    if not first:
+        raise ValueError(f"{label} is empty.")
     eid = str(first.get("execution_id") or "").strip()
     if not eid:
-        raise ValueError("Resume file has no execution_id on first row.")
+        raise ValueError(f"{label} has no execution_id on first row.")
 
     def _bad(field: str, got, want) -> None:
         raise ValueError(
-            f"Resume file metadata mismatch ({field}): file has {got!r}, this run uses {want!r}. "
+            f"{label} metadata mismatch ({field}): file has {got!r}, this run uses {want!r}. "
             "Use the same dataset, condition, K, temperature, and judge list as the original run."
         )
 
@@ -116,41 +812,154 @@ def _prepare_resume(
         _bad("score_min", first.get("score_min"), smin)
     if int(first.get("score_max", -1)) != int(smax):
         _bad("score_max", first.get("score_max"), smax)
+    if str(first.get("sampling_mode") or "independent") != sampling_mode:
+        _bad("sampling_mode", first.get("sampling_mode") or "independent", sampling_mode)
+    if first.get("early_stop") != early_stop:
+        _bad("early_stop", first.get("early_stop"), early_stop)
+    return eid, bool(first.get("multi_judge_run"))
 
+
+def _validate_run_keys(
+    keys: List[Tuple], *, label: str, cond: str, k: int, models_to_run: list, metrics_list: list
+) -> None:
+    """Judge list, idx range, metrics and uniqueness of judgment keys (``_judgment_identity`` tuples)."""
     model_set = {str(m) for m in models_to_run}
-    keys_in_order: list = []
-    for r in rows:
-        if str(r.get("execution_id") or "").strip() != eid:
-            raise ValueError(
-                "Resume file contains multiple execution_id values; use a single-run JSONL only."
-            )
-        if str(r.get("judge_model") or "") not in model_set:
-            raise ValueError(
-                f"Resume row uses judge_model={r.get('judge_model')!r} not in this run's model list."
-            )
-        idx_i = int(r["idx"])
+    for key in keys:
+        if key[1] not in model_set:
+            raise ValueError(f"{label} row uses judge_model={key[1]!r} not in this run's model list.")
+        idx_i = int(key[3])
         if idx_i < 0 or idx_i >= k:
-            raise ValueError(f"Resume file has invalid idx={idx_i} for K={k}.")
-        if cond == "metric_rubric":
-            mn = str(r.get("metric_name") or "")
-            if mn not in metrics_list:
-                raise ValueError(
-                    f"Resume file metric_name={mn!r} not in this run's metrics_list={metrics_list}."
-                )
-        keys_in_order.append(_judgment_identity(r))
-
-    if len(keys_in_order) != len(set(keys_in_order)):
+            raise ValueError(f"{label} has invalid idx={idx_i} for K={k}.")
+        if cond == "metric_rubric" and key[4] not in metrics_list:
+            raise ValueError(f"{label} metric_name={key[4]!r} not in this run's metrics_list={metrics_list}.")
+    if len(keys) != len(set(keys)):
         raise ValueError(
-            "Resume file has duplicate judgment keys (same judge, item, idx, metric). "
+            f"{label} has duplicate judgment keys (same judge, item, idx, metric). "
             "Remove duplicates or use a clean file."
         )
 
-    if len(rows) >= expected_rows:
+
+def _validate_run_rows(
+    rows: List[dict],
+    *,
+    label: str,
+    cond: str,
+    dset_id: str,
+    k: int,
+    temp: float,
+    smin: int,
+    smax: int,
+    models_to_run: list,
+    metrics_list: list,
+    sampling_mode: str = "independent",
+    early_stop: Optional[str] = None,
+) -> Tuple[List[Tuple], str, bool]:
+    """
+    Check that ``rows`` belong to one execution of this run config (metadata, judge list, idx range, metrics,
+    no duplicate judgment keys). Used by shard merge; ``label`` names the file in errors.
+    Returns (judgment keys in file order, execution_id, multi_judge_run of the first row).
+    """
+    eid, multi_judge = _validate_run_header(
+        rows[0] if rows else None,
+        label=label,
+        cond=cond,
+        dset_id=dset_id,
+        temp=temp,
+        smin=smin,
+        smax=smax,
+        sampling_mode=sampling_mode,
+        early_stop=early_stop,
+    )
+    if any(str(r.get("execution_id") or "").strip() != eid for r in rows):
+        raise ValueError(f"{label} contains multiple execution_id values; use a single-run JSONL only.")
+    keys_in_order = [_judgment_identity(r) for r in rows]
+    _validate_run_keys(
+        keys_in_order, label=label, cond=cond, k=k, models_to_run=models_to_run, metrics_list=metrics_list
+    )
+    return keys_in_order, eid, multi_judge
+
+
+def _validate_run_index(
+    index: ResumeIndex,
+    *,
+    label: str,
+    cond: str,
+    dset_id: str,
+    k: int,
+    temp: float,
+    smin: int,
+    smax: int,
+    models_to_run: list,
+    metrics_list: list,
+    sampling_mode: str = "independent",
+    early_stop: Optional[str] = None,
+) -> Tuple[List[Tuple], str, bool]:
+    """
+    ``_validate_run_rows`` for an indexed file: metadata from the first row, everything else from the index
+    keys, so only rows past the indexed prefix were parsed. Same return value.
+    """
+    eid, multi_judge = _validate_run_header(
+        index.first_row,
+        label=label,
+        cond=cond,
+        dset_id=dset_id,
+        temp=temp,
+        smin=smin,
+        smax=smax,
+        sampling_mode=sampling_mode,
+        early_stop=early_stop,
+    )
+    if index.execution_ids - {eid}:
+        raise ValueError(f"{label} contains multiple execution_id values; use a single-run JSONL only.")
+    keys_in_order = index.keys
+    _validate_run_keys(
+        keys_in_order, label=label, cond=cond, k=k, models_to_run=models_to_run, metrics_list=metrics_list
+    )
+    return keys_in_order, eid, multi_judge
+
+
+def _prepare_resume(
+    index: ResumeIndex,
+    *,
+    cond: str,
+    dset_id: str,
+    k: int,
+    temp: float,
+    smin: int,
+    smax: int,
+    models_to_run: list,
+    metrics_list: list,
+    expected_rows: int,
+    sampling_mode: str = "independent",
+    early_stop: Optional[str] = None,
+) -> Tuple[Set[Tuple], str, bool, int]:
+    """
+    Validate an indexed resume file (``load_resume_index``) against this run config; return judgment keys
+    already present.
+    """
+    if not index.entries:
+        raise ValueError(f"Resume file is empty: {index.path}")
+    keys_in_order, eid, multi_judge = _validate_run_index(
+        index,
+        label="Resume file",
+        cond=cond,
+        dset_id=dset_id,
+        k=k,
+        temp=temp,
+        smin=smin,
+        smax=smax,
+        models_to_run=models_to_run,
+        metrics_list=metrics_list,
+        sampling_mode=sampling_mode,
+        early_stop=early_stop,
+    )
+
+    if len(keys_in_order) >= expected_rows:
         raise ValueError(
-            f"Resume file already has {len(rows)} rows (expected {expected_rows} total); nothing to append."
+            f"Resume file already has {len(keys_in_order)} rows (expected {expected_rows} total); nothing to append."
         )
 
-    return set(keys_in_order), eid, bool(first.get("multi_judge_run")), len(rows)
+    return set(keys_in_order), eid, multi_judge, len(keys_in_order)
 
 
 def _ensure_api_keys_for_models(models: list) -> None:
@@ -182,6 +991,17 @@ def run_experiment(
     dataset_id=None,
     progress_callback: Optional[Callable[[int, int], None]] = None,
     resume_path: Optional[str] = None,
+    workers: Union[int, Dict[str, int], None] = None,
+    rate_limits: Optional[Dict[str, dict]] = None,
+    use_cache: Optional[bool] = None,
+    execution_mode: Optional[str] = None,
+    sampling_mode: Optional[str] = None,
+    shard_index: Optional[int] = None,
+    shard_count: Optional[int] = None,
+    execution_id: Optional[str] = None,
+    early_stop: Optional[str] = None,
+    budget: Optional[dict] = None,
+    dry_run: bool = False,
 ):
     """
     Run repeated judging. Accepts optional overrides; otherwise uses env/defaults.
@@ -202,8 +1022,51 @@ def run_experiment(
     Rows still record the correct ``idx`` per judgment.
     resume_path: if set, append **missing** judgments to this JSONL only (same ``execution_id``,
         metadata must match). Skips already-present (judge, item, idx[, metric]) slots.
-    On success returns a dict with output_path, expected_rows, written_rows, execution_id,
-        resumed (bool), skipped_existing (int), session_new_rows (int).
+    workers: parallel judge calls **per provider** — an int, or ``{"openai": n, "anthropic": m}``; default from
+        env JUDGE_WORKERS / JUDGE_WORKERS_OPENAI / JUDGE_WORKERS_ANTHROPIC (1 = serial). With more than one
+        worker, judge models are interleaved (``idx`` → item → metric → model) and rows are still written in
+        that fixed plan order, whatever order the API calls finish in.
+    rate_limits: optional RPM/TPM seeds for the shared limiter, keyed by model id, ``"openai"`` /
+        ``"anthropic"`` or ``"*"`` (e.g. ``{"gpt-4o": {"rpm": 500, "tpm": 30000}}``); merged over env
+        JUDGE_RPM* / JUDGE_TPM* / JUDGE_RATE_LIMITS. Limits are then adapted from response headers.
+    use_cache: serve identical judgments (same prompt, model, temperature, ``idx``) from the on-disk
+        judgment cache; None uses env JUDGE_CACHE (off unless set to 1). Leave it off for stability
+        experiments so every row is a fresh API sample. Each row records ``cache_hit``.
+    execution_mode: ``"sync"`` (default; env JUDGE_EXECUTION_MODE) or ``"batch"``: submit the whole plan via
+        the OpenAI Batch API / Anthropic Message Batches, poll until done, then write the same rows (plus
+        ``execution_mode`` and ``batch_id``; ``latency_ms`` is None). Requests a batch did not complete are
+        judged synchronously. Submitted batches are recorded in ``<output>.batches.json`` so resuming the
+        output file re-attaches to them instead of resubmitting.
+    sampling_mode: ``"independent"`` (default; env JUDGE_SAMPLING_MODE) or ``"multi_sample"``: each OpenAI judge
+        gets all K repeats of a prompt as ``n=K`` choices of **one** request, fanned out to rows ``idx=0..K-1``.
+        Input tokens are charged to the first row only; output tokens are split across choices. This changes
+        the experimental design (repeats are not independent calls), so every row records ``sampling_mode``
+        and ``n_choices``. Claude judges still make one call per repeat. Not available in batch mode.
+    shard_index, shard_count: run only this deterministic slice of the plan (crc32 of the judgment key, so every
+        process / machine computes the same split) into ``results/shards/<execution_id>/shard-III-of-NNN.jsonl``.
+        Requires ``execution_id`` (the same for every shard). Re-running a shard resumes its file; combine the
+        shards with :func:`merge_shards`.
+    execution_id: use this id instead of a fresh uuid4 (required for shards; must match the file when resuming).
+    early_stop: adaptive repeats (env JUDGE_EARLY_STOP), e.g. ``"agree:3"`` or ``"sd:2.5"`` (see
+        :func:`parse_stop_rule`). Repeats are issued in rounds; a (judge, item, metric) cell gets no further repeats
+        once its scores so far meet the rule, so K becomes an upper bound. Rows carry ``repeats_planned`` and
+        ``early_stop``. Not available with multi_sample sampling or batch mode.
+    budget: token / USD caps (merged over env JUDGE_BUDGET_*; see :func:`budget.build_run_budget`), e.g.
+        ``{"max_usd": 5.0, "per_model": {"gpt-4o": {"max_tokens": 200000}}, "rates": {"openai_in": 2.5, ...}}``.
+        Each judgment is estimated before it is sent and skipped if it would exceed its judge's or the run's cap
+        (rows already in a resumed file count). If the whole plan is forecast not to fit, it is reordered
+        repeat-major across judges so a capped run still covers every judge and item. A capped run stops cleanly
+        with a shorter, resumable file and ``budget_exhausted=True``.
+    dry_run: render and count the plan without calling any API or writing results (no API keys needed).
+        Prints and returns the forecast: rows, requests, per-judge estimated input / output tokens
+        (``rate_limit.approx_tokens``; output from prior runs' mean), USD (budget / JUDGE_RATE_* rates) and a
+        wall-clock estimate from prior ``latency_ms`` (median per judge) under the configured workers and rate
+        limits. With adaptive repeats the counts are upper bounds; batch runs get no wall-clock estimate.
+    A dry run returns ``{"dry_run": True, ...forecast}`` instead. On success returns a dict with output_path, expected_rows, written_rows, execution_id,
+        resumed (bool), skipped_existing (int), session_new_rows (int), execution_mode, sampling_mode
+        (plus shard_index / shard_count for shards; expected_rows is then the shard's slice), calls_saved
+        (planned judgments skipped by early stopping; 0 without a rule), budget_exhausted (bool) and budget
+        (spend summary, or None without caps).
     Raises RuntimeError if the JSONL row count or parseable records do not match the expected total.
     """
     load_dotenv(REPO_ROOT / ".env")
@@ -219,6 +1082,19 @@ def run_experiment(
     smin = int(score_min) if score_min is not None else int(os.environ.get("SCORE_MIN", str(DEFAULT_SCORE_MIN)))
     smax = int(score_max) if score_max is not None else int(os.environ.get("SCORE_MAX", str(DEFAULT_SCORE_MAX)))
     dset_id = (dataset_id or os.environ.get("DATASET_ID") or data_path.stem).strip()
+    mode = (execution_mode or os.environ.get("JUDGE_EXECUTION_MODE") or "sync").strip().lower()
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"execution_mode must be one of {EXECUTION_MODES}, got {mode!r}.")
+    sampling = (sampling_mode or os.environ.get("JUDGE_SAMPLING_MODE") or "independent").strip().lower()
+    if sampling not in SAMPLING_MODES:
+        raise ValueError(f"sampling_mode must be one of {SAMPLING_MODES}, got {sampling!r}.")
+    if sampling == "multi_sample" and mode == "batch":
+        raise ValueError("sampling_mode='multi_sample' is not supported with execution_mode='batch'.")
+    stop_rule = parse_stop_rule(early_stop if early_stop is not None else os.environ.get("JUDGE_EARLY_STOP"))
+    stop_spec = format_stop_rule(stop_rule)
+    if stop_rule is not None and (sampling == "multi_sample" or mode == "batch"):
+        raise ValueError("early_stop needs sampling_mode='independent' and execution_mode='sync'.")
+    run_budget = build_run_budget(budget, JUDGE_SYSTEM_CONTENT)
 
     if judge_models is not None and len(judge_models) > 0:
         models_to_run = [str(m).strip() for m in judge_models if str(m).strip()]
@@ -227,7 +1103,10 @@ def run_experiment(
     else:
         models_to_run = [judge_model or os.environ.get("JUDGE_MODEL", JUDGE_MODEL)]
 
-    _ensure_api_keys_for_models(models_to_run)
+    if not dry_run:
+        _ensure_api_keys_for_models(models_to_run)
+    if run_budget is not None:
+        run_budget.check_rates(models_to_run)
 
     tracer = setup_tracer()
     dataset = load_dataset(data_path)
@@ -266,9 +1145,111 @@ def run_experiment(
             f"items={n_items}, K={k}, models={n_models}."
         )
 
+    # Recorded in the batch sidecar and the shard plan; resumed / merged runs must match it exactly.
+    run_config = {
+        "condition_name": cond,
+        "dataset_id": dset_id,
+        "item_count": n_items,
+        "repeats": k,
+        "temperature": temp,
+        "score_min": smin,
+        "score_max": smax,
+        "judge_models": models_to_run,
+        "metric_names": metrics_list,
+        "sampling_mode": sampling,
+        "early_stop": stop_spec,
+    }
+
+    configure_rate_limits(rate_limits)
+    workers_by_provider = _workers_by_provider(workers)
+    providers_used = {provider_for_model(m) for m in models_to_run}
+    workers_by_provider = {p: n for p, n in workers_by_provider.items() if p in providers_used}
+    concurrent = mode == "sync" and any(n > 1 for n in workers_by_provider.values())
+    plan = _plan_judgments(
+        dataset,
+        models_to_run,
+        cond=cond,
+        k=k,
+        metrics_list=metrics_list,
+        judge_template=judge_template,
+        metric_template=metric_template,
+        interleave_models=concurrent,
+    )
+
+    requested_eid = (execution_id or "").strip() or None
+    shard_out: Optional[Path] = None
+    if shard_count is not None:
+        shard_count = int(shard_count)
+        shard_index = -1 if shard_index is None else int(shard_index)
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError(f"shard_index must be in [0, {shard_count}), got {shard_index}.")
+        if resume_path:
+            raise ValueError("resume_path cannot be combined with sharding; re-run the same shard to resume it.")
+        if not requested_eid:
+            raise ValueError("Sharded runs need an explicit execution_id shared by every shard (e.g. a uuid4).")
+        group_repeats = sampling == "multi_sample" or stop_rule is not None
+        shard_of = [_shard_of(s["key"], shard_count, group_repeats) for s in plan]
+        if not dry_run:
+            _write_shard_plan(
+                requested_eid,
+                {
+                    "execution_id": requested_eid,
+                    "shard_count": shard_count,
+                    "config": run_config,
+                    "item_ids": [str(item["item_id"]) for item in dataset],
+                    "expected_rows": expected_rows,
+                    "shard_rows": [shard_of.count(i) for i in range(shard_count)],
+                },
+            )
+        plan = [s for s, i in zip(plan, shard_of) if i == shard_index]
+        expected_rows = len(plan)
+        shard_out = shard_output_path(requested_eid, shard_index, shard_count)
+        shard_index_file = (
+            load_resume_index(shard_out, _judgment_identity, read_only=dry_run) if shard_out.is_file() else None
+        )
+        existing = shard_index_file.entries if shard_index_file is not None else []
+        if existing and len(existing) >= expected_rows:
+            keys, eid_found, _ = _validate_run_index(
+                shard_index_file,
+                label=f"Shard file {shard_out.name}",
+                cond=cond,
+                dset_id=dset_id,
+                k=k,
+                temp=temp,
+                smin=smin,
+                smax=smax,
+                models_to_run=models_to_run,
+                metrics_list=metrics_list,
+                sampling_mode=sampling,
+                early_stop=stop_spec,
+            )
+            if eid_found != requested_eid or set(keys) != {s["key"] for s in plan}:
+                raise ValueError(f"{shard_out} does not match shard {shard_index}/{shard_count} of this run.")
+            print(f"Shard {shard_index}/{shard_count} already complete: {shard_out} ({len(existing)} rows)")
+            return {
+                "output_path": str(shard_out),
+                "expected_rows": expected_rows,
+                "written_rows": len(existing),
+                "execution_id": requested_eid,
+                "resumed": True,
+                "skipped_existing": len(existing),
+                "session_new_rows": 0,
+                "execution_mode": mode,
+                "sampling_mode": sampling,
+                "shard_index": shard_index,
+                "shard_count": shard_count,
+                "calls_saved": 0,
+                "budget_exhausted": False,
+                "budget": None,
+            }
+        if existing or (mode == "batch" and batch_state_path(shard_out).is_file()):
+            resume_path = str(shard_out)
+
     done_keys: Set[Tuple] = set()
+    scores: Dict[Tuple, Optional[int]] = {}
     initial_line_count = 0
     resumed = False
+    resume_index: Optional[ResumeIndex] = None
     if resume_path:
         resumed = True
         resume_p = Path(resume_path)
@@ -276,42 +1257,154 @@ def run_experiment(
             resume_p = (REPO_ROOT / "results" / resume_p.name).resolve()
         if not resume_p.is_file():
             raise FileNotFoundError(f"Resume file not found: {resume_p}")
-        done_keys, execution_id, multi_judge, initial_line_count = _prepare_resume(
-            resume_p,
-            cond=cond,
-            dset_id=dset_id,
-            k=k,
-            temp=temp,
-            smin=smin,
-            smax=smax,
-            models_to_run=models_to_run,
-            metrics_list=metrics_list,
-            expected_rows=expected_rows,
-        )
+        pending_batches = load_batch_state(batch_state_path(resume_p)) if mode == "batch" else None
+        if pending_batches is not None and pending_batches.get("config") != run_config:
+            raise ValueError(
+                f"Batch state for {resume_p.name} was submitted with different settings "
+                f"({pending_batches.get('config')!r}); resume with the same dataset, condition, K, "
+                "temperature, judges and metrics."
+            )
+        # A dry run only reads the file: a torn tail is skipped, not cut off, and the sidecar is left alone.
+        resume_index = load_resume_index(resume_p, _judgment_identity, read_only=dry_run)
+        if pending_batches is not None and not resume_index.entries:
+            # Batches were submitted but no row written yet: the sidecar carries the run identity.
+            execution_id = str(pending_batches["execution_id"])
+            multi_judge = len(models_to_run) > 1
+        else:
+            done_keys, execution_id, multi_judge, initial_line_count = _prepare_resume(
+                resume_index,
+                cond=cond,
+                dset_id=dset_id,
+                k=k,
+                temp=temp,
+                smin=smin,
+                smax=smax,
+                models_to_run=models_to_run,
+                metrics_list=metrics_list,
+                expected_rows=expected_rows,
+                sampling_mode=sampling,
+                early_stop=stop_spec,
+            )
+        if stop_rule is not None:
+            scores = resume_index.scores()
+        if run_budget is not None:
+            for r in resume_index.usage_rows():
+                run_budget.charge(r)
+        if requested_eid and requested_eid != execution_id:
+            raise ValueError(
+                f"Resume file belongs to execution_id={execution_id}, not the requested {requested_eid}."
+            )
         if (len(models_to_run) > 1) != multi_judge:
             raise ValueError(
                 "Resume file multi_judge_run does not match this run's number of judge models."
             )
         output_path = resume_p
-        print(f"Resuming execution_id={execution_id} — {initial_line_count} rows on disk, appending…")
-    else:
-        execution_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
-        t_tag = str(temp).replace(".", "p") if "." in str(temp) else str(temp)
-        cond_slug = _condition_slug(cond)
-        _fname_model = (
-            models_to_run[0].replace("/", "_")
-            if len(models_to_run) == 1
-            else f"multi{len(models_to_run)}judges"
+        print(
+            f"Resuming execution_id={execution_id} — {initial_line_count} rows on disk "
+            f"({resume_index.scanned_rows} parsed past the index), appending…"
         )
-        output_path = REPO_ROOT / "results" / f"mtbench_judge-{_fname_model}_cond-{cond_slug}_K{k}_t{t_tag}_{timestamp}.jsonl"
+    else:
+        execution_id = requested_eid or str(uuid.uuid4())
+        if shard_out is not None:
+            output_path = shard_out
+            if not dry_run:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+        else:
+            output_path = _default_output_path(models_to_run, cond, k, temp)
         multi_judge = len(models_to_run) > 1
-        print(f"Execution ID: {execution_id}")
+        if not dry_run:
+            print(f"Execution ID: {execution_id}")
 
     file_mode = "a" if resumed else "w"
     skipped_existing = len(done_keys)
     session_new_rows = 0
 
+    # Adaptive runs schedule from the whole plan (cells) and the scores already on disk.
+    cells = _repeat_cells(s["key"] for s in plan) if stop_rule is not None else []
+    slots_by_key = {s["key"]: s for s in plan}
+    slot_position = {s["key"]: i for i, s in enumerate(plan)}
+    plan = [s for s in plan if s["key"] not in done_keys]
+    history: Dict[str, dict] = {}
+    if dry_run or run_budget is not None:
+        history, history_files = _judge_history(models_to_run)
+    if run_budget is not None:
+        for m, h in history.items():
+            if h["output_tokens"] is not None:
+                run_budget.seed_output_tokens(m, h["output_tokens"])
+    if dry_run:
+        report = _dry_run_forecast(
+            plan,
+            models_to_run=models_to_run,
+            sampling=sampling,
+            mode=mode,
+            workers_by_provider=workers_by_provider,
+            concurrent=concurrent,
+            pricing=run_budget or budget_from_config(budget, JUDGE_SYSTEM_CONTENT),
+            history=history,
+        )
+        _print_dry_run(
+            report,
+            expected_rows=expected_rows,
+            done=len(done_keys),
+            history_files=history_files,
+            adaptive=stop_rule is not None,
+            workers_by_provider=workers_by_provider,
+        )
+        if run_budget is not None:
+            report["fits_budget"] = run_budget.fits(
+                {
+                    m: (pm["input_tokens"] + pm["output_tokens"], pm["est_usd"] or 0.0)
+                    for m, pm in report["per_model"].items()
+                }
+            )
+            print(f"  Fits budget caps: {'yes' if report['fits_budget'] else 'NO — the run would stop early'}")
+        return {
+            "dry_run": True,
+            "expected_rows": expected_rows,
+            "already_written": len(done_keys),
+            "execution_mode": mode,
+            "sampling_mode": sampling,
+            "early_stop": stop_spec,
+            **report,
+        }
+    if run_budget is not None:
+        units = _group_multi_sample(plan) if sampling == "multi_sample" else [{"slots": [s]} for s in plan]
+        forecast = run_budget.forecast(
+            (u["slots"][0]["judge_model"], u["slots"][0]["prompt"], len(u["slots"])) for u in units
+        )
+        priced = any(run_budget.rates_for(m)[2] for m in models_to_run)
+        print(
+            f"Budget forecast: ~{sum(t for t, _ in forecast.values()):,} tokens"
+            + (f", ~${sum(u for _, u in forecast.values()):.4f}" if priced else "")
+            + f" for {len(plan)} judgment(s)"
+        )
+        if not run_budget.fits(forecast):
+            # Repeat-major, judges innermost: a capped run still covers every judge and item before more repeats.
+            item_pos = {str(item["item_id"]): i for i, item in enumerate(dataset)}
+            model_pos = {m: i for i, m in enumerate(models_to_run)}
+            metric_pos = {m: i for i, m in enumerate(metrics_list)}
+            plan.sort(
+                key=lambda s: (
+                    s["idx"],
+                    item_pos[str(s["item_id"])],
+                    metric_pos.get(s["metric_name"], 0),
+                    model_pos[s["judge_model"]],
+                )
+            )
+            print("Budget forecast exceeds a cap: judging repeat-major so the capped run stays balanced.")
+
+    def gate(units: Iterable[dict]) -> Iterable[dict]:
+        """The slots / units the budget admits, lazily (all of them without caps)."""
+        return run_budget.gate(units, _budget_request) if run_budget is not None else units
+
+    if shard_out is not None:
+        print(f"Shard {shard_index}/{shard_count}: {expected_rows} judgment(s) → {output_path}")
+    if concurrent:
+        print(
+            "Concurrent judging: "
+            + ", ".join(f"{p}={n} workers" for p, n in sorted(workers_by_provider.items()))
+        )
+
     with tracer.start_as_current_span("judge_execution") as exec_span:
         exec_span.set_attribute("execution_id", execution_id)
         exec_span.set_attribute("gen_ai.request.model", ",".join(models_to_run))
@@ -328,173 +1421,226 @@ def run_experiment(
             exec_span.set_attribute("metric_name", legacy_metric)
         exec_span.set_attribute("expected_output_rows", expected_rows)
         exec_span.set_attribute("resume_appended_from", initial_line_count if resumed else 0)
+        for p, n in workers_by_provider.items():
+            exec_span.set_attribute(f"workers.{p}", n)
+        exec_span.set_attribute("execution_mode", mode)
+        exec_span.set_attribute("sampling_mode", sampling)
+        # Worker threads start with an empty OTEL context; parent their spans explicitly.
+        exec_ctx = trace.set_span_in_context(exec_span)
 
-        def _write_judge_row(
-            out_f,
-            *,
-            judge_model_used: str,
-            item_id,
-            idx,
-            m_metric,
-            raw_instr_value,
-            prompt_text,
-            log_label: str,
-            progress_position: int,
-        ):
-            nonlocal session_new_rows
-            with tracer.start_as_current_span("judge_evaluate") as span:
-                span.set_attribute("item_id", str(item_id))
-                span.set_attribute("repeat_idx", idx)
-                span.set_attribute("gen_ai.request.model", judge_model_used)
-                span.set_attribute("gen_ai.request.temperature", temp)
-                if m_metric is not None:
-                    span.set_attribute("metric_name", str(m_metric))
+        def _slot_span_attributes(span, slot: dict) -> None:
+            span.set_attribute("item_id", str(slot["item_id"]))
+            span.set_attribute("repeat_idx", slot["idx"])
+            span.set_attribute("gen_ai.request.model", slot["judge_model"])
+            span.set_attribute("gen_ai.request.temperature", temp)
+            if slot["metric_name"] is not None:
+                span.set_attribute("metric_name", str(slot["metric_name"]))
 
-                start_time = time.time()
-                logger.info(log_label)
-                raw_output, input_tokens, output_tokens = call_judge(
-                    prompt_text,
-                    judge_model_used,
-                    system_content="You are an evaluator. Output JSON only.",
-                    temperature=temp,
-                )
-                latency = int((time.time() - start_time) * 1000)
-
-                try:
-                    parsed = json.loads(raw_output)
-                except json.JSONDecodeError:
-                    parsed = extract_json_from_text(raw_output)
-                sc = parsed.get("score") if parsed else None
-                if parsed and isinstance(sc, int) and smin <= sc <= smax:
-                    score = int(sc)
-                    justification = str(parsed.get("justification", ""))
-                    span.set_attribute("gen_ai.response.score", score)
-                    span.set_status(trace.Status(trace.StatusCode.OK))
-                else:
-                    print(f"⚠️ Failed to parse JSON for {log_label}")
-                    score = None
-                    justification = "PARSE_ERROR: Malformed or invalid judge output"
-                    span.set_status(trace.Status(trace.StatusCode.ERROR, justification))
+        def _finish_row(
+            span,
+            slot: dict,
+            raw_output: str,
+            input_tokens: Optional[int],
+            output_tokens: Optional[int],
+            latency: Optional[int],
+            call_meta: dict,
+        ) -> dict:
+            """Parse the judge output, finish the ``judge_evaluate`` span and build the JSONL row."""
+            cache_hit = bool(call_meta.get("cache_hit"))
+            cache_read = call_meta.get("cache_read_input_tokens")
+            cache_creation = call_meta.get("cache_creation_input_tokens")
+            score, justification = _parse_judge_output(raw_output, smin, smax)
+            if score is not None:
+                span.set_attribute("gen_ai.response.score", score)
+                span.set_status(trace.Status(trace.StatusCode.OK))
+            else:
+                print(f"⚠️ Failed to parse JSON for {slot['log_label']}")
+                justification = "PARSE_ERROR: Malformed or invalid judge output"
+                span.set_status(trace.Status(trace.StatusCode.ERROR, justification))
 
-                span.set_attribute("gen_ai.usage.input_tokens", input_tokens or 0)
-                span.set_attribute("gen_ai.usage.output_tokens", output_tokens or 0)
+            span.set_attribute("gen_ai.usage.input_tokens", input_tokens or 0)
+            span.set_attribute("gen_ai.usage.output_tokens", output_tokens or 0)
+            if latency is not None:
                 span.set_attribute("latency_ms", latency)
-                trace_id, span_id = get_trace_context()
+            span.set_attribute("judge.cache_hit", cache_hit)
+            if cache_read is not None:
+                span.set_attribute("gen_ai.usage.cache_read_input_tokens", cache_read)
+            if cache_creation is not None:
+                span.set_attribute("gen_ai.usage.cache_creation_input_tokens", cache_creation)
+            trace_id, span_id = get_trace_context()
 
-            result = {
+            return {
                 "execution_id": execution_id,
                 "trace_id": trace_id,
                 "span_id": span_id,
-                "item_id": item_id,
-                "idx": idx,
+                "item_id": slot["item_id"],
+                "idx": slot["idx"],
                 "condition_name": cond,
-                "metric_name": m_metric,
+                "metric_name": slot["metric_name"],
                 "dataset_id": dset_id,
                 "score_min": smin,
                 "score_max": smax,
                 "temperature": temp,
-                "judge_instructions": raw_instr_value if raw_instr_value else None,
-                "judge_model": judge_model_used,
+                "judge_instructions": slot["raw_instr"] if slot["raw_instr"] else None,
+                "judge_model": slot["judge_model"],
                 "multi_judge_run": multi_judge,
                 "score": score,
                 "justification": justification,
                 "latency_ms": latency,
                 "input_tokens": input_tokens,
                 "output_tokens": output_tokens,
+                "cache_read_input_tokens": cache_read,
+                "cache_creation_input_tokens": cache_creation,
+                "cache_hit": cache_hit,
+                "sampling_mode": sampling,
+                "n_choices": 1,
+                "repeats_planned": k,
+                "early_stop": stop_spec,
                 "span_status": "ok" if score is not None else "error",
                 "span_status_message": None if score is not None else justification,
                 "created_at": datetime.utcnow().isoformat() + "Z",
             }
-            out_f.write(json.dumps(result) + "\n")
-            out_f.flush()
-            session_new_rows += 1
-            if progress_callback:
-                progress_callback(progress_position, expected_rows)
-            print(f"{log_label} | Score: {score}")
 
+        def _judge_slot(slot: dict) -> dict:
+            """One API call + parse for a planned slot; returns the JSONL row (safe to run on worker threads)."""
+            with tracer.start_as_current_span("judge_evaluate", context=exec_ctx) as span:
+                _slot_span_attributes(span, slot)
+                start_time = time.time()
+                logger.info(slot["log_label"])
+                call_meta: dict = {}
+                raw_output, input_tokens, output_tokens = call_judge(
+                    slot["prompt"],
+                    slot["judge_model"],
+                    system_content=JUDGE_SYSTEM_CONTENT,
+                    temperature=temp,
+                    repeat_idx=slot["idx"],
+                    use_cache=use_cache,
+                    call_meta=call_meta,
+                    prompt_prefix=slot["prompt_prefix"],
+                )
+                latency = int((time.time() - start_time) * 1000)
+                return _finish_row(span, slot, raw_output, input_tokens, output_tokens, latency, call_meta)
+
+        def _judge_unit(unit: dict) -> List[dict]:
+            """Multi-sample unit: one ``n``-choice request fanned out to one row per repeat (``idx`` ascending)."""
+            slots = unit["slots"]
+            if len(slots) == 1:
+                return [_judge_slot(slots[0])]
+            first = slots[0]
+            n = len(slots)
+            with tracer.start_as_current_span("judge_evaluate_n", context=exec_ctx) as call_span:
+                _slot_span_attributes(call_span, first)
+                call_span.set_attribute("gen_ai.request.choice.count", n)
+                start_time = time.time()
+                logger.info(f"{first['log_label']} (n={n})")
+                contents, input_tokens, output_tokens = call_judge_n(
+                    first["prompt"],
+                    first["judge_model"],
+                    n,
+                    system_content=JUDGE_SYSTEM_CONTENT,
+                    temperature=temp,
+                )
+                latency = int((time.time() - start_time) * 1000)
+                call_ctx = trace.set_span_in_context(call_span)
+                rows = []
+                for i, (slot, content, out_tokens) in enumerate(zip(slots, contents, output_tokens)):
+                    with tracer.start_as_current_span("judge_evaluate", context=call_ctx) as span:
+                        _slot_span_attributes(span, slot)
+                        span.set_attribute("judge.choice_index", i)
+                        # The prompt is billed once per request: charge it to the first choice.
+                        row = _finish_row(
+                            span, slot, content, input_tokens if i == 0 else 0, out_tokens, latency, {}
+                        )
+                    row["n_choices"] = n
+                    rows.append(row)
+            return rows
+
+        def _batch_row(slot: dict, result: Optional[dict]) -> dict:
+            """Row from a batch result; requests the batch did not complete are judged synchronously."""
+            if result is None or "error" in result:
+                reason = (result or {}).get("error") or "no result in batch output"
+                print(f"[batch] {slot['log_label']}: {reason}; judging synchronously")
+                row = _judge_slot(slot)
+                row["execution_mode"] = "sync"
+                row["batch_id"] = None
+                return row
+            with tracer.start_as_current_span("judge_evaluate", context=exec_ctx) as span:
+                _slot_span_attributes(span, slot)
+                span.set_attribute("judge.execution_mode", "batch")
+                if result["batch_id"]:
+                    span.set_attribute("judge.batch_id", result["batch_id"])
+                row = _finish_row(
+                    span,
+                    slot,
+                    result["content"],
+                    result["input_tokens"],
+                    result["output_tokens"],
+                    None,
+                    result,
+                )
+            row["execution_mode"] = "batch"
+            row["batch_id"] = result["batch_id"]
+            return row
+
+        out_file: Optional[JsonlWriter] = None
         try:
-            with output_path.open(file_mode, encoding="utf-8") as out_file:
+            with JsonlWriter(output_path, file_mode, index_key=_judgment_identity) as out_file:
+                progress_total = expected_rows
                 if progress_callback:
-                    progress_callback(initial_line_count, expected_rows)
-                processed = 0
-                # Round-robin repeats: for each repeat index, hit all items (then next idx).
-                for model in models_to_run:
-                    if cond == "metric_rubric":
-                        for idx in range(k):
-                            for item in dataset:
-                                item_id = item["item_id"]
-                                question = item["question"]
-                                response = item["response"]
-                                for m in metrics_list:
-                                    processed += 1
-                                    jk = ("metric_rubric", str(model), str(item_id), idx, str(m))
-                                    if jk in done_keys:
-                                        if progress_callback:
-                                            progress_callback(processed, expected_rows)
-                                        continue
-                                    gloss = gloss_for_metric(m)
-                                    prompt = metric_template.format(
-                                        metric_name=m,
-                                        metric_gloss=gloss,
-                                        question=question,
-                                        response=response,
-                                    )
-                                    _write_judge_row(
-                                        out_file,
-                                        judge_model_used=model,
-                                        item_id=item_id,
-                                        idx=idx,
-                                        m_metric=m,
-                                        raw_instr_value="",
-                                        prompt_text=prompt,
-                                        log_label=f"{model} | Item {item_id} | Metric {m} | R{idx}",
-                                        progress_position=processed,
-                                    )
-                    else:
-                        for idx in range(k):
-                            for item in dataset:
-                                item_id = item["item_id"]
-                                question = item["question"]
-                                response = item["response"]
-                                raw_instr = (item.get("judge_instructions") or "").strip()
-                                if cond == "generic_overall":
-                                    raw_instr = ""
-                                item_specific_rubric = (
-                                    f"Item-specific judge instructions:\n{raw_instr}\n\n"
-                                    if raw_instr
-                                    else ""
-                                )
-
-                                processed += 1
-                                jk = (cond, str(model), str(item_id), idx)
-                                if jk in done_keys:
-                                    if progress_callback:
-                                        progress_callback(processed, expected_rows)
-                                    continue
-
-                                prompt = judge_template.format(
-                                    question=question,
-                                    response=response,
-                                    item_specific_rubric=item_specific_rubric,
-                                )
-                                _write_judge_row(
-                                    out_file,
-                                    judge_model_used=model,
-                                    item_id=item_id,
-                                    idx=idx,
-                                    m_metric=None,
-                                    raw_instr_value=raw_instr,
-                                    prompt_text=prompt,
-                                    log_label=f"{model} | Item {item_id} | R{idx}",
-                                    progress_position=processed,
-                                )
+                    progress_callback(initial_line_count, progress_total)
+
+                def _emit_row(slot: dict, result: dict) -> None:
+                    nonlocal session_new_rows
+                    out_file.write(result)
+                    session_new_rows += 1
+                    scores[slot["key"]] = result["score"]
+                    if run_budget is not None:
+                        run_budget.charge(result, slot["key"])
+                    if progress_callback:
+                        progress_callback(initial_line_count + session_new_rows, progress_total)
+                    print(f"{slot['log_label']} | Score: {result['score']}")
+
+                if mode == "batch":
+                    plan = list(gate(plan))
+                    batch_results = run_judgment_batches(
+                        plan,
+                        temperature=temp,
+                        system_content=JUDGE_SYSTEM_CONTENT,
+                        state_path=batch_state_path(output_path),
+                        execution_id=execution_id,
+                        config=run_config,
+                        use_cache=use_cache,
+                    )
+                    for slot in plan:
+                        _emit_row(slot, _batch_row(slot, batch_results.get(batch_custom_id(slot["key"]))))
+                elif sampling == "multi_sample":
+
+                    def _emit_unit(unit: dict, rows: List[dict]) -> None:
+                        for slot, row in zip(unit["slots"], rows):
+                            _emit_row(slot, row)
+
+                    _run_slots_in_order(
+                        gate(_group_multi_sample(plan)), _judge_unit, _emit_unit, workers_by_provider
+                    )
+                elif stop_rule is not None:
+                    # One round per repeat index: every open cell gets its next repeat, then the rule is re-checked.
+                    while True:
+                        wave = [key for key in (_next_repeat(c, scores, stop_rule) for c in cells) if key]
+                        progress_total = expected_rows - _calls_saved(cells, scores, stop_rule)
+                        if not wave:
+                            break
+                        n_before = session_new_rows
+                        _run_slots_in_order(
+                            gate([slots_by_key[key] for key in wave]), _judge_slot, _emit_row, workers_by_provider
+                        )
+                        if session_new_rows == n_before:
+                            break  # budget admitted nothing this round
+                    if progress_callback:
+                        progress_callback(initial_line_count + session_new_rows, progress_total)
+                else:
+                    _run_slots_in_order(gate(plan), _judge_slot, _emit_row, workers_by_provider)
         except Exception as e:
-            partial_n = 0
-            if output_path.is_file():
-                try:
-                    partial_n = len(load_jsonl(output_path))
-                except Exception:
-                    pass
+            partial_n = initial_line_count + (out_file.rows_written if out_file is not None else 0)
             el = str(e).lower()
             quota_hint = ""
             if (
@@ -517,10 +1663,40 @@ def run_experiment(
                 f"Details: {e}"
             ) from e
 
-    written_rows = len(load_jsonl(output_path))
-    if written_rows != expected_rows:
+    # Streaming validation: the resumed prefix comes from its index; only this session's bytes are parsed.
+    manifest = ManifestBuilder(slot_position.get, len(slot_position))
+    start_offset = 0
+    if resume_index is not None:
+        for entry in resume_index.entries:
+            manifest.add_index_entry(entry)
+        start_offset = resume_index.end_offset
+    stream_validate(output_path, manifest, _judgment_identity, start_offset)
+    if not manifest.valid:
         raise RuntimeError(
-            f"JSONL validation failed: expected {expected_rows} records, "
+            f"JSONL validation failed for {output_path}: {manifest.bad_lines} unparseable line(s) "
+            f"(byte offsets {manifest.bad_line_offsets}), {manifest.duplicate_rows} duplicate and "
+            f"{manifest.unknown_rows} unplanned judgment(s) (execution_id={execution_id})."
+        )
+    written_rows = manifest.rows
+    calls_saved = 0
+    budget_exhausted = bool(run_budget is not None and run_budget.exhausted)
+    if stop_rule is not None and not budget_exhausted:
+        open_cells = sum(1 for c in cells if _next_repeat(c, scores, stop_rule) is not None)
+        if open_cells:
+            raise RuntimeError(
+                f"JSONL validation failed: {open_cells} cell(s) still need repeats under early_stop={stop_spec} "
+                f"in {output_path} (execution_id={execution_id})."
+            )
+        calls_saved = _calls_saved(cells, scores, stop_rule)
+        expected_written = expected_rows - calls_saved
+    else:
+        expected_written = expected_rows
+    if budget_exhausted:
+        # A capped run is short by design: every judgment the budget admitted this session must be on disk.
+        expected_written = initial_line_count + run_budget.admitted_slots
+    if written_rows != expected_written:
+        raise RuntimeError(
+            f"JSONL validation failed: expected {expected_written} records, "
             f"found {written_rows} parseable lines in {output_path} "
             f"(execution_id={execution_id})."
         )
@@ -530,7 +1706,31 @@ def run_experiment(
             f"but file has {written_rows} (execution_id={execution_id})."
         )
 
-    print(f"\nDone.... {output_path} ({written_rows} rows)")
+    if mode == "batch":
+        batch_state_path(output_path).unlink(missing_ok=True)
+
+    manifest_file = write_manifest(
+        output_path,
+        manifest.manifest(
+            results_file=output_path.name,
+            execution_id=execution_id,
+            config=run_config,
+            expected_rows=expected_rows,
+            calls_saved=calls_saved,
+            budget_exhausted=budget_exhausted,
+            complete=not budget_exhausted and written_rows == expected_rows - calls_saved,
+        ),
+    )
+
+    print(f"\nDone.... {output_path} ({written_rows} rows, manifest {manifest_file.name})")
+    if budget_exhausted:
+        caps = "; ".join(f"{scope}: {why}" for scope, why in run_budget.exhausted.items())
+        print(
+            f"  Budget reached ({caps}) — {written_rows} of {expected_rows} planned judgments written. "
+            "Resume this file with a higher cap to finish."
+        )
+    if stop_rule is not None:
+        print(f"  (early_stop={stop_spec}: {calls_saved} of {expected_rows} planned judgments skipped)")
     if resumed:
         print(f"  (resumed: skipped {skipped_existing} existing slots, new API rows {session_new_rows})")
     return {
@@ -541,12 +1741,49 @@ def run_experiment(
         "resumed": resumed,
         "skipped_existing": skipped_existing,
         "session_new_rows": session_new_rows,
+        "execution_mode": mode,
+        "sampling_mode": sampling,
+        **({"shard_index": shard_index, "shard_count": shard_count} if shard_out is not None else {}),
+        "calls_saved": calls_saved,
+        "budget_exhausted": budget_exhausted,
+        "budget": run_budget.summary() if run_budget is not None else None,
+        "manifest_path": str(manifest_file),
     }
 
 
+def _parse_shard(spec: str) -> Tuple[int, int]:
+    try:
+        i, n = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected INDEX/COUNT (e.g. 0/4), got {spec!r}")
+    return i, n
+
+
 def main():
-    resume = sys.argv[1] if len(sys.argv) > 1 else None
-    r = run_experiment(resume_path=resume)
+    parser = argparse.ArgumentParser(description="Repeated LLM-as-judge scoring (config from env / .env).")
+    parser.add_argument("resume_path", nargs="?", help="existing results JSONL to resume")
+    parser.add_argument("--shard", type=_parse_shard, metavar="I/N", help="run only shard I of N (0-based)")
+    parser.add_argument("--execution-id", help="execution id shared by all shards (required with --shard)")
+    parser.add_argument("--merge", metavar="EXECUTION_ID", help="validate and merge the shards of a sharded run")
+    parser.add_argument("--output", help="merged JSONL path (with --merge; default results/<usual name>)")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="forecast rows, tokens, cost and wall-clock without calling any API"
+    )
+    args = parser.parse_args()
+
+    if args.merge:
+        merge_shards(args.merge, output_path=args.output)
+        return
+    shard_index, shard_count = args.shard if args.shard else (None, None)
+    r = run_experiment(
+        resume_path=args.resume_path,
+        shard_index=shard_index,
+        shard_count=shard_count,
+        execution_id=args.execution_id,
+        dry_run=args.dry_run,
+    )
+    if r.get("dry_run"):
+        return
     print(r["output_path"])
     if r.get("resumed"):
         print(
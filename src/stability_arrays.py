@@ -0,0 +1,188 @@
+"""
+Array-backed engine for the repeat-stability metrics in ``compute_metrics``.
+
+Scores live in an item × repeat matrix with a validity mask, so ragged items (adaptive stopping, parse errors)
+need no padding semantics. Per-item figures come from a few vectorised passes:
+- variance, SD and range
+- zero-variance share
+- exact agreement and pairwise disagreement, computed from per-(item, score) value counts (Σ c·(c−1)/2) rather
+  than by enumerating O(K²) pairs
+
+Results are bit-identical to the original list-based functions. Per-item sums accumulate repeat by repeat
+(Python's left-to-right ``sum``), and cross-item means use ``np.cumsum``, which adds sequentially, not pairwise.
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+class ScoreMatrix:
+    """Scores per item (rows, in ``item_ids`` order) and repeat (columns, in original order); ``mask`` marks cells."""
+
+    def __init__(self, item_ids: List[str], values: np.ndarray, mask: np.ndarray):
+        self.item_ids = item_ids
+        self.values = values
+        self.mask = mask
+        self.counts = mask.sum(axis=1).astype(np.int64)
+
+    @classmethod
+    def from_by_item(cls, by_item: Dict[str, Sequence]) -> "ScoreMatrix":
+        """From ``{item_id: [score, ...]}`` as built by ``compute_metrics._group_by_item``."""
+        item_ids = list(by_item)
+        lengths = np.fromiter((len(s) for s in by_item.values()), dtype=np.int64, count=len(item_ids))
+        width = int(lengths.max()) if len(item_ids) else 0
+        flat = np.asarray([x for scores in by_item.values() for x in scores])
+        dtype = np.int64 if flat.size == 0 or flat.dtype.kind in "iub" else np.float64
+        mask = np.arange(width)[None, :] < lengths[:, None]
+        values = np.zeros((len(item_ids), width), dtype=dtype)
+        values[mask] = flat.astype(dtype)
+        return cls(item_ids, values, mask)
+
+    @classmethod
+    def from_columns(cls, item_ids: Sequence, scores: Sequence) -> "ScoreMatrix":
+        """
+        From parallel per-judgment arrays (e.g. columnar-store columns with null scores dropped). Items keep
+        first-seen order and repeats keep row order, as ``_group_by_item`` would.
+        """
+        keys = np.asarray([str(i) for i in item_ids])
+        scores = np.asarray(scores)
+        if not len(keys):
+            return cls([], np.zeros((0, 0), dtype=np.int64), np.zeros((0, 0), dtype=bool))
+        uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind="stable")
+        row_of = np.empty(len(uniq), dtype=np.int64)
+        row_of[order] = np.arange(len(uniq))
+        rows = row_of[inverse]
+        by_row = np.argsort(rows, kind="stable")
+        lengths = np.bincount(rows, minlength=len(uniq))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        cols = np.empty(len(rows), dtype=np.int64)
+        cols[by_row] = np.arange(len(rows)) - np.repeat(starts, lengths)
+        dtype = np.int64 if np.issubdtype(scores.dtype, np.integer) else np.float64
+        values = np.zeros((len(uniq), int(lengths.max())), dtype=dtype)
+        mask = np.zeros(values.shape, dtype=bool)
+        values[rows, cols] = scores
+        mask[rows, cols] = True
+        return cls([str(x) for x in uniq[order]], values, mask)
+
+    def _row_sums(self, x: np.ndarray) -> np.ndarray:
+        """Left-to-right sum per row over valid cells (matches ``sum(list)`` for each item)."""
+        acc = np.zeros(x.shape[0], dtype=x.dtype)
+        for j in range(x.shape[1]):
+            acc = np.where(self.mask[:, j], acc + x[:, j], acc)
+        return acc
+
+    def variances(self) -> np.ndarray:
+        """Per-item sample variance (n−1); 0.0 for items with fewer than 2 scores."""
+        n = self.counts
+        out = np.zeros(len(n), dtype=np.float64)
+        ok = n >= 2
+        if not ok.any():
+            return out
+        mean = self._row_sums(self.values) / np.where(n > 0, n, 1)
+        dev = (self.values - mean[:, None]) ** 2
+        ss = self._row_sums(dev)
+        out[ok] = ss[ok] / (n[ok] - 1)
+        return out
+
+    def ranges(self) -> np.ndarray:
+        """Per-item max − min (0.0 for items with fewer than 2 scores)."""
+        if not self.values.size:
+            return np.zeros(len(self.counts), dtype=np.float64)
+        hi = np.where(self.mask, self.values, self.values.min()).max(axis=1)
+        lo = np.where(self.mask, self.values, self.values.max()).min(axis=1)
+        return np.where(self.counts >= 2, (hi - lo).astype(np.float64), 0.0)
+
+    def pair_counts(self):
+        """(pairs, agreeing pairs) per item, from value counts: pairs = n(n−1)/2, agree = Σ_v c_v(c_v−1)/2."""
+        n = self.counts
+        pairs = n * (n - 1) // 2
+        rows, _ = np.nonzero(self.mask)
+        vals = self.values[self.mask]
+        if not len(vals):
+            return pairs, np.zeros_like(pairs)
+        _, value_code = np.unique(vals, return_inverse=True)
+        cell = rows * (int(value_code.max()) + 1) + value_code
+        uniq_cell, c = np.unique(cell, return_counts=True)
+        agree = np.zeros_like(pairs)
+        np.add.at(agree, uniq_cell // (int(value_code.max()) + 1), c * (c - 1) // 2)
+        return pairs, agree
+
+
+def sequential_mean(x: np.ndarray, n: int) -> float:
+    """``sum(list(x)) / n`` with the same rounding (sequential accumulation)."""
+    return float(np.cumsum(x)[-1]) / n
+
+
+def per_item_variance(m: ScoreMatrix) -> dict:
+    """Same dict as ``compute_metrics.metric1_per_item_variance``."""
+    n_items = len(m.item_ids)
+    if not n_items:
+        return {
+            "mean_variance": 0,
+            "median_variance": 0.0,
+            "mean_within_item_std": 0.0,
+            "mean_within_item_range": 0.0,
+            "max_within_item_range": 0.0,
+            "pct_items_zero_variance": 0,
+            "n_items": 0,
+            "zero_var_count": 0,
+        }
+    var = m.variances()
+    rng = m.ranges()
+    zero = int((var == 0).sum())
+    srt = np.sort(var)
+    mid = n_items // 2
+    median = float(srt[mid]) if n_items % 2 else float((srt[mid - 1] + srt[mid]) / 2)
+    return {
+        "mean_variance": sequential_mean(var, n_items),
+        "median_variance": median,
+        "mean_within_item_std": sequential_mean(np.sqrt(var), n_items),
+        "mean_within_item_range": sequential_mean(rng, n_items),
+        "max_within_item_range": float(rng.max()),
+        "pct_items_zero_variance": 100 * zero / n_items,
+        "n_items": n_items,
+        "zero_var_count": zero,
+    }
+
+
+def repeat_variability_headlines(m: ScoreMatrix) -> dict:
+    """Same dict as ``compute_metrics.metric_repeat_variability_headlines``."""
+    n_items = len(m.item_ids)
+    n_j = int(m.counts.sum())
+    if n_j == 0:
+        return {
+            "n_items": n_items,
+            "n_judgments": 0,
+            "n_distinct_scores": 0,
+            "n_repeat_pairs": 0,
+            "n_repeat_pairs_disagree": 0,
+            "pct_repeat_pairs_disagree": 0.0,
+            "n_items_any_repeat_disagree": 0,
+            "pct_items_any_repeat_disagree": 0.0,
+        }
+    pairs, agree = m.pair_counts()
+    n_pairs = int(pairs.sum())
+    n_disagree = int((pairs - agree).sum())
+    items_disagree = int((pairs > agree).sum())
+    return {
+        "n_items": n_items,
+        "n_judgments": n_j,
+        "n_distinct_scores": int(len(np.unique(m.values[m.mask]))),
+        "n_repeat_pairs": n_pairs,
+        "n_repeat_pairs_disagree": n_disagree,
+        "pct_repeat_pairs_disagree": 100.0 * n_disagree / n_pairs if n_pairs else 0.0,
+        "n_items_any_repeat_disagree": items_disagree,
+        "pct_items_any_repeat_disagree": 100.0 * items_disagree / n_items if n_items else 0.0,
+    }
+
+
+def exact_agreement(m: ScoreMatrix) -> dict:
+    """Same dict as ``compute_metrics.metric2_exact_agreement``."""
+    n_items = len(m.item_ids)
+    if not n_items:
+        return {"mean_agreement_rate": 0, "n_items": 0}
+    pairs, agree = m.pair_counts()
+    rates = np.where(pairs > 0, agree / np.where(pairs > 0, pairs, 1), 1.0)
+    return {"mean_agreement_rate": sequential_mean(rates, n_items), "n_items": n_items}
@@ -0,0 +1,65 @@
+"""
+Put ``src/`` on the import path (the modules import each other as top-level names, like the scripts do) and
+provide ``fake_judge``, an offline stand-in for the provider calls of ``run_repeated_judging``.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+
+@pytest.fixture
+def fake_judge(monkeypatch, tmp_path):
+    """
+    ``run_repeated_judging`` with the provider calls replaced by a deterministic stand-in and every output file
+    under ``tmp_path``. ``calls`` records each judged (model, prompt), ``outputs`` each output path handed to a run
+    (in order) and ``fail_on`` makes a prompt raise.
+    """
+    import run_repeated_judging as rrj
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setenv("JUDGE_CACHE", "0")
+    monkeypatch.setenv("JUDGE_RATE_LIMIT", "0")
+    for name in ("JUDGE_BUDGET_USD", "JUDGE_BUDGET_TOKENS", "JUDGE_BUDGET_PER_MODEL", "JUDGE_EXECUTION_MODE"):
+        monkeypatch.delenv(name, raising=False)
+
+    class Judge:
+        def __init__(self):
+            self.calls = []
+            self.outputs = []
+            self.fail_on = None
+
+        @staticmethod
+        def score(prompt, model, repeat_idx):
+            return 50 + (len(prompt) + len(model) + 7 * (repeat_idx or 0)) % 40
+
+        def call_judge(self, prompt, model, system_content="", temperature=None, *, repeat_idx=None, **kw):
+            self.calls.append((model, prompt))
+            if self.fail_on is not None and self.fail_on(model, prompt, repeat_idx):
+                raise RuntimeError("stand-in provider failure")
+            return json.dumps({"score": self.score(prompt, model, repeat_idx), "justification": "ok"}), 400, 60
+
+        def call_judge_n(self, prompt, model, n, **kw):
+            self.calls.append((model, prompt))
+            contents = [json.dumps({"score": self.score(prompt, model, i), "justification": "ok"}) for i in range(n)]
+            return contents, 400, [60] * n
+
+    judge = Judge()
+
+    def output_path(*args):
+        path = tmp_path / f"run-{len(judge.outputs)}.jsonl"
+        judge.outputs.append(path)
+        return path
+
+    monkeypatch.setattr(rrj, "call_judge", judge.call_judge)
+    monkeypatch.setattr(rrj, "call_judge_n", judge.call_judge_n)
+    monkeypatch.setattr(rrj, "_default_output_path", output_path)
+    monkeypatch.setattr(rrj, "SHARDS_DIR", tmp_path / "shards")
+    return judge
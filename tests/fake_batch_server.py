@@ -0,0 +1,206 @@
+"""
+Local stand-in for the OpenAI Batch API and Anthropic Message Batches, enough for ``batch_judging`` to submit,
+poll and collect. Point OPENAI_BASE_URL / ANTHROPIC_BASE_URL at ``server.url`` (see ``tests/test_batch_judging.py``).
+
+Batches end after ``polls_to_end`` status checks. Every succeeded request scores :data:`OPENAI_SCORE` /
+:data:`ANTHROPIC_SCORE`. ``fail_ids`` makes those custom_ids fail (HTTP 500 entry / errored result) and
+``reject_schema_models`` makes OpenAI entries with a json_schema response_format fail with a 400 for those models.
+"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Set
+
+OPENAI_SCORE = 71
+ANTHROPIC_SCORE = 81
+
+
+def _completion(body: dict) -> dict:
+    content = json.dumps({"score": OPENAI_SCORE, "justification": "batch"})
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": 0,
+        "model": body["model"],
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 50, "completion_tokens": 10, "total_tokens": 60},
+    }
+
+
+def _message(params: dict) -> dict:
+    return {
+        "id": "msg-fake",
+        "type": "message",
+        "role": "assistant",
+        "model": params["model"],
+        "content": [{"type": "text", "text": json.dumps({"score": ANTHROPIC_SCORE, "justification": "batch"})}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 40, "output_tokens": 9},
+    }
+
+
+class FakeBatchServer:
+    def __init__(self, polls_to_end: int = 1):
+        self.polls_to_end = polls_to_end
+        self.fail_ids: Set[str] = set()
+        self.reject_schema_models: Set[str] = set()
+        self.files: Dict[str, str] = {}
+        self.openai_batches: Dict[str, dict] = {}
+        self.anthropic_batches: Dict[str, dict] = {}
+        # (provider, response_format type or None, number of requests) per submitted batch, in order.
+        self.submissions: List[tuple] = []
+        self._ids = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def __enter__(self) -> "FakeBatchServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _new_id(self, prefix: str) -> str:
+        with self._lock:
+            self._ids += 1
+            return f"{prefix}_{self._ids}"
+
+    def _openai_entry(self, request: dict) -> dict:
+        body = request["body"]
+        fmt = (body.get("response_format") or {}).get("type")
+        if request["custom_id"] in self.fail_ids:
+            response = {"status_code": 500, "body": {"error": {"message": "server error"}}}
+        elif fmt == "json_schema" and body["model"] in self.reject_schema_models:
+            message = "Invalid parameter: 'response_format' of type 'json_schema' is not supported with this model."
+            response = {"status_code": 400, "body": {"error": {"message": message}}}
+        else:
+            response = {"status_code": 200, "request_id": "req", "body": _completion(body)}
+        return {"id": "batch_req", "custom_id": request["custom_id"], "response": response, "error": None}
+
+    def _openai_batch(self, batch_id: str) -> dict:
+        batch = self.openai_batches[batch_id]
+        ended = batch["polls"] >= self.polls_to_end
+        if ended and "output_file_id" not in batch:
+            entries = [self._openai_entry(json.loads(line)) for line in self.files[batch["input_file_id"]].splitlines()]
+            ok = [e for e in entries if e["response"]["status_code"] == 200]
+            bad = [e for e in entries if e["response"]["status_code"] != 200]
+            batch["output_file_id"] = self._new_id("file")
+            self.files[batch["output_file_id"]] = "".join(json.dumps(e) + "\n" for e in ok)
+            batch["error_file_id"] = None
+            if bad:
+                batch["error_file_id"] = self._new_id("file")
+                self.files[batch["error_file_id"]] = "".join(json.dumps(e) + "\n" for e in bad)
+        return {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": batch["endpoint"],
+            "input_file_id": batch["input_file_id"],
+            "completion_window": "24h",
+            "status": "completed" if ended else "in_progress",
+            "created_at": 0,
+            "output_file_id": batch.get("output_file_id"),
+            "error_file_id": batch.get("error_file_id"),
+        }
+
+    def _anthropic_batch(self, batch_id: str) -> dict:
+        ended = self.anthropic_batches[batch_id]["polls"] >= self.polls_to_end
+        counts = {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0}
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": counts,
+            "created_at": "2026-01-01T00:00:00Z",
+            "expires_at": "2026-01-02T00:00:00Z",
+            "ended_at": None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.url}/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def _anthropic_results(self, batch_id: str) -> str:
+        lines = []
+        for request in self.anthropic_batches[batch_id]["requests"]:
+            if request["custom_id"] in self.fail_ids:
+                result = {"type": "errored", "error": {"type": "error", "error": {"type": "api_error", "message": "x"}}}
+            else:
+                result = {"type": "succeeded", "message": _message(request["params"])}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}))
+        return "".join(line + "\n" for line in lines)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(self, obj=None, raw: bytes = None, status: int = 200) -> None:
+                data = raw if raw is not None else json.dumps(obj).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self) -> None:
+                raw = self.rfile.read(int(self.headers.get("content-length", 0)))
+                path = self.path.split("?")[0]
+                if path.endswith("/files"):
+                    boundary = self.headers["content-type"].split("boundary=")[1].encode()
+                    part = [p for p in raw.split(b"--" + boundary) if b'name="file"' in p][0]
+                    content = part.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n", 1)[0].decode("utf-8")
+                    file_id = server._new_id("file")
+                    server.files[file_id] = content
+                    meta = {"object": "file", "bytes": len(content), "created_at": 0, "filename": "batch.jsonl"}
+                    return self._send(dict(meta, id=file_id, purpose="batch", status="processed"))
+                body = json.loads(raw or b"{}")
+                if path.endswith("/messages/batches"):
+                    batch_id = server._new_id("msgbatch")
+                    server.anthropic_batches[batch_id] = {"requests": body["requests"], "polls": 0}
+                    server.submissions.append(("anthropic", None, len(body["requests"])))
+                    return self._send(server._anthropic_batch(batch_id))
+                if path.endswith("/batches"):
+                    batch_id = server._new_id("batch")
+                    lines = server.files[body["input_file_id"]].splitlines()
+                    first = json.loads(lines[0])["body"] if lines else {}
+                    fmt = (first.get("response_format") or {}).get("type")
+                    server.submissions.append(("openai", fmt, len(lines)))
+                    server.openai_batches[batch_id] = {
+                        "input_file_id": body["input_file_id"],
+                        "endpoint": body["endpoint"],
+                        "polls": 0,
+                    }
+                    return self._send(server._openai_batch(batch_id))
+                self._send({"error": {"message": f"not found: {path}"}}, status=404)
+
+            def do_GET(self) -> None:
+                path = self.path.split("?")[0]
+                m = re.match(r".*/files/([^/]+)/content$", path)
+                if m:
+                    return self._send(raw=server.files[m.group(1)].encode("utf-8"))
+                m = re.match(r".*/messages/batches/([^/]+)/results$", path)
+                if m:
+                    return self._send(raw=server._anthropic_results(m.group(1)).encode("utf-8"))
+                m = re.match(r".*/messages/batches/([^/]+)$", path)
+                if m:
+                    server.anthropic_batches[m.group(1)]["polls"] += 1
+                    return self._send(server._anthropic_batch(m.group(1)))
+                m = re.match(r".*/batches/([^/]+)$", path)
+                if m:
+                    server.openai_batches[m.group(1)]["polls"] += 1
+                    return self._send(server._openai_batch(m.group(1)))
+                self._send({"error": {"message": f"not found: {path}"}}, status=404)
+
+        return Handler
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+import run_repeated_judging as rrj
+from batch_judging import batch_custom_id, load_batch_state, run_judgment_batches
+from fake_batch_server import ANTHROPIC_SCORE, OPENAI_SCORE, FakeBatchServer
+
+GPT = "gpt-4o-mini"
+CLAUDE = "claude-haiku-4-5-20251001"
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with FakeBatchServer(polls_to_end=2) as srv:
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("OPENAI_BASE_URL", srv.url)
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", srv.url)
+        monkeypatch.setenv("JUDGE_BATCH_POLL_SEC", "0")
+        yield srv
+
+
+def _slots(model, provider, n=3):
+    return [
+        {
+            "key": ("generic_overall", model, str(i), 0),
+            "judge_model": model,
+            "provider": provider,
+            "idx": 0,
+            "prompt": f"Rate answer {i}",
+        }
+        for i in range(n)
+    ]
+
+
+def _run(slots, state_path, **kw):
+    return run_judgment_batches(
+        slots,
+        temperature=0.0,
+        system_content="judge",
+        state_path=state_path,
+        execution_id="exec-1",
+        config={"k": 1},
+        use_cache=False,
+        poll_sec=0,
+        **kw,
+    )
+
+
+def test_submit_poll_collect_both_providers(server, tmp_path):
+    slots = _slots(GPT, "openai") + _slots(CLAUDE, "anthropic")
+    polls = []
+
+    results = _run(slots, tmp_path / "run.batches.json", on_poll=polls.append)
+
+    assert sorted(p for p, _fmt, _n in server.submissions) == ["anthropic", "openai"]
+    assert len(polls) == 2 and set(polls[-1].values()) == {"ended"}
+    for slot in slots:
+        res = results[batch_custom_id(slot["key"])]
+        expected = OPENAI_SCORE if slot["provider"] == "openai" else ANTHROPIC_SCORE
+        assert json.loads(res["content"])["score"] == expected
+        assert res["batch_id"] and not res["cache_hit"]
+    state = load_batch_state(tmp_path / "run.batches.json")
+    assert {b["status"] for b in state["batches"]} == {"ended"}
+
+
+def test_recorded_batches_are_reattached_not_resubmitted(server, tmp_path):
+    slots = _slots(GPT, "openai")
+    _run(slots, tmp_path / "run.batches.json")
+
+    again = _run(slots, tmp_path / "run.batches.json")
+
+    assert len(server.submissions) == 1
+    assert len(again) == len(slots)
+
+
+def test_rejected_json_schema_is_resubmitted_with_the_next_format(server, tmp_path):
+    server.reject_schema_models.add(GPT)
+    slots = _slots(GPT, "openai")
+
+    results = _run(slots, tmp_path / "run.batches.json")
+
+    assert [fmt for _p, fmt, _n in server.submissions] == ["json_schema", "json_object"]
+    for slot in slots:
+        res = results[batch_custom_id(slot["key"])]
+        assert "error" not in res and "format_rejected" not in res
+        assert json.loads(res["content"])["score"] == OPENAI_SCORE
+
+
+def test_failed_entries_are_reported_per_request(server, tmp_path):
+    slots = _slots(GPT, "openai") + _slots(CLAUDE, "anthropic")
+    failed = {batch_custom_id(slots[0]["key"]), batch_custom_id(slots[-1]["key"])}
+    server.fail_ids.update(failed)
+
+    results = _run(slots, tmp_path / "run.batches.json")
+
+    assert len(server.submissions) == 2
+    assert {cid for cid, res in results.items() if "error" in res} == failed
+
+
+def test_batch_run_judges_failed_requests_synchronously(server, fake_judge):
+    failed_key = ("generic_overall", GPT, "102", 1)
+    server.fail_ids.add(batch_custom_id(failed_key))
+
+    out = rrj.run_experiment(judge_models=[GPT, CLAUDE], repeats=2, max_items=2, execution_mode="batch")
+
+    rows = [json.loads(line) for line in open(out["output_path"], encoding="utf-8")]
+    assert out["written_rows"] == out["expected_rows"] == len(rows) == 8
+    by_key = {(r["judge_model"], str(r["item_id"]), r["idx"]): r for r in rows}
+    sync_row = by_key[(GPT, "102", 1)]
+    assert sync_row["batch_id"] is None
+    assert sync_row["score"] == fake_judge.score(fake_judge.calls[0][1], GPT, 1)
+    assert len(fake_judge.calls) == 1
+    batch_rows = [r for k, r in by_key.items() if k != (GPT, "102", 1)]
+    assert all(r["execution_mode"] == "batch" and r["batch_id"] for r in batch_rows)
+    assert {r["score"] for r in batch_rows} == {OPENAI_SCORE, ANTHROPIC_SCORE}
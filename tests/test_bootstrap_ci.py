@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import bootstrap_ci
+from bootstrap_ci import METRICS, ScoreCube, bootstrap
+from consensus import JudgePanel, loo_consensus
+
+
+def _rows(seed=0, judges=3, items=15, repeats=3):
+    rng = np.random.default_rng(seed)
+    return [
+        {"judge_model": f"j{j}", "item_id": str(i), "score": int(rng.integers(5, 9)) * 10}
+        for j in range(judges)
+        for i in range(items)
+        for _ in range(repeats)
+    ]
+
+
+def test_estimates_are_the_point_metrics():
+    rows = _rows()
+    cube = ScoreCube.from_rows(rows)
+
+    out = bootstrap(cube, 200, seed=1)
+
+    loo = loo_consensus(JudgePanel.from_rows(rows))
+    for j in cube.judges:
+        per_item = {}
+        for r in rows:
+            if r["judge_model"] == j:
+                per_item.setdefault(r["item_id"], []).append(r["score"])
+        variances = [np.var(s, ddof=1) for s in per_item.values()]
+        assert out[j]["mean_variance"]["estimate"] == pytest.approx(np.mean(variances))
+        assert out[j]["pct_items_zero_variance"]["estimate"] == pytest.approx(100 * np.mean(np.equal(variances, 0)))
+        assert out[j]["mcd"]["estimate"] == pytest.approx(loo[j]["mcd"])
+        assert out[j]["mcb"]["estimate"] == pytest.approx(loo[j]["mcb"])
+        for m in METRICS:
+            assert out[j][m]["low"] <= out[j][m]["estimate"] <= out[j][m]["high"]
+
+
+def test_same_seed_same_intervals():
+    cube = ScoreCube.from_rows(_rows())
+
+    assert bootstrap(cube, 300, seed=7) == bootstrap(cube, 300, seed=7)
+    assert bootstrap(cube, 300, seed=7, resample_repeats=True) == bootstrap(cube, 300, seed=7, resample_repeats=True)
+    assert bootstrap(cube, 300, seed=7) != bootstrap(cube, 300, seed=8)
+
+
+def test_replicate_equals_recomputing_on_the_resampled_items():
+    cube = ScoreCube.from_rows(_rows(seed=2))
+    seed = np.random.SeedSequence(5)
+
+    reps = bootstrap_ci._replicates(cube, 4, seed, False)
+
+    items = np.random.default_rng(seed).integers(0, len(cube.cells), size=(4, len(cube.cells)))
+    for n, draw in enumerate(items):
+        want = bootstrap_ci._reduce(bootstrap_ci._cell_stats(cube.values[:, draw], cube.mask[:, draw]))
+        for m in METRICS:
+            np.testing.assert_allclose(reps[m][n], want[m])
+
+
+def test_workers_do_not_change_the_intervals(monkeypatch):
+    cube = ScoreCube.from_rows(_rows())
+    # Several chunks of replicates, so workers > 1 really fans out.
+    monkeypatch.setattr(bootstrap_ci, "_CHUNK_CELLS", cube.values.size * 20)
+
+    assert bootstrap(cube, 100, seed=3, workers=2) == bootstrap(cube, 100, seed=3, workers=1)
+
+
+def test_lone_judge_has_no_mcd():
+    cube = ScoreCube.from_rows(_rows(judges=1))
+
+    out = bootstrap(cube, 50)
+
+    assert out["j0"]["mcd"] == {"estimate": None, "low": None, "high": None, "se": None}
@@ -0,0 +1,34 @@
+import json
+
+import run_repeated_judging as rrj
+from budget import RunBudget
+
+
+def _rows(path):
+    return [json.loads(line) for line in open(path, encoding="utf-8")]
+
+
+def test_gate_counts_admitted_slots_and_stops_at_the_run_cap():
+    budget = RunBudget(max_tokens=1000)
+    units = [{"key": ("k", i), "judge_model": "gpt-4o", "prompt": "x" * 1200} for i in range(10)]
+
+    admitted = list(budget.gate(units, lambda u: (u["key"], u["judge_model"], u["prompt"], 2)))
+
+    assert 0 < len(admitted) < len(units)
+    assert budget.admitted_slots == 2 * len(admitted)
+    assert "run" in budget.exhausted
+
+
+def test_budget_stop_then_resume_completes_the_run(fake_judge):
+    kw = dict(judge_models=["gpt-4o", "claude-haiku-4-5-20251001"], repeats=3, max_items=3)
+
+    capped = rrj.run_experiment(budget={"max_tokens": 4000}, **kw)
+    assert capped["budget_exhausted"]
+    assert 0 < capped["written_rows"] < capped["expected_rows"]
+    assert len(_rows(capped["output_path"])) == capped["written_rows"] == len(fake_judge.calls)
+
+    done = rrj.run_experiment(budget={"max_tokens": 1_000_000}, resume_path=capped["output_path"], **kw)
+    assert not done["budget_exhausted"]
+    assert done["written_rows"] == done["expected_rows"] == 18
+    keys = [(r["judge_model"], r["item_id"], r["idx"]) for r in _rows(done["output_path"])]
+    assert len(set(keys)) == 18
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from columnar_store import (  # noqa: E402
+    SCORE_COLUMNS,
+    export_parquet,
+    is_fresh,
+    justifications_path,
+    load_rows,
+    parquet_path,
+    read_justifications,
+    read_table,
+)
+
+
+@pytest.fixture
+def run(tmp_path):
+    path = tmp_path / "run.jsonl"
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(5):
+            row = {"item_id": i, "judge_model": "gpt-4o", "idx": 0, "metric_name": None, "score": 60 + i}
+            f.write(json.dumps(dict(row, justification=f"because {i}")) + "\n")
+    return path
+
+
+def test_reads_do_not_write_parquet(run):
+    rows = load_rows(run, SCORE_COLUMNS)
+    read_table(run)
+    read_justifications(run)
+
+    assert not parquet_path(run).exists()
+    assert not justifications_path(run).exists()
+    assert [r["item_id"] for r in rows] == ["0", "1", "2", "3", "4"]
+
+
+def test_fresh_export_reads_the_same_rows(run):
+    before = load_rows(run, SCORE_COLUMNS), read_table(run), read_justifications(run)
+    export_parquet(run)
+    assert is_fresh(run)
+    after = load_rows(run, SCORE_COLUMNS), read_table(run), read_justifications(run)
+
+    assert before[0] == after[0]
+    assert before[1].equals(after[1])
+    assert before[2].equals(after[2])
+
+
+def test_stale_export_falls_back_to_jsonl(run):
+    export_parquet(run)
+    with run.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"item_id": "5", "judge_model": "gpt-4o", "idx": 0, "score": 99}) + "\n")
+
+    assert not is_fresh(run)
+    assert [r["score"] for r in load_rows(run, SCORE_COLUMNS)][-1] == 99
@@ -0,0 +1,55 @@
+import json
+
+from compute_mcd import discover_runs, evaluate_condition
+
+
+def _run(path, judges, *, repeats=2, created="2026-01-01T00:00:00", scores=None):
+    with path.open("w", encoding="utf-8") as f:
+        for j, judge in enumerate(judges):
+            for item in ("1", "2", "3"):
+                for idx in range(repeats):
+                    score = scores[judge][item] if scores else 50 + 10 * j
+                    row = {
+                        "execution_id": path.stem,
+                        "condition_name": "generic_overall",
+                        "dataset_id": "mt_bench_subset",
+                        "temperature": 0.0,
+                        "repeats_planned": repeats,
+                        "judge_model": judge,
+                        "item_id": item,
+                        "idx": idx,
+                        "score": score,
+                        "created_at": created,
+                    }
+                    f.write(json.dumps(row) + "\n")
+    return path
+
+
+def test_only_compatible_runs_are_pooled(tmp_path):
+    panel = _run(tmp_path / "a_panel.jsonl", ["gpt-4o", "claude-sonnet-4-6"], created="2026-01-02T00:00:00")
+    extra = _run(tmp_path / "b_extra.jsonl", ["gpt-4o-mini"], created="2026-01-03T00:00:00")
+    other_k = _run(tmp_path / "c_k3.jsonl", ["gpt-4"], repeats=3, created="2026-01-01T00:00:00")
+    again = _run(tmp_path / "d_again.jsonl", ["gpt-4o"], created="2026-01-01T00:00:00")
+
+    skipped = []
+    runs = discover_runs(results_dir=tmp_path, skipped=skipped)
+
+    assert runs == {"generic_overall": [panel, extra]}
+    reasons = dict(skipped)
+    assert set(reasons) == {other_k, again}
+    assert "repeats=3" in reasons[other_k]
+    assert "gpt-4o is already taken from a_panel.jsonl" in reasons[again]
+
+
+def test_pooled_runs_share_one_consensus_panel(tmp_path):
+    scores = {"gpt-4o": {"1": 80, "2": 60, "3": 70}, "claude-sonnet-4-6": {"1": 70, "2": 70, "3": 70}}
+    a = _run(tmp_path / "a.jsonl", ["gpt-4o"], scores=scores)
+    b = _run(tmp_path / "b.jsonl", ["claude-sonnet-4-6"], scores=scores)
+
+    result = evaluate_condition("generic_overall", [a, b])
+
+    gpt = result["summary"]["gpt-4o"]
+    assert result["rows"] == 12
+    assert gpt["mcd"] == (10 + 10 + 0) / 3
+    assert gpt["mcb"] == 0
+    assert gpt["n_cells"] == 3
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from consensus import JudgePanel, loo_consensus
+
+
+def _random_rows(seed=0, judges=4, items=12, repeats=3):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for j in range(judges):
+        for i in range(items):
+            if rng.random() < 0.2:
+                continue
+            for _ in range(rng.integers(1, repeats + 1)):
+                rows.append({"judge_model": f"j{j}", "item_id": str(i), "score": int(rng.integers(0, 4)) * 10})
+    return rows
+
+
+def _brute_force(rows):
+    """Leave-one-out consensus straight from the definitions, one judge and item at a time."""
+    scores = {}
+    for r in rows:
+        scores.setdefault(r["judge_model"], {}).setdefault(r["item_id"], []).append(r["score"])
+    out = {}
+    for j, items in scores.items():
+        diffs, means, repeated, stable = [], [], 0, 0
+        for item, s in items.items():
+            if len(s) >= 2:
+                repeated += 1
+                stable += len(set(s)) == 1
+            others = [np.mean(o[item]) for k, o in scores.items() if k != j and item in o]
+            if others:
+                diffs.append(np.mean(s) - np.mean(others))
+                means.append(np.mean(s))
+        out[j] = {
+            "mcd": float(np.mean(np.abs(diffs))) if diffs else None,
+            "mcb": float(np.mean(diffs)) if diffs else None,
+            "mean_score": float(np.mean(means)) if means else None,
+            "rs": 100.0 * stable / repeated if repeated else 0.0,
+            "n_cells": len(diffs),
+        }
+    return out
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_loo_consensus_matches_brute_force(seed):
+    rows = _random_rows(seed)
+
+    got = loo_consensus(JudgePanel.from_rows(rows))
+
+    want = _brute_force(rows)
+    assert set(got) == set(want)
+    for j in want:
+        assert got[j] == pytest.approx(want[j])
+
+
+def test_cell_mask_restricts_the_panel():
+    rows = _random_rows(3)
+    panel = JudgePanel.from_rows(rows)
+    keep = {"0", "1", "2", "3"}
+
+    got = loo_consensus(panel, panel.cell_mask(lambda c: c in keep))
+
+    want = _brute_force([r for r in rows if r["item_id"] in keep])
+    for j in want:
+        assert got[j] == pytest.approx(want[j])
+
+
+def test_lone_judge_has_no_consensus():
+    rows = [{"judge_model": "a", "item_id": "1", "score": 5}, {"judge_model": "a", "item_id": "1", "score": 5}]
+
+    assert loo_consensus(JudgePanel.from_rows(rows)) == {
+        "a": {"mcd": None, "mcb": None, "mean_score": None, "rs": 100.0, "n_cells": 0}
+    }
@@ -0,0 +1,84 @@
+import json
+
+from jsonl_index import index_path, load_resume_index
+from jsonl_writer import JsonlWriter
+
+
+def _key(row):
+    return (row["item_id"], row["judge_model"], row["idx"])
+
+
+def _row(i):
+    return {"execution_id": "e1", "item_id": str(i), "judge_model": "gpt-4o", "idx": 0, "score": 70 + i}
+
+
+def _write(path, rows, mode="w"):
+    with JsonlWriter(path, mode, flush_rows=1, index_key=_key) as w:
+        for r in rows:
+            w.write(r)
+
+
+def _append_raw(path, rows):
+    with path.open("a", encoding="utf-8") as f:
+        for r in rows:
+            f.write(json.dumps(r) + "\n")
+
+
+def _index_lines(path):
+    return index_path(path).read_text(encoding="utf-8").splitlines()
+
+
+def test_resume_scans_only_rows_past_the_index(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _write(path, [_row(i) for i in range(4)])
+    _append_raw(path, [_row(4), _row(5)])
+
+    idx = load_resume_index(path, _key)
+    assert idx.scanned_rows == 2
+    assert idx.keys == [_key(_row(i)) for i in range(6)]
+    assert load_resume_index(path, _key).scanned_rows == 0
+
+
+def test_truncated_data_line_is_cut_and_rejudged(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _write(path, [_row(i) for i in range(3)])
+    size = path.stat().st_size
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"execution_id": "e1", "item_id": "3", "judge_')
+
+    idx = load_resume_index(path, _key)
+    assert idx.repaired
+    assert path.stat().st_size == size
+    assert idx.keys == [_key(_row(i)) for i in range(3)]
+
+
+def test_damaged_index_tail_is_repaired_once(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _write(path, [_row(i) for i in range(4)])
+    with index_path(path).open("a", encoding="utf-8") as f:
+        f.write('[123, 45, ["4", "gpt')
+    _append_raw(path, [_row(4), _row(5)])
+
+    first = load_resume_index(path, _key)
+    assert first.scanned_rows == 2
+    lines = _index_lines(path)
+    assert len(lines) == 1 + 6
+    assert all(json.loads(line) for line in lines)
+
+    again = load_resume_index(path, _key)
+    assert again.scanned_rows == 0
+    assert _index_lines(path) == lines
+
+
+def test_writer_repairs_index_before_appending(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _write(path, [_row(i) for i in range(3)])
+    with index_path(path).open("a", encoding="utf-8") as f:
+        f.write("[12")
+
+    _write(path, [_row(3), _row(4)], mode="a")
+
+    assert len(_index_lines(path)) == 1 + 5
+    idx = load_resume_index(path, _key)
+    assert idx.scanned_rows == 0
+    assert idx.keys == [_key(_row(i)) for i in range(5)]
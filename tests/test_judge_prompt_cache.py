@@ -0,0 +1,24 @@
+from judge import _anthropic_judge_request, anthropic_min_cacheable_tokens
+
+
+def _content(prefix, model="claude-sonnet-4-6"):
+    return _anthropic_judge_request(prefix + "Item 7: the answer.", model, "You are a judge.", 0.0, prefix)[
+        "messages"
+    ][0]["content"]
+
+
+def test_short_prefix_is_sent_as_one_block(monkeypatch):
+    monkeypatch.delenv("JUDGE_PROMPT_CACHE", raising=False)
+    prefix = "Rate the response from 0 to 100.\n" * 20
+
+    assert _content(prefix) == prefix + "Item 7: the answer."
+
+
+def test_long_prefix_gets_a_cache_breakpoint(monkeypatch):
+    monkeypatch.delenv("JUDGE_PROMPT_CACHE", raising=False)
+    prefix = "x" * (4 * anthropic_min_cacheable_tokens("claude-sonnet-4-6"))
+
+    blocks = _content(prefix)
+    assert blocks[0] == {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}
+    assert "".join(b["text"] for b in blocks) == prefix + "Item 7: the answer."
+    assert isinstance(_content(prefix, "claude-haiku-4-5-20251001"), str)
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from load_cache import cached_aggregator, cached_jsonl, cached_rows, get_load_cache
+from row_aggregator import RowAggregator
+
+
+@pytest.fixture
+def results_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("JUDGE_DASHBOARD_CACHE_MB", "16")
+    get_load_cache().clear()
+    path = tmp_path / "run.jsonl"
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(6):
+            f.write(json.dumps({"judge_model": "gpt-4o", "item_id": str(i % 3), "idx": i // 3, "score": 60 + i}) + "\n")
+    return path
+
+
+def test_rows_and_aggregator_share_one_jsonl_parse(results_file):
+    rows = cached_rows(results_file)
+    agg = cached_aggregator(results_file)
+
+    assert rows is cached_jsonl(results_file)
+    assert [r["score"] for r in rows] == [60, 61, 62, 63, 64, 65]
+    with pytest.raises(TypeError):
+        rows[0]["score"] = 0
+    fresh = RowAggregator().add_rows([dict(r) for r in rows], results_file.name)
+    assert agg.select().variance() == fresh.select().variance()
+    assert cached_aggregator(results_file) is agg
+
+
+def test_appended_file_is_reparsed(results_file):
+    before = cached_rows(results_file)
+    with results_file.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"judge_model": "gpt-4o", "item_id": "9", "idx": 0, "score": 50}) + "\n")
+
+    assert len(cached_rows(results_file)) == len(before) + 1
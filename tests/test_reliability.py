@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from reliability import fleiss_kappa, icc, krippendorff_alpha
+
+
+def _matrix(rows):
+    values = np.array(rows, dtype=float)
+    mask = ~np.isnan(values)
+    return np.nan_to_num(values), mask
+
+
+def test_krippendorff_alpha_matches_krippendorffs_example():
+    # Krippendorff (2011), "Computing Krippendorff's Alpha-Reliability": 12 units × 4 observers, with gaps.
+    nan = np.nan
+    values, mask = _matrix(
+        [
+            [1, 1, nan, 1],
+            [2, 2, 3, 2],
+            [3, 3, 3, 3],
+            [3, 3, 3, 3],
+            [2, 2, 2, 2],
+            [1, 2, 3, 4],
+            [4, 4, 4, 4],
+            [1, 1, 2, 1],
+            [2, 2, 2, 2],
+            [nan, 5, 5, 5],
+            [nan, nan, 1, 1],
+            [nan, 3, nan, nan],
+        ]
+    )
+
+    assert krippendorff_alpha(values, mask, "nominal") == pytest.approx(0.743, abs=5e-4)
+    assert krippendorff_alpha(values, mask, "ordinal") == pytest.approx(0.815, abs=5e-4)
+    assert krippendorff_alpha(values, mask, "interval") == pytest.approx(0.849, abs=5e-4)
+
+
+def test_icc_matches_shrout_and_fleiss():
+    # Shrout & Fleiss (1979), Table 2: 6 targets × 4 judges.
+    values, mask = _matrix([[9, 2, 5, 8], [6, 1, 3, 2], [8, 4, 6, 8], [7, 1, 2, 6], [10, 5, 6, 9], [6, 2, 4, 7]])
+
+    out = icc(values, mask)
+
+    assert out["icc1_1"] == pytest.approx(0.17, abs=5e-3)
+    assert out["icc2_1"] == pytest.approx(0.29, abs=5e-3)
+    assert out["icc2_k"] == pytest.approx(0.62, abs=5e-3)
+    assert (out["n_units"], out["n_complete"], out["n_raters"]) == (6, 6, 4)
+
+
+def test_icc1_uses_ragged_units_and_icc2_only_complete_ones():
+    nan = np.nan
+    values, mask = _matrix([[9, 2, 5, 8], [6, 1, 3, nan], [8, 4, nan, nan], [7, nan, nan, nan]])
+
+    out = icc(values, mask)
+
+    assert (out["n_units"], out["n_complete"]) == (3, 1)
+    assert out["icc1_1"] is not None
+    assert out["icc2_1"] is None
+
+
+def test_fleiss_kappa_matches_fleiss_example():
+    # Fleiss (1971) as tabulated on Wikipedia: 10 subjects, 14 raters, 5 categories; kappa = 0.210.
+    counts = [
+        [0, 0, 0, 0, 14],
+        [0, 2, 6, 4, 2],
+        [0, 0, 3, 5, 6],
+        [0, 3, 9, 2, 0],
+        [2, 2, 8, 1, 1],
+        [7, 7, 0, 0, 0],
+        [3, 2, 6, 3, 0],
+        [2, 5, 3, 2, 2],
+        [6, 5, 2, 1, 0],
+        [0, 2, 2, 3, 7],
+    ]
+    # Category c as a score in the middle of bin c of 5 equal-width bins on 0–100.
+    values, mask = _matrix([[10 + 20 * c for c in range(5) for _ in range(row[c])] for row in counts])
+
+    assert fleiss_kappa(values, mask, bins=5, score_range=(0, 100)) == pytest.approx(0.210, abs=5e-4)
+
+
+def test_undefined_statistics_are_none():
+    values, mask = _matrix([[50, 50], [50, 50], [50, 50]])
+
+    assert krippendorff_alpha(values, mask) is None
+    assert icc(values, mask)["icc2_1"] is None
@@ -0,0 +1,42 @@
+import json
+
+from results_catalog import ResultsDB, catalog_key
+
+
+def _shard(path, judge, n):
+    path.parent.mkdir(parents=True)
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(n):
+            row = {
+                "execution_id": path.parent.name,
+                "condition_name": "generic_overall",
+                "dataset_id": "mt_bench_subset",
+                "judge_model": judge,
+                "item_id": str(i),
+                "idx": 0,
+                "score": 70,
+            }
+            f.write(json.dumps(row) + "\n")
+    return path
+
+
+def test_same_named_shards_of_two_plans_stay_apart(tmp_path):
+    a = _shard(tmp_path / "plan-a" / "shard-000-of-002.jsonl", "gpt-4o", 3)
+    b = _shard(tmp_path / "plan-b" / "shard-000-of-002.jsonl", "gpt-4o-mini", 2)
+    db = ResultsDB(tmp_path / "catalog.sqlite3")
+
+    assert db.ingest([a, b])["ingested"] == 2
+    assert {r["judge_model"] for r in db.judgments(files=[a])} == {"gpt-4o"}
+    assert len(db.judgments(files=[b])) == 2
+    assert sorted(f["file"] for f in db.files()) == sorted([catalog_key(a), catalog_key(b)])
+    assert db.ingest([a, b])["skipped"] == 2
+
+
+def test_remove_drops_a_files_rows(tmp_path):
+    a = _shard(tmp_path / "plan-a" / "run.jsonl", "gpt-4o", 3)
+    db = ResultsDB(tmp_path / "catalog.sqlite3")
+    db.ingest([a])
+
+    assert db.remove([a]) == 1
+    assert db.judgments(files=[a]) == []
+    assert db.files() == []
@@ -0,0 +1,41 @@
+import json
+
+from compute_mcd import discover_runs
+from run_manifest import backfill_manifest, load_manifest, manifest_path, result_catalog
+
+
+def _run(path, judge="gpt-4o"):
+    with path.open("w", encoding="utf-8") as f:
+        for item in ("1", "2"):
+            for idx in range(2):
+                row = {
+                    "execution_id": path.stem,
+                    "condition_name": "generic_overall",
+                    "dataset_id": "mt_bench_subset",
+                    "repeats_planned": 2,
+                    "judge_model": judge,
+                    "item_id": item,
+                    "idx": idx,
+                    "score": 50 + idx,
+                }
+                f.write(json.dumps(row) + "\n")
+    return path
+
+
+def test_listing_and_analysis_do_not_write_manifests(tmp_path):
+    path = _run(tmp_path / "a.jsonl")
+
+    assert result_catalog(tmp_path) == [(path, None)]
+    assert discover_runs([], results_dir=tmp_path) == {"generic_overall": [path]}
+    assert discover_runs([path]) == {"generic_overall": [path]}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.jsonl"]
+
+
+def test_backfill_writes_a_fresh_manifest(tmp_path):
+    path = _run(tmp_path / "a.jsonl")
+
+    m = backfill_manifest(path)
+
+    assert manifest_path(path).is_file() and load_manifest(path) == m
+    assert result_catalog(tmp_path) == [(path, m)]
+    assert m["rows"] == 4 and m["complete"]
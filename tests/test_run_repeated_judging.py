@@ -0,0 +1,224 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import run_repeated_judging as rrj
+from jsonl_index import index_path
+from run_manifest import manifest_path
+
+KW = dict(judge_models=["gpt-4o", "claude-haiku-4-5-20251001"], repeats=2, max_items=3)
+
+
+def _rows(path):
+    return [json.loads(line) for line in open(path, encoding="utf-8")]
+
+
+def _keys(rows):
+    return [(r["judge_model"], str(r["item_id"]), r["idx"]) for r in rows]
+
+
+def _slots(n):
+    return [{"provider": "openai" if i % 2 else "anthropic", "i": i} for i in range(n)]
+
+
+def test_slots_are_emitted_in_order_whatever_finishes_first():
+    emitted = []
+
+    def run_slot(slot):
+        time.sleep(0.002 * ((7 * slot["i"]) % 5))
+        return slot["i"] * 10
+
+    workers = {"openai": 3, "anthropic": 2}
+    rrj._run_slots_in_order(_slots(20), run_slot, lambda s, r: emitted.append((s["i"], r)), workers)
+
+    assert emitted == [(i, i * 10) for i in range(20)]
+
+
+def test_failure_emits_finished_slots_in_order_then_raises():
+    emitted = []
+    release = threading.Event()
+
+    def run_slot(slot):
+        if slot["i"] == 3:
+            # Fail only once the later slots in flight have finished.
+            release.wait(2)
+            raise RuntimeError("boom")
+        if slot["i"] > 3:
+            release.set()
+        return slot["i"]
+
+    with pytest.raises(RuntimeError, match="boom"):
+        rrj._run_slots_in_order(_slots(40), run_slot, lambda s, r: emitted.append(r), {"openai": 2, "anthropic": 2})
+
+    assert emitted[:3] == [0, 1, 2]
+    assert 3 not in emitted
+    assert emitted == sorted(emitted)
+
+
+def test_failure_stops_dispatching_new_slots():
+    started = []
+    workers = {"openai": 1, "anthropic": 1}
+
+    def run_slot(slot):
+        started.append(slot["i"])
+        if slot["i"] == 0:
+            raise RuntimeError("boom")
+        return slot["i"]
+
+    with pytest.raises(RuntimeError):
+        rrj._run_slots_in_order(_slots(100), run_slot, lambda s, r: None, workers)
+
+    assert len(started) <= rrj.DISPATCH_WINDOW_PER_WORKER * sum(workers.values())
+
+
+def test_parallel_run_failure_leaves_an_ordered_resumable_file(fake_judge):
+    reference = _rows(rrj.run_experiment(workers=4, **KW)["output_path"])
+    fake_judge.fail_on = lambda model, prompt, idx: model == "gpt-4o" and idx == 1
+    with pytest.raises(RuntimeError):
+        rrj.run_experiment(workers=4, **KW)
+    partial = fake_judge.outputs[-1]
+    written = _keys(_rows(partial))
+    order = _keys(reference)
+    # Everything before the first failure, then whatever later slots had already finished, all in plan order.
+    first_failed = order.index(("gpt-4o", "101", 1))
+    assert written[:first_failed] == order[:first_failed]
+    assert [order.index(k) for k in written] == sorted(order.index(k) for k in written)
+    assert not [k for k in written if k[0] == "gpt-4o" and k[2] == 1]
+
+    fake_judge.fail_on = None
+    done = _rows(rrj.run_experiment(workers=4, resume_path=str(partial), **KW)["output_path"])
+
+    assert sorted(_keys(done)) == sorted(_keys(reference))
+    assert dict(zip(_keys(done), [r["score"] for r in done])) == dict(zip(order, [r["score"] for r in reference]))
+
+
+def test_resume_after_truncated_data_line_rejudges_that_slot(fake_judge):
+    first = rrj.run_experiment(**KW)
+    path = first["output_path"]
+    rows = _rows(path)
+    data = open(path, "rb").read()
+    last = data.rstrip(b"\n").rfind(b"\n") + 1
+    with open(path, "wb") as f:
+        f.write(data[: last + 20])
+    fake_judge.calls.clear()
+
+    done = rrj.run_experiment(resume_path=path, **KW)
+
+    assert len(fake_judge.calls) == 1
+    assert done["written_rows"] == done["expected_rows"] == 12
+    assert [(k, r["score"]) for k, r in zip(_keys(_rows(path)), _rows(path))] == [
+        (k, r["score"]) for k, r in zip(_keys(rows), rows)
+    ]
+
+
+def test_resume_after_truncated_index_line(fake_judge):
+    first = rrj.run_experiment(**KW)
+    path = first["output_path"]
+    rows = _rows(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in rows[:-2])
+    ipath = index_path(path)
+    lines = ipath.read_text(encoding="utf-8").splitlines(keepends=True)
+    ipath.write_text("".join(lines[:-3]) + lines[-3][:7], encoding="utf-8")
+    fake_judge.calls.clear()
+
+    done = rrj.run_experiment(resume_path=path, **KW)
+
+    assert len(fake_judge.calls) == 2
+    assert _keys(_rows(done["output_path"])) == _keys(rows)
+    assert all(json.loads(line) for line in ipath.read_text(encoding="utf-8").splitlines())
+
+
+def _shards(execution_id, n=2):
+    for i in range(n):
+        rrj.run_experiment(shard_index=i, shard_count=n, execution_id=execution_id, **KW)
+    return [rrj.shard_output_path(execution_id, i, n) for i in range(n)]
+
+
+def test_merge_shards_matches_the_serial_run(fake_judge, tmp_path):
+    serial = rrj.run_experiment(**KW)
+    _shards("exec-merge")
+
+    merged = rrj.merge_shards("exec-merge", str(tmp_path / "merged.jsonl"))
+
+    assert merged["written_rows"] == 12
+    assert _keys(_rows(merged["output_path"])) == _keys(_rows(serial["output_path"]))
+
+
+def test_merge_shards_rejects_a_missing_shard(fake_judge, tmp_path):
+    paths = _shards("exec-missing")
+    paths[1].unlink()
+
+    with pytest.raises(ValueError, match="shard 1"):
+        rrj.merge_shards("exec-missing", str(tmp_path / "merged.jsonl"))
+
+
+def test_merge_shards_rejects_a_slot_in_the_wrong_shard(fake_judge, tmp_path):
+    paths = _shards("exec-stray")
+    rows0, rows1 = _rows(paths[0]), _rows(paths[1])
+    with open(paths[0], "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in rows0[:-1] + rows1[:1])
+
+    with pytest.raises(ValueError, match="other shards"):
+        rrj.merge_shards("exec-stray", str(tmp_path / "merged.jsonl"))
+
+
+def test_merge_shards_rejects_a_shard_of_another_execution(fake_judge, tmp_path):
+    paths = _shards("exec-eid")
+    rows = _rows(paths[0])
+    for r in rows:
+        r["execution_id"] = "other"
+    with open(paths[0], "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in rows)
+
+    with pytest.raises(ValueError, match="execution_id"):
+        rrj.merge_shards("exec-eid", str(tmp_path / "merged.jsonl"))
+
+
+def test_dry_run_resume_leaves_a_torn_file_and_its_index_untouched(fake_judge):
+    path = Path(rrj.run_experiment(**KW)["output_path"])
+    data = path.read_bytes()
+    path.write_bytes(data[: data.rstrip(b"\n").rfind(b"\n") + 20])
+    ipath = index_path(path)
+    lines = ipath.read_text(encoding="utf-8").splitlines(keepends=True)
+    ipath.write_text("".join(lines[:-1]) + lines[-1][:5], encoding="utf-8")
+    before = path.read_bytes(), ipath.read_bytes()
+    fake_judge.calls.clear()
+
+    report = rrj.run_experiment(resume_path=str(path), dry_run=True, **KW)
+
+    assert (path.read_bytes(), ipath.read_bytes()) == before
+    assert report["already_written"] == 11
+    assert not fake_judge.calls
+
+
+def _results_dir_with_a_run(monkeypatch, tmp_path):
+    path = Path(rrj.run_experiment(**KW)["output_path"])
+    results = tmp_path / "results"
+    results.mkdir()
+    for p in (path, manifest_path(path)):
+        p.rename(results / p.name)
+    monkeypatch.setattr(rrj, "REPO_ROOT", tmp_path)
+    return results / path.name
+
+
+def test_dry_run_history_comes_from_the_manifest(fake_judge, monkeypatch, tmp_path):
+    path = _results_dir_with_a_run(monkeypatch, tmp_path)
+    with monkeypatch.context() as m:
+        m.setattr(rrj, "load_manifest", lambda p: None)
+        scanned, _ = rrj._judge_history(KW["judge_models"])
+
+    def no_scan(*args):
+        raise AssertionError(f"scanned {args[0]}")
+
+    monkeypatch.setattr(rrj, "_scan_judge_history", no_scan)
+    history, files = rrj._judge_history(KW["judge_models"])
+
+    assert history == scanned and files == 1
+    assert history["gpt-4o"]["n_rows"] == 6 and history["gpt-4o"]["output_tokens"] == 60
+    manifest_path(path).unlink()
+    with pytest.raises(AssertionError, match="scanned"):
+        rrj._judge_history(KW["judge_models"])